@@ -0,0 +1,115 @@
+"""
+Import-time benchmark for the CLI and API entry points.
+
+Every target is measured in a fresh interpreter, so module caches from one
+target never flatter another. Run from the repository root:
+
+    python -m src.app.benchmarks.import_time
+    python -m src.app.benchmarks.import_time --repeat 5 --top 15
+"""
+
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+import time
+from typing import List, Tuple
+
+# Modules that lightweight commands must never pull in
+HEAVY_MODULES = (
+    "torch",
+    "transformers",
+    "sentence_transformers",
+    "chromadb",
+    "onnxruntime",
+    "neo4j",
+)
+
+IMPORT_TARGETS = (
+    "src.app.configuration.dependencies",
+    "src.app.cli.ingestion_cli",
+    "src.app.main",
+)
+
+CLI_COMMANDS = (
+    ("info",),
+    ("--help",),
+)
+
+_PROBE = """
+import sys, time
+t = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - t
+heavy = [m for m in {heavy!r} if m in sys.modules]
+print(f"{{elapsed:.6f}}|{{','.join(heavy)}}")
+"""
+
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s+(\S.*)$")
+
+
+def measure_import(module: str) -> Tuple[float, List[str]]:
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.strip().splitlines()[-1]
+    elapsed, heavy = out.split("|")
+    return float(elapsed), [m for m in heavy.split(",") if m]
+
+
+def measure_command(args: Tuple[str, ...]) -> float:
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", "src.app.cli", *args],
+        capture_output=True,
+        check=True,
+    )
+    return time.perf_counter() - start
+
+
+def top_imports(module: str, top: int) -> List[Tuple[int, str]]:
+    """Returns the slowest imports by cumulative time (microseconds) from -X importtime."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            rows.append((int(match.group(2)), match.group(3).strip()))
+    rows.sort(reverse=True)
+    return rows[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per target (median is reported)")
+    parser.add_argument("--top", type=int, default=0, help="Also list the N slowest imports per target")
+    args = parser.parse_args()
+
+    print(f"{'target':<45} {'median':>10}  heavy modules loaded")
+    for module in IMPORT_TARGETS:
+        runs = [measure_import(module) for _ in range(args.repeat)]
+        median = statistics.median(r[0] for r in runs)
+        heavy = runs[-1][1]
+        print(f"import {module:<38} {median * 1000:>8.1f}ms  {', '.join(heavy) or '-'}")
+
+    for command in CLI_COMMANDS:
+        median = statistics.median(measure_command(command) for _ in range(args.repeat))
+        label = "jaica " + " ".join(command)
+        print(f"{label:<45} {median * 1000:>8.1f}ms")
+
+    if args.top:
+        for module in IMPORT_TARGETS:
+            print(f"\nSlowest imports for {module}:")
+            for cumulative_us, name in top_imports(module, args.top):
+                print(f"  {cumulative_us / 1000:>8.1f}ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Semantic linking benchmark on a synthetic project.
+
+Nodes are generated in the shape `GraphDBService.iter_link_nodes` yields them and
+streamed into the linker's symbol index. The project mixes what real code uses:
+self calls, imported and aliased classes, qualified calls, wildcard imports,
+common names defined all over the project, library calls that resolve to
+nothing, and classes extending imported classes and implementing interfaces. Run from the repository root:
+
+    python -m src.app.benchmarks.linking
+    python -m src.app.benchmarks.linking --nodes 100000 --trace-memory
+"""
+
+import argparse
+import random
+import resource
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from typing import Iterator
+
+from src.app.services.ingestion.symbol_index import LINK_TYPES, SymbolIndex
+
+COMMON_NAMES = ("get", "run", "save", "load", "close", "update", "validate", "build")
+LIBRARY_CALLS = ("os.path.join", "json.dumps", "logging.info", "len", "print", "isinstance")
+
+
+def synthetic_nodes(node_count: int, methods_per_class: int = 8, modules: int = 500, seed: int = 0) -> Iterator[dict]:
+    """One class (every 20th an interface) per file, in `modules` packages; each file imports a few classes."""
+    rng = random.Random(seed)
+    per_file = methods_per_class + 2
+    file_count = max(1, node_count // per_file)
+
+    def class_name(f: int) -> str:
+        return f"Class{f}"
+
+    def module_of(f: int) -> str:
+        return f"app.pkg{f % modules}"
+
+    for f in range(file_count):
+        module = module_of(f)
+        file_path = f"/repo/app/pkg{f % modules}/class{f}.py"
+        file_id = f"p:{file_path}"
+        cls = class_name(f)
+
+        imported = [rng.randrange(file_count) for _ in range(3)]
+        imports = [f"{class_name(i)}={module_of(i)}.class{i}.{class_name(i)}" for i in imported[:2]]
+        imports.append(f"Alias{f}={module_of(imported[2])}.class{imported[2]}.{class_name(imported[2])}")
+        if f % 10 == 0:
+            imports.append(f"*={module_of(rng.randrange(file_count))}")
+
+        yield {
+            "node_id": file_id,
+            "node_kind": "file",
+            "node_name": f"class{f}.py",
+            "file_path": file_path,
+            "qualified_name": f"{module}.class{f}",
+            "imports": imports,
+        }
+
+        methods = [COMMON_NAMES[(f + m) % len(COMMON_NAMES)] if m % 2 else f"method{f}_{m}"
+                   for m in range(methods_per_class)]
+        owner = f"{module}.class{f}.{cls}"
+        yield {
+            "node_id": f"{file_path}:{cls}:1",
+            "node_kind": "interface" if f % 20 == 0 else "class",
+            "node_name": cls,
+            "file_path": file_path,
+            "file_id": file_id,
+            "qualified_name": owner,
+            "symbols_defined": [cls],
+            "symbols_used": [f"Alias{f}"],
+            # Every other class extends an imported one and implements the interface of its block of 20
+            "extends": [class_name(imported[0])] if f % 2 else [],
+            "implements": [class_name(f - f % 20)] if f % 20 else [],
+        }
+
+        for m, method in enumerate(methods):
+            other = imported[m % 3]
+            used = [
+                f"self.{methods[(m + 1) % len(methods)]}",
+                class_name(imported[0]),
+                f"Alias{f}.{COMMON_NAMES[m % len(COMMON_NAMES)]}",
+                f"{class_name(other)}.method{other}_{2 * (m % (methods_per_class // 2))}",
+                rng.choice(COMMON_NAMES),
+                rng.choice(LIBRARY_CALLS),
+            ]
+            yield {
+                "node_id": f"{file_path}:{method}:{m + 2}",
+                "node_kind": "method",
+                "node_name": method,
+                "file_path": file_path,
+                "file_id": file_id,
+                "qualified_name": f"{owner}.{method}",
+                "symbols_defined": [method],
+                "symbols_used": used,
+                "annotations": ["Override"] if m % 2 else [],
+            }
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nodes", type=int, default=1_000_000, help="Approximate number of nodes to generate")
+    parser.add_argument("--methods", type=int, default=8, help="Methods per class")
+    parser.add_argument("--modules", type=int, default=500, help="Number of packages files are spread over")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="Also report the traced Python heap peak (slows the run down)")
+    args = parser.parse_args()
+
+    if args.trace_memory:
+        tracemalloc.start()
+    rss_before = _peak_rss_mb()
+
+    start = time.perf_counter()
+    index = SymbolIndex()
+    for node in synthetic_nodes(args.nodes, args.methods, args.modules, args.seed):
+        index.add(node)
+    index.finalize()
+    built = time.perf_counter()
+
+    counts = Counter()
+    for _, _, link_type, _ in index.links():
+        counts[LINK_TYPES[link_type]] += 1
+    linked = time.perf_counter()
+
+    print(f"nodes          {len(index):>12,}")
+    print(f"symbols        {len(index.strings):>12,}")
+    print(f"used symbols   {len(index.used):>12,}")
+    print(f"links          {sum(counts.values()):>12,}  " + ", ".join(f"{t} {counts[t]:,}" for t in LINK_TYPES))
+    print(f"index build    {built - start:>11.2f}s")
+    print(f"link pass      {linked - built:>11.2f}s")
+    print(f"peak RSS       {_peak_rss_mb():>10.0f}MB  (+{_peak_rss_mb() - rss_before:.0f}MB)")
+    if args.trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        print(f"traced peak    {peak / (1024 * 1024):>10.0f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,18 +7,38 @@ and semantic linking flow of the project.
 
 import traceback
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 import typer
 from rich.console import Console
 from rich.table import Table
 from rich.progress import Progress, SpinnerColumn, TextColumn
 
+from src.app.services.ingestion.content_store import ContentStore
+from src.app.services.ingestion.docs_ingestion_service import DocsIngestionService
 from src.app.services.ingestion.ingestion_service import IngestionService
-from src.app.services.ingestion.ingestion_graph_service import IngestionServiceGraph
+from src.app.services.ingestion.ingestion_sinks import (
+    IngestionSink,
+    GraphSink,
+    VectorSink,
+    CatalogSink,
+    JsonlExportSink,
+)
+from src.app.services.ingestion.library_index import LibraryIndex
 from src.app.services.ingestion.semantic_linking_service import SemanticLinkingService
+from src.app.services.ingestion.ingestion_scheduler import (
+    duplicate_project_names,
+    ModelScheduler,
+    MultiProjectIngestion,
+    STAGE_INGESTING,
+    STAGE_INGESTED,
+    STAGE_LINKING,
+    STAGE_LINKED,
+    STAGE_FAILED,
+)
+from src.app.configuration import config
 from src.app.configuration.dependencies import (
     get_vector_db,
-    get_code_classifier,
+    get_language_resolution_service,
     get_graph_db_service,
 )
 
@@ -32,7 +52,10 @@ console = Console()
 
 
 def validate_paths(paths: List[str]) -> List[Path]:
-    """Validate that all paths exist and are directories."""
+    """
+    Validate that all paths exist and are directories. Projects are named after
+    their folder, so different folders with the same name are rejected.
+    """
     validated_paths = []
     for path_str in paths:
         path = Path(path_str)
@@ -43,7 +66,18 @@ def validate_paths(paths: List[str]) -> List[Path]:
             console.print(f"[red]✗[/red] Path is not a directory: {path}")
             continue
         validated_paths.append(path)
-    return validated_paths
+
+    duplicates = duplicate_project_names(validated_paths)
+    if duplicates:
+        for name, folders in duplicates.items():
+            console.print(
+                f"[red]✗[/red] Folders {', '.join(str(f) for f in folders)} would all be ingested as project "
+                f"'{name}'; projects are named after their folder, so rename all but one of them"
+            )
+        raise typer.Exit(code=1)
+
+    # The same folder given twice is ingested once
+    return list({path.resolve(): path for path in validated_paths}.values())
 
 
 @app.command("full")
@@ -57,6 +91,38 @@ def full_ingestion(
         "--skip-semantic-linking",
         help="Skip semantic linking after ingestion",
     ),
+    exclude: List[str] = typer.Option(
+        [],
+        "--exclude",
+        "-e",
+        help="Extra gitignore-style globs to skip (repeatable)",
+    ),
+    workers: int = typer.Option(
+        config.INGESTION_MAX_WORKERS,
+        "--workers",
+        "-w",
+        help="Global number of file workers shared by all projects",
+    ),
+    llm_concurrency: int = typer.Option(
+        config.LLM_MAX_CONCURRENCY,
+        "--llm-concurrency",
+        help="Maximum concurrent LLM summarization calls across all projects",
+    ),
+    catalog: bool = typer.Option(
+        True,
+        "--catalog/--no-catalog",
+        help="Also record ingested nodes in the local catalog",
+    ),
+    export_jsonl: Optional[Path] = typer.Option(
+        None,
+        "--export-jsonl",
+        help="Directory to export ingested nodes to as <project>.jsonl",
+    ),
+    docs: bool = typer.Option(
+        True,
+        "--docs/--no-docs",
+        help="Also ingest documentation and build files into the docs collection",
+    ),
 ):
     """
     Perform full ingestion: vector DB + graph DB + semantic linking.
@@ -72,41 +138,20 @@ def full_ingestion(
         raise typer.Exit(code=1)
 
     # Initialize service
-    service = IngestionService(
-        get_vector_db(),
-        get_code_classifier(),
-        get_graph_db_service()
+    service = _build_ingestion_service(
+        llm_concurrency, graph=True, vector=True, catalog=catalog, export_jsonl=export_jsonl
     )
 
-    project_names = []
-
-    with Progress(
-        SpinnerColumn(),
-        TextColumn("[progress.description]{task.description}"),
-        console=console,
-    ) as progress:
-        for folder in validated_paths:
-            project_name = folder.name
-            project_names.append(project_name)
-
-            task = progress.add_task(
-                f"Ingesting {project_name}...",
-                total=None
-            )
-
-            try:
-                service.ingest_codebase(folder, project_name)
-                progress.update(task, description=f"[green]✓[/green] Ingested {project_name}")
-                console.print(f"[green]✓[/green] Successfully ingested: {folder}")
-            except Exception as e:
-                progress.update(task, description=f"[red]✗[/red] Failed {project_name}")
-                console.print(f"[red]✗[/red] Failed to ingest {folder}: {e}")
-                traceback.print_exc()
+    _run_parallel_ingestion(
+        service,
+        validated_paths,
+        exclude=exclude,
+        workers=workers,
+        with_linking=not skip_semantic_linking,
+    )
 
-    # Semantic linking
-    if not skip_semantic_linking and project_names:
-        console.print("\n[bold cyan]🔗 Starting Semantic Linking[/bold cyan]\n")
-        _run_semantic_linking(project_names)
+    if docs:
+        _run_docs_ingestion(validated_paths, exclude=exclude)
 
     console.print("\n[bold green]✓ Full ingestion complete![/bold green]\n")
 
@@ -122,6 +167,33 @@ def graph_ingestion(
         "-s",
         help="Perform semantic linking after graph ingestion",
     ),
+    exclude: List[str] = typer.Option(
+        [],
+        "--exclude",
+        "-e",
+        help="Extra gitignore-style globs to skip (repeatable)",
+    ),
+    workers: int = typer.Option(
+        config.INGESTION_MAX_WORKERS,
+        "--workers",
+        "-w",
+        help="Global number of file workers shared by all projects",
+    ),
+    llm_concurrency: int = typer.Option(
+        config.LLM_MAX_CONCURRENCY,
+        "--llm-concurrency",
+        help="Maximum concurrent LLM summarization calls across all projects",
+    ),
+    catalog: bool = typer.Option(
+        True,
+        "--catalog/--no-catalog",
+        help="Also record ingested nodes in the local catalog",
+    ),
+    export_jsonl: Optional[Path] = typer.Option(
+        None,
+        "--export-jsonl",
+        help="Directory to export ingested nodes to as <project>.jsonl",
+    ),
 ):
     """
     Perform graph DB ingestion only.
@@ -137,42 +209,222 @@ def graph_ingestion(
         raise typer.Exit(code=1)
 
     # Initialize service
-    service = IngestionServiceGraph(
-        get_code_classifier(),
-        get_graph_db_service()
+    service = _build_ingestion_service(
+        llm_concurrency, graph=True, vector=False, catalog=catalog, export_jsonl=export_jsonl
     )
 
-    project_names = []
+    _run_parallel_ingestion(
+        service,
+        validated_paths,
+        exclude=exclude,
+        workers=workers,
+        with_linking=with_semantic_linking,
+        target_label="graph DB",
+    )
+
+    console.print("\n[bold green]✓ Graph DB ingestion complete![/bold green]\n")
+
+
+@app.command("vector")
+def vector_ingestion(
+    paths: List[str] = typer.Argument(
+        ...,
+        help="Paths to codebases to ingest into vector DB",
+    ),
+    exclude: List[str] = typer.Option(
+        [],
+        "--exclude",
+        "-e",
+        help="Extra gitignore-style globs to skip (repeatable)",
+    ),
+    workers: int = typer.Option(
+        config.INGESTION_MAX_WORKERS,
+        "--workers",
+        "-w",
+        help="Global number of file workers shared by all projects",
+    ),
+    llm_concurrency: int = typer.Option(
+        config.LLM_MAX_CONCURRENCY,
+        "--llm-concurrency",
+        help="Maximum concurrent LLM summarization calls across all projects",
+    ),
+    catalog: bool = typer.Option(
+        True,
+        "--catalog/--no-catalog",
+        help="Also record ingested nodes in the local catalog",
+    ),
+    export_jsonl: Optional[Path] = typer.Option(
+        None,
+        "--export-jsonl",
+        help="Directory to export ingested nodes to as <project>.jsonl",
+    ),
+):
+    """
+    Perform vector DB ingestion only.
+
+    This embeds code into the vector database without touching the graph database.
+    """
+    console.print("\n[bold cyan]🚀 Starting Vector DB Ingestion[/bold cyan]\n")
 
+    validated_paths = validate_paths(paths)
+    if not validated_paths:
+        console.print("[red]No valid paths to process[/red]")
+        raise typer.Exit(code=1)
+
+    # Initialize service
+    service = _build_ingestion_service(
+        llm_concurrency, graph=False, vector=True, catalog=catalog, export_jsonl=export_jsonl
+    )
+
+    _run_parallel_ingestion(
+        service,
+        validated_paths,
+        exclude=exclude,
+        workers=workers,
+        with_linking=False,
+        target_label="vector DB",
+    )
+
+    console.print("\n[bold green]✓ Vector DB ingestion complete![/bold green]\n")
+
+
+@app.command("revision")
+def revision_ingestion(
+    repo: str = typer.Argument(
+        ...,
+        help="Path to a git repository",
+    ),
+    revisions: List[str] = typer.Option(
+        ...,
+        "--rev",
+        "-r",
+        help="Branch, tag or commit to index (repeatable)",
+    ),
+    project: Optional[str] = typer.Option(
+        None,
+        "--project",
+        "-p",
+        help="Project name (defaults to the repository folder name)",
+    ),
+    vector: bool = typer.Option(
+        True,
+        "--vector/--no-vector",
+        help="Also index the revisions in the vector database",
+    ),
+    with_semantic_linking: bool = typer.Option(
+        False,
+        "--with-semantic-linking",
+        "-s",
+        help="Perform semantic linking after indexing",
+    ),
+    exclude: List[str] = typer.Option(
+        [],
+        "--exclude",
+        "-e",
+        help="Extra gitignore-style globs to skip (repeatable)",
+    ),
+    workers: int = typer.Option(
+        config.INGESTION_MAX_WORKERS,
+        "--workers",
+        "-w",
+        help="Number of file workers",
+    ),
+    llm_concurrency: int = typer.Option(
+        config.LLM_MAX_CONCURRENCY,
+        "--llm-concurrency",
+        help="Maximum concurrent LLM summarization calls",
+    ),
+    catalog: bool = typer.Option(
+        True,
+        "--catalog/--no-catalog",
+        help="Also record ingested nodes in the local catalog",
+    ),
+):
+    """
+    Index one or more git revisions of a repository into the same project.
+
+    Revisions are read from git directly, without checking them out. Files that are
+    unchanged between revisions are shared, so indexing a branch only costs as much
+    as its changed files.
+    """
+    console.print("\n[bold cyan]🚀 Starting Revision Indexing[/bold cyan]\n")
+
+    validated_paths = validate_paths([repo])
+    if not validated_paths:
+        raise typer.Exit(code=1)
+    repo_path = validated_paths[0]
+    project_name = project or repo_path.resolve().name
+
+    service = _build_ingestion_service(
+        llm_concurrency, graph=True, vector=vector, catalog=catalog, export_jsonl=None
+    )
+
+    failed = False
     with Progress(
         SpinnerColumn(),
         TextColumn("[progress.description]{task.description}"),
         console=console,
     ) as progress:
-        for folder in validated_paths:
-            project_name = folder.name
-            project_names.append(project_name)
-
-            task = progress.add_task(
-                f"Ingesting {project_name} to graph DB...",
-                total=None
-            )
-
+        for revision in revisions:
+            task = progress.add_task(f"Indexing {project_name}@{revision}...", total=None)
             try:
-                service.ingest_codebase(folder, project_name)
-                progress.update(task, description=f"[green]✓[/green] Ingested {project_name}")
-                console.print(f"[green]✓[/green] Successfully ingested to graph DB: {folder}")
+                stats = service.ingest_revision(
+                    repo_path,
+                    project_name,
+                    revision,
+                    max_workers=workers,
+                    extra_ignore_globs=exclude,
+                )
+                progress.update(task, description=f"[green]✓[/green] Indexed {project_name}@{revision}")
+                console.print(
+                    f"[green]✓[/green] {project_name}@{revision}: {stats['files']} files, "
+                    f"{stats['parsed']} parsed, {stats['reused']} shared with other revisions"
+                )
             except Exception as e:
-                progress.update(task, description=f"[red]✗[/red] Failed {project_name}")
-                console.print(f"[red]✗[/red] Failed to ingest {folder}: {e}")
+                failed = True
+                progress.update(task, description=f"[red]✗[/red] Failed {project_name}@{revision}")
+                console.print(f"[red]✗[/red] Failed to index {project_name}@{revision}: {e}")
                 traceback.print_exc()
 
-    # Semantic linking
-    if with_semantic_linking and project_names:
-        console.print("\n[bold cyan]🔗 Starting Semantic Linking[/bold cyan]\n")
-        _run_semantic_linking(project_names)
+    _collect_content_garbage(service.content_store)
 
-    console.print("\n[bold green]✓ Graph DB ingestion complete![/bold green]\n")
+    if with_semantic_linking and not failed:
+        _run_semantic_linking([project_name])
+
+    console.print("\n[bold green]✓ Revision indexing complete![/bold green]\n")
+    if failed:
+        raise typer.Exit(code=1)
+
+
+@app.command("docs")
+def docs_ingestion(
+    paths: List[str] = typer.Argument(
+        ...,
+        help="Paths to codebases whose docs to ingest",
+    ),
+    exclude: List[str] = typer.Option(
+        [],
+        "--exclude",
+        "-e",
+        help="Extra gitignore-style globs to skip (repeatable)",
+    ),
+):
+    """
+    Ingest documentation and build files into the docs collection.
+
+    Covers Markdown, reStructuredText, YAML, properties, pom.xml and requirements
+    files. Files whose content has not changed since the last run are skipped.
+    """
+    console.print("\n[bold cyan]🚀 Starting Docs Ingestion[/bold cyan]\n")
+
+    validated_paths = validate_paths(paths)
+    if not validated_paths:
+        console.print("[red]No valid paths to process[/red]")
+        raise typer.Exit(code=1)
+
+    _run_docs_ingestion(validated_paths, exclude=exclude)
+
+    console.print("\n[bold green]✓ Docs ingestion complete![/bold green]\n")
 
 
 @app.command("link")
@@ -181,12 +433,25 @@ def semantic_linking(
         ...,
         help="Project names to perform semantic linking on",
     ),
+    library: List[str] = typer.Option(
+        [],
+        "--library",
+        "-l",
+        help="Designate a project as a shared library that publishes its exported symbols (repeatable)",
+    ),
+    depends_on: List[str] = typer.Option(
+        [],
+        "--depends-on",
+        "-d",
+        help="Library project the given projects link against (repeatable)",
+    ),
 ):
     """
     Perform semantic linking only.
 
     This creates semantic relationships between code entities in the graph database
-    based on symbol usage, calls, implementations, and overrides.
+    based on symbol usage, calls, implementations, and overrides. Projects that
+    depend on library projects also get CALLS and USES links into them.
     """
     console.print("\n[bold cyan]🔗 Starting Semantic Linking[/bold cyan]\n")
 
@@ -194,22 +459,195 @@ def semantic_linking(
         console.print("[red]No projects specified[/red]")
         raise typer.Exit(code=1)
 
-    _run_semantic_linking(projects)
+    _run_semantic_linking(projects, libraries=library, depends_on=depends_on)
 
     console.print("\n[bold green]✓ Semantic linking complete![/bold green]\n")
 
 
-def _run_semantic_linking(projects: List[str]):
+def _build_ingestion_service(
+        llm_concurrency: int,
+        graph: bool,
+        vector: bool,
+        catalog: bool,
+        export_jsonl: Optional[Path],
+) -> IngestionService:
+    """Internal helper that wires the scheduler, content store and sinks into a service."""
+    scheduler = ModelScheduler(llm_concurrency=llm_concurrency)
+    content_store = ContentStore()
+    return IngestionService(
+        _build_sinks(scheduler, content_store, graph=graph, vector=vector, catalog=catalog, export_jsonl=export_jsonl),
+        get_language_resolution_service(),
+        scheduler=scheduler,
+        content_store=content_store,
+    )
+
+
+def _build_sinks(
+        scheduler: ModelScheduler,
+        content_store: ContentStore,
+        graph: bool,
+        vector: bool,
+        catalog: bool,
+        export_jsonl: Optional[Path],
+) -> List[IngestionSink]:
+    """Internal helper that assembles the enabled ingestion sinks."""
+    sinks: List[IngestionSink] = []
+    if graph:
+        sinks.append(GraphSink(get_graph_db_service()))
+    if vector:
+        sinks.append(VectorSink(get_vector_db(), scheduler, content_store=content_store))
+    if catalog:
+        sinks.append(CatalogSink())
+    if export_jsonl:
+        sinks.append(JsonlExportSink(export_jsonl))
+    return sinks
+
+
+def _run_parallel_ingestion(
+        service,
+        folders: List[Path],
+        exclude: List[str],
+        workers: int,
+        with_linking: bool,
+        target_label: str = "",
+):
+    """
+    Internal helper that ingests all projects at once under one worker budget.
+    Each project is linked as soon as its own ingestion finishes.
+    """
+    linker = SemanticLinkingService(get_graph_db_service(), LibraryIndex()) if with_linking else None
+    suffix = f" to {target_label}" if target_label else ""
+
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        console=console,
+    ) as progress:
+        tasks = {
+            folder.name: progress.add_task(f"Queued {folder.name}...", total=None)
+            for folder in folders
+        }
+
+        # Projects of this batch whose own link has not started. A library checks it when
+        # it publishes and skips relinking them: they read the new exports when they link.
+        not_linked = set(tasks)
+
+        def link(project_name: str):
+            not_linked.discard(project_name)
+            # Only links touching nodes written or removed by this ingestion are recomputed
+            changes = service.pop_changes(project_name)
+            try:
+                linker.run(
+                    project_name,
+                    changes,
+                    on_progress=_link_progress(progress, tasks[project_name], project_name),
+                    skip_dependents=not_linked,
+                )
+            except Exception:
+                service.restore_changes(project_name, changes)
+                raise
+
+        orchestrator = MultiProjectIngestion(
+            ingest_fn=lambda folder, project_name, executor: service.ingest_codebase(
+                folder,
+                project_name,
+                max_workers=workers,
+                extra_ignore_globs=exclude,
+                executor=executor,
+            ),
+            link_fn=link if linker else None,
+            max_workers=workers,
+        )
+
+        def on_event(project_name: str, stage: str, error: Optional[Exception]):
+            task = tasks[project_name]
+            if stage == STAGE_INGESTING:
+                progress.update(task, description=f"Ingesting {project_name}{suffix}...")
+            elif stage == STAGE_INGESTED:
+                progress.update(task, description=f"[green]✓[/green] Ingested {project_name}")
+                console.print(f"[green]✓[/green] Successfully ingested{suffix}: {project_name}")
+            elif stage == STAGE_LINKING:
+                progress.update(task, description=f"Linking {project_name}...")
+            elif stage == STAGE_LINKED:
+                progress.update(task, description=f"[green]✓[/green] Linked {project_name}")
+                console.print(f"[green]✓[/green] Successfully linked: {project_name}")
+            elif stage == STAGE_FAILED:
+                progress.update(task, description=f"[red]✗[/red] Failed {project_name}")
+                console.print(f"[red]✗[/red] Failed {project_name}: {error}")
+                traceback.print_exception(error)
+
+        orchestrator.run(folders, on_event)
+
+    _collect_content_garbage(service.content_store)
+
+
+def _collect_content_garbage(content_store: Optional[ContentStore]):
+    """Internal helper that drops stored contents no ingested node points at any more."""
+    if not content_store:
+        return
+    removed = content_store.collect_garbage()
+    if any(removed.values()):
+        console.print(
+            f"[dim]Content store: dropped {removed['contents']} unreferenced contents "
+            f"and {removed['embeddings']} embeddings[/dim]"
+        )
+
+
+def _link_progress(progress: Progress, task, project_name: str):
+    """Internal helper that shows how many link writes of a project are done."""
+    def on_progress(done: int, total: int):
+        progress.update(task, description=f"Linking {project_name}... {done:,}/{total:,} links written")
+    return on_progress
+
+
+def _run_docs_ingestion(folders: List[Path], exclude: List[str]):
+    """Internal helper that ingests each project's docs in turn."""
+    service = DocsIngestionService(get_vector_db(), content_store=ContentStore())
+
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        console=console,
+    ) as progress:
+        for folder in folders:
+            project_name = folder.name
+            task = progress.add_task(f"Ingesting docs of {project_name}...", total=None)
+            try:
+                stats = service.ingest_docs(folder, project_name, extra_ignore_globs=exclude)
+                progress.update(task, description=f"[green]✓[/green] Ingested docs of {project_name}")
+                console.print(
+                    f"[green]✓[/green] Docs of {project_name}: {stats['files']} files, "
+                    f"{stats['unchanged']} unchanged, {stats['chunks']} chunks written, "
+                    f"{stats['removed']} removed"
+                )
+            except Exception as e:
+                progress.update(task, description=f"[red]✗[/red] Failed {project_name}")
+                console.print(f"[red]✗[/red] Failed to ingest docs of {project_name}: {e}")
+                traceback.print_exc()
+
+
+def _run_semantic_linking(projects: List[str], libraries: List[str] = (), depends_on: List[str] = ()):
     """Internal helper to run semantic linking."""
     graph_db_service = get_graph_db_service()
-    semantic_linking_service = SemanticLinkingService(graph_db_service)
+    library_index = LibraryIndex()
+    semantic_linking_service = SemanticLinkingService(graph_db_service, library_index)
+
+    for name in libraries:
+        library_index.add_library(name)
+    if depends_on:
+        for project in projects:
+            library_index.add_dependencies(project, depends_on)
+        # Dependencies being linked right now pick up the exports below themselves
+        for name in depends_on:
+            if name not in projects and graph_db_service.project_exists(name):
+                semantic_linking_service.publish_library(name, skip=projects)
 
     with Progress(
         SpinnerColumn(),
         TextColumn("[progress.description]{task.description}"),
         console=console,
     ) as progress:
-        for project in projects:
+        for position, project in enumerate(projects):
             task = progress.add_task(
                 f"Linking {project}...",
                 total=None
@@ -221,7 +659,12 @@ def _run_semantic_linking(projects: List[str]):
                 continue
 
             try:
-                semantic_linking_service.run(project)
+                semantic_linking_service.run(
+                    project,
+                    on_progress=_link_progress(progress, task, project),
+                    # Projects linked later in this loop read the new exports themselves
+                    skip_dependents=projects[position + 1:],
+                )
                 progress.update(task, description=f"[green]✓[/green] Linked {project}")
                 console.print(f"[green]✓[/green] Successfully linked: {project}")
             except Exception as e:
@@ -230,6 +673,12 @@ def _run_semantic_linking(projects: List[str]):
                 traceback.print_exc()
 
 
+def _open_content_store() -> Optional[ContentStore]:
+    """Opens the content store only if an ingestion has already created it."""
+    path = Path(config.JAICA_DATA_DIR) / "content.sqlite3"
+    return ContentStore(path) if path.exists() else None
+
+
 @app.command("status")
 def show_status():
     """
@@ -259,19 +708,35 @@ def show_status():
         """)
 
         if result:
+            content_store = _open_content_store()
+
             table = Table(title="Ingested Projects")
             table.add_column("Project", style="cyan", no_wrap=True)
             table.add_column("Files", style="magenta")
             table.add_column("Code Nodes", style="green")
+            table.add_column("Dedupe", style="yellow")
 
             for row in result:
+                project = row.get("project", "N/A")
+                dedupe = "-"
+                if content_store:
+                    dedupe = f"{content_store.stats(project)['dedupe_ratio']:.1%}"
                 table.add_row(
-                    str(row.get("project", "N/A")),
+                    str(project),
                     str(row.get("file_count", 0)),
                     str(row.get("node_count", 0)),
+                    dedupe,
                 )
 
             console.print(table)
+
+            if content_store:
+                stats = content_store.stats()
+                console.print(
+                    f"\n[bold]Content store:[/bold] {stats['nodes']} nodes share "
+                    f"{stats['unique_contents']} unique contents "
+                    f"(dedupe ratio [yellow]{stats['dedupe_ratio']:.1%}[/yellow])"
+                )
         else:
             console.print("[yellow]No projects found in database[/yellow]")
 
@@ -295,8 +760,11 @@ def show_info():
   [cyan]full[/cyan]     - Complete ingestion pipeline (vector DB + graph DB + semantic linking)
   [cyan]vector[/cyan]   - Ingest codebase into vector database only
   [cyan]graph[/cyan]    - Ingest codebase into graph database only
+  [cyan]revision[/cyan] - Index git revisions (branches/tags) of a repository into one project
+  [cyan]docs[/cyan]     - Ingest documentation and build files into the docs collection
   [cyan]link[/cyan]     - Perform semantic linking on existing graph data
   [cyan]status[/cyan]   - Show status of ingested projects
+  [cyan]models[/cyan]   - Fetch, verify or pin the local model bundle (fetch | verify | pin)
   [cyan]info[/cyan]     - Display this information
 
 [bold]Usage Examples:[/bold]
@@ -307,15 +775,30 @@ def show_info():
   # Graph ingestion with semantic linking
   python -m src.app.cli graph /path/to/project --with-semantic-linking
 
-  # Vector DB ingestion only
+  # Vector DB ingestion only (no graph writes)
   python -m src.app.cli vector /path/to/project1 /path/to/project2
 
+  # Also export every ingested node as JSONL
+  python -m src.app.cli full /path/to/project --export-jsonl ./export
+
+  # Index main and a release branch; unchanged files are shared
+  python -m src.app.cli revision /path/to/repo --rev main --rev release/1.2
+
+  # Ingest Markdown, YAML, pom.xml and requirements files only
+  python -m src.app.cli docs /path/to/project
+
   # Semantic linking for existing projects
   python -m src.app.cli link project_name1 project_name2
 
+  # Link a service against a shared client library project
+  python -m src.app.cli link orders --depends-on clientlib
+
   # Check project status
   python -m src.app.cli status
 
+  # Download models once, then run without network access (JAICA_OFFLINE=1)
+  python -m src.app.cli models fetch
+
 [bold]Notes:[/bold]
 
   • Multiple paths/projects can be specified for batch processing
@@ -327,6 +810,111 @@ def show_info():
     console.print()
 
 
+# -------------------------
+# Model bundle
+# -------------------------
+
+models_app = typer.Typer(help="Manage the local model bundle used for offline runs")
+app.add_typer(models_app, name="models")
+
+
+@models_app.command("fetch")
+def fetch_models(
+    force: bool = typer.Option(
+        False,
+        "--force",
+        help="Re-download artifacts that are already present",
+    ),
+):
+    """
+    Download the classifier, tokenizer and embedding artifacts into JAICA_MODEL_DIR.
+
+    Downloads stream to disk, resume after interruptions and are checked by SHA256.
+    """
+    from src.app.models import model_bundle
+
+    console.print(f"\n[bold cyan]📦 Fetching models into[/bold cyan] {model_bundle.model_dir()}\n")
+
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        console=console,
+    ) as progress:
+        task = progress.add_task("Starting...", total=None)
+        received = {}
+
+        def on_chunk(artifact, size):
+            received[artifact.relative_path] = received.get(artifact.relative_path, 0) + size
+            mb = received[artifact.relative_path] / (1024 * 1024)
+            progress.update(task, description=f"{artifact.relative_path} ({mb:.1f} MB)")
+
+        try:
+            results = model_bundle.fetch(force=force, progress=on_chunk)
+        except Exception as e:
+            progress.stop()
+            console.print(f"[red]✗[/red] Failed to fetch models: {e}")
+            raise typer.Exit(code=1)
+        progress.update(task, description="[green]✓[/green] Done")
+
+    for artifact, status in results:
+        console.print(f"  [green]✓[/green] {artifact.relative_path} [dim]({status})[/dim]")
+    console.print()
+
+
+@models_app.command("verify")
+def verify_models():
+    """
+    Check every artifact in JAICA_MODEL_DIR against its pinned SHA256.
+
+    Artifacts without a pinned digest fail; run `jaica models pin` to record them.
+    """
+    from src.app.models import model_bundle
+
+    console.print(f"\n[bold cyan]🔍 Verifying models in[/bold cyan] {model_bundle.model_dir()}\n")
+
+    results = model_bundle.verify()
+    table = Table(title="Model Bundle")
+    table.add_column("Artifact", style="cyan", no_wrap=True)
+    table.add_column("Status")
+    colors = {"ok": "green", "missing": "yellow"}
+    for artifact, status in results:
+        table.add_row(artifact.relative_path, f"[{colors.get(status, 'red')}]{status}[/]")
+    console.print(table)
+    console.print()
+
+    if any(status == "unpinned" for _, status in results):
+        console.print(
+            f"[yellow]⚠[/yellow] Unpinned artifacts: run [bold]jaica models pin[/bold] "
+            f"and commit {model_bundle.PINS_FILE.name}\n"
+        )
+    if any(status != "ok" for _, status in results):
+        raise typer.Exit(code=1)
+
+
+@models_app.command("pin")
+def pin_models():
+    """
+    Pin every model repository to its current commit and record artifact digests.
+
+    Downloads all artifacts at the resolved commits into JAICA_MODEL_DIR and writes
+    src/app/models/model_pins.json. Review the artifacts, then commit the file.
+    """
+    from src.app.models import model_bundle
+
+    console.print(f"\n[bold cyan]📌 Pinning models into[/bold cyan] {model_bundle.PINS_FILE}\n")
+
+    try:
+        with console.status("Downloading artifacts at pinned commits..."):
+            pins = model_bundle.pin()
+    except Exception as e:
+        console.print(f"[red]✗[/red] Failed to pin models: {e}")
+        raise typer.Exit(code=1)
+
+    for repo, repo_pin in sorted(pins.items()):
+        console.print(f"  [green]✓[/green] {repo} @ {repo_pin['revision']} [dim]({len(repo_pin['sha256'])} files)[/dim]")
+    console.print()
+
+
 def main():
     """Entry point for the CLI."""
     app()
@@ -1,6 +1,43 @@
-CODE_CLASSIFIER_MODEL_URL = "https://huggingface.co/josipmusa/code-classifier/resolve/main/code_classifier.onnx"
-CODE_CLASSIFIER_LABEL_URL = "https://huggingface.co/josipmusa/code-classifier/resolve/main/labels.json"
+import os
+
+# Model revisions default to the commits pinned in src/app/models/model_pins.json; setting one overrides the pin
+CODE_CLASSIFIER_REPO = "josipmusa/code-classifier"
+CODE_CLASSIFIER_REVISION = os.getenv("JAICA_CLASSIFIER_REVISION")
+CODE_CLASSIFIER_TOKENIZER_REPO = "microsoft/codebert-base"
+CODE_CLASSIFIER_TOKENIZER_REVISION = os.getenv("JAICA_TOKENIZER_REVISION")
+EMBEDDING_MODEL_REPO = "BAAI/bge-small-en-v1.5"
+EMBEDDING_MODEL_REVISION = os.getenv("JAICA_EMBEDDING_REVISION")
+CODE_CLASSIFIER_MAX_LENGTH = int(os.getenv("JAICA_CLASSIFIER_MAX_LENGTH", "256"))
+CODE_CLASSIFIER_BATCH_SIZE = int(os.getenv("JAICA_CLASSIFIER_BATCH_SIZE", "32"))
+CODE_CLASSIFIER_INTRA_OP_THREADS = int(os.getenv("JAICA_CLASSIFIER_INTRA_OP_THREADS", "0"))
+CODE_CLASSIFIER_INTER_OP_THREADS = int(os.getenv("JAICA_CLASSIFIER_INTER_OP_THREADS", "0"))
+CODE_CLASSIFIER_GRAPH_OPTIMIZATION = os.getenv("JAICA_CLASSIFIER_GRAPH_OPTIMIZATION", "all")
 MAIN_LLM_MODEL = 'qwen2.5:3b-instruct'
+JAICA_DATA_DIR = os.getenv("JAICA_DATA_DIR", os.path.join(os.path.expanduser("~"), ".jaica"))
+JAICA_MODEL_DIR = os.getenv("JAICA_MODEL_DIR", os.path.join(JAICA_DATA_DIR, "models"))
+JAICA_OFFLINE = os.getenv("JAICA_OFFLINE", "false").lower() in ("1", "true", "yes")
+INGESTION_MAX_FILE_BYTES = int(os.getenv("JAICA_MAX_FILE_BYTES", "1000000"))
+INGESTION_IGNORE_GLOBS = [g.strip() for g in os.getenv("JAICA_IGNORE_GLOBS", "").split(",") if g.strip()]
+INGESTION_MAX_WORKERS = int(os.getenv("JAICA_INGESTION_WORKERS", "4"))
+LLM_MAX_CONCURRENCY = int(os.getenv("JAICA_LLM_CONCURRENCY", "2"))
+EMBEDDING_MAX_CONCURRENCY = int(os.getenv("JAICA_EMBEDDING_CONCURRENCY", "1"))
+LINKING_MAX_PARALLEL = int(os.getenv("JAICA_LINKING_PARALLEL", "2"))
+LINKING_INCREMENTAL_MAX_NODES = int(os.getenv("JAICA_LINKING_INCREMENTAL_MAX_NODES", "5000"))
+GRAPH_FETCH_SIZE = int(os.getenv("JAICA_GRAPH_FETCH_SIZE", "2000"))
+GRAPH_MAX_POOL_SIZE = int(os.getenv("JAICA_GRAPH_MAX_POOL_SIZE", "50"))
+GRAPH_ACQUISITION_TIMEOUT = float(os.getenv("JAICA_GRAPH_ACQUISITION_TIMEOUT", "60"))
+GRAPH_MAX_RETRY_TIME = float(os.getenv("JAICA_GRAPH_MAX_RETRY_TIME", "30"))
+GRAPH_SLOW_QUERY_MS = int(os.getenv("JAICA_GRAPH_SLOW_QUERY_MS", "2000"))
+GRAPH_CACHE_MB = int(os.getenv("JAICA_GRAPH_CACHE_MB", "64"))
+GRAPH_CACHE_TTL = float(os.getenv("JAICA_GRAPH_CACHE_TTL", "300"))
+GRAPH_CACHE_GENERATION_TTL = float(os.getenv("JAICA_GRAPH_CACHE_GENERATION_TTL", "2"))
+LINK_WRITE_BATCH_SIZE = int(os.getenv("JAICA_LINK_WRITE_BATCH_SIZE", "5000"))
+LINK_WRITE_PARALLEL = int(os.getenv("JAICA_LINK_WRITE_PARALLEL", "4"))
+LANGUAGE_CACHE_SIZE = int(os.getenv("JAICA_LANGUAGE_CACHE_SIZE", "50000"))
+CHUNK_WINDOW_LINES = int(os.getenv("JAICA_CHUNK_WINDOW_LINES", "120"))
+CHUNK_OVERLAP_LINES = int(os.getenv("JAICA_CHUNK_OVERLAP_LINES", "20"))
+DOCS_CHUNK_MAX_CHARS = int(os.getenv("JAICA_DOCS_CHUNK_MAX_CHARS", "1500"))
+DOCS_EMBED_BATCH_SIZE = int(os.getenv("JAICA_DOCS_EMBED_BATCH_SIZE", "64"))
 DEFAULT_SYSTEM_PROMPT = """
 You are a helpful and concise AI assistant. 
 Always provide accurate and clear answers. 
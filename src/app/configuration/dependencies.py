@@ -1,36 +1,127 @@
-from src.app.configuration import config
-from src.app.configuration.vector_db import VectorDB
-from src.app.configuration.graph_db import GraphDB
-from src.app.models.code_classifier.code_classifier import CodeClassifier
-from src.app.services.code_analysis_service import CodeAnalysisService
-from src.app.services.graph_db_service import GraphDBService
-from src.app.services.pipelines.graph_pipeline import GraphReasoningPipeline
-from src.app.services.pipelines.hybrid_pipeline import HybridPipeline
-from src.app.services.pipelines.pipeline_router import PipelineRouter
-from src.app.services.pipelines.rag_pipeline import RagPipeline
-from src.app.services.pipelines.test_analysis_pipeline import TestAnalysisPipeline
-
-code_classifier_instance = CodeClassifier(config.CODE_CLASSIFIER_MODEL_URL, config.CODE_CLASSIFIER_LABEL_URL)
-vector_db_instance = VectorDB()
-graph_db_instance = GraphDB()
-graph_db_service_instance = GraphDBService(graph_db=graph_db_instance)
-rag_pipeline_instance = RagPipeline(db=vector_db_instance)
-graph_reasoning_pipeline_instance = GraphReasoningPipeline(graph_db_service=graph_db_service_instance)
-hybrid_pipeline_instance = HybridPipeline(rag_pipeline=rag_pipeline_instance, graph_pipeline=graph_reasoning_pipeline_instance)
-code_analysis_service_instance = CodeAnalysisService(code_classifier=code_classifier_instance)
-test_analysis_pipeline_instance = TestAnalysisPipeline(graph_db_service=graph_db_service_instance, code_analysis_service=code_analysis_service_instance)
-pipeline_router_instance = PipelineRouter(rag_pipeline=rag_pipeline_instance, graph_reasoning_pipeline=graph_reasoning_pipeline_instance,
-                                          hybrid_pipeline=hybrid_pipeline_instance, test_analysis_pipeline=test_analysis_pipeline_instance)
-
-
-def get_code_classifier() -> CodeClassifier:
-    return code_classifier_instance
-
-def get_vector_db() -> VectorDB:
-    return vector_db_instance
-
-def get_pipeline_router() -> PipelineRouter:
-    return pipeline_router_instance
-
-def get_graph_db_service() -> GraphDBService:
-    return graph_db_service_instance
\ No newline at end of file
+"""
+Lazily constructed service providers.
+
+Nothing is built, and no heavy module (torch, transformers, sentence_transformers,
+chromadb, onnxruntime, neo4j) is imported, until a provider is first called. Each
+provider builds its instance once and returns it on every later call, so commands
+like `jaica status` only pay for the services they actually use.
+"""
+
+import functools
+import threading
+from typing import TYPE_CHECKING, Callable, TypeVar
+
+if TYPE_CHECKING:
+    from src.app.configuration.graph_db import AsyncGraphDB, GraphDB
+    from src.app.configuration.vector_db import VectorDB
+    from src.app.models.code_classifier.code_classifier import CodeClassifier
+    from src.app.services.code_analysis_service import CodeAnalysisService
+    from src.app.services.graph_db_service import AsyncGraphDBService, GraphDBService
+    from src.app.services.graph_query_cache import GraphQueryCache
+    from src.app.services.language_resolution_service import LanguageResolutionService
+    from src.app.services.pipelines.graph_pipeline import AsyncGraphReasoningPipeline, GraphReasoningPipeline
+    from src.app.services.pipelines.hybrid_pipeline import HybridPipeline
+    from src.app.services.pipelines.pipeline_router import PipelineRouter
+    from src.app.services.pipelines.rag_pipeline import RagPipeline
+    from src.app.services.pipelines.test_analysis_pipeline import AsyncTestAnalysisPipeline
+
+T = TypeVar("T")
+
+# Re-entrant because providers call other providers while building
+_provider_lock = threading.RLock()
+
+
+def lazy_provider(factory: Callable[[], T]) -> Callable[[], T]:
+    """Turns a factory into a provider that builds its instance once, on first use."""
+    instance = []
+
+    @functools.wraps(factory)
+    def provider() -> T:
+        if not instance:
+            with _provider_lock:
+                if not instance:
+                    instance.append(factory())
+        return instance[0]
+
+    provider.is_initialized = lambda: bool(instance)
+    return provider
+
+
+@lazy_provider
+def get_code_classifier() -> "CodeClassifier":
+    from src.app.models.code_classifier.code_classifier import CodeClassifier
+    return CodeClassifier()
+
+@lazy_provider
+def get_language_resolution_service() -> "LanguageResolutionService":
+    from src.app.services.language_resolution_service import LanguageResolutionService
+    # The classifier is only needed for ambiguous snippets, so it is resolved on first use too
+    return LanguageResolutionService(code_classifier_provider=get_code_classifier)
+
+@lazy_provider
+def get_vector_db() -> "VectorDB":
+    from src.app.configuration.vector_db import VectorDB
+    return VectorDB()
+
+@lazy_provider
+def get_graph_db() -> "GraphDB":
+    from src.app.configuration.graph_db import GraphDB
+    return GraphDB()
+
+@lazy_provider
+def get_graph_query_cache() -> "GraphQueryCache":
+    from src.app.services.graph_query_cache import GraphQueryCache
+    return GraphQueryCache()
+
+@lazy_provider
+def get_graph_db_service() -> "GraphDBService":
+    from src.app.services.graph_db_service import GraphDBService
+    return GraphDBService(graph_db=get_graph_db(), query_cache=get_graph_query_cache())
+
+@lazy_provider
+def get_async_graph_db() -> "AsyncGraphDB":
+    from src.app.configuration.graph_db import AsyncGraphDB
+    return AsyncGraphDB()
+
+@lazy_provider
+def get_async_graph_db_service() -> "AsyncGraphDBService":
+    from src.app.services.graph_db_service import AsyncGraphDBService
+    # Constraints and indexes are created by the sync service, which ingestion always builds
+    return AsyncGraphDBService(graph_db=get_async_graph_db(), query_cache=get_graph_query_cache())
+
+@lazy_provider
+def get_code_analysis_service() -> "CodeAnalysisService":
+    from src.app.services.code_analysis_service import CodeAnalysisService
+    return CodeAnalysisService(language_resolver=get_language_resolution_service())
+
+@lazy_provider
+def get_rag_pipeline() -> "RagPipeline":
+    from src.app.services.pipelines.rag_pipeline import RagPipeline
+    return RagPipeline(db=get_vector_db())
+
+@lazy_provider
+def get_graph_reasoning_pipeline() -> "GraphReasoningPipeline":
+    from src.app.services.pipelines.graph_pipeline import GraphReasoningPipeline
+    return GraphReasoningPipeline(graph_db_service=get_graph_db_service())
+
+@lazy_provider
+def get_async_graph_reasoning_pipeline() -> "AsyncGraphReasoningPipeline":
+    from src.app.services.pipelines.graph_pipeline import AsyncGraphReasoningPipeline
+    return AsyncGraphReasoningPipeline(graph_db_service=get_async_graph_db_service())
+
+@lazy_provider
+def get_hybrid_pipeline() -> "HybridPipeline":
+    from src.app.services.pipelines.hybrid_pipeline import HybridPipeline
+    return HybridPipeline(rag_pipeline=get_rag_pipeline(), graph_pipeline=get_graph_reasoning_pipeline())
+
+@lazy_provider
+def get_async_test_analysis_pipeline() -> "AsyncTestAnalysisPipeline":
+    from src.app.services.pipelines.test_analysis_pipeline import AsyncTestAnalysisPipeline
+    return AsyncTestAnalysisPipeline(graph_db_service=get_async_graph_db_service(),
+                                     code_analysis_service=get_code_analysis_service())
+
+@lazy_provider
+def get_pipeline_router() -> "PipelineRouter":
+    from src.app.services.pipelines.pipeline_router import PipelineRouter
+    return PipelineRouter(rag_pipeline=get_rag_pipeline(), graph_reasoning_pipeline=get_async_graph_reasoning_pipeline(),
+                          hybrid_pipeline=get_hybrid_pipeline(), test_analysis_pipeline=get_async_test_analysis_pipeline())
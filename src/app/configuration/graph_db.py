@@ -1,38 +1,206 @@
 import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
 
-from neo4j import GraphDatabase
+from neo4j import READ_ACCESS, WRITE_ACCESS, AsyncGraphDatabase, GraphDatabase, ResultSummary
 from dotenv import load_dotenv
 
+from src.app.configuration import config
+
 load_dotenv()
 
-class GraphDB:
+
+def _connection_settings() -> Tuple[str, Tuple[str, str], Optional[str]]:
+    """URI, auth and database from the environment; None lets the server pick its default database."""
+    uri = os.getenv("NEO4J_URI")
+    user = os.getenv("NEO4J_USERNAME")
+    password = os.getenv("NEO4J_PASSWORD")
+    if not uri or not user or not password:
+        raise RuntimeError("Missing Neo4j environment variables")
+    return uri, (user, password), os.getenv("NEO4J_DATABASE") or None
+
+
+def _driver_options() -> dict:
+    return {
+        "max_connection_pool_size": config.GRAPH_MAX_POOL_SIZE,
+        "connection_acquisition_timeout": config.GRAPH_ACQUISITION_TIMEOUT,
+        "max_transaction_retry_time": config.GRAPH_MAX_RETRY_TIME,
+    }
+
+
+class _QueryTimings:
+    """Calls, total and slowest duration per access mode; slow queries are printed."""
+
     def __init__(self):
-        uri = os.getenv("NEO4J_URI")
-        user = os.getenv("NEO4J_USERNAME")
-        password = os.getenv("NEO4J_PASSWORD")
-        if not uri or not user or not password:
-            raise RuntimeError("Missing Neo4j environment variables")
+        self._lock = threading.Lock()
+        # access mode -> [calls, total seconds, max seconds]
+        self._timings: Dict[str, List[float]] = {}
+
+    def record(self, mode: str, query: str, elapsed: float):
+        with self._lock:
+            timing = self._timings.setdefault(mode, [0, 0.0, 0.0])
+            timing[0] += 1
+            timing[1] += elapsed
+            timing[2] = max(timing[2], elapsed)
+        if config.GRAPH_SLOW_QUERY_MS and elapsed * 1000 >= config.GRAPH_SLOW_QUERY_MS:
+            statement = " ".join(query.split())
+            print(f"Slow Neo4j {mode} ({elapsed * 1000:.0f}ms): {statement[:160]}")
 
-        self.driver = GraphDatabase.driver(uri, auth=(user, password))
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            return {
+                mode: {"calls": int(calls), "total_ms": round(total * 1000, 1), "max_ms": round(slowest * 1000, 1)}
+                for mode, (calls, total, slowest) in self._timings.items()
+            }
+
+
+class GraphDB:
+    """
+    Neo4j access through managed transactions. Reads and writes run as transaction
+    functions (`execute_read` / `execute_write`), so the driver routes them to
+    readers or the leader and retries them on transient errors and leader switches;
+    results are consumed before the session closes. Every call is timed.
+
+    All sessions share one bookmark manager, so a read routed to a follower waits
+    until it has applied every write this instance made before it.
+    """
+
+    def __init__(self):
+        uri, auth, self.database = _connection_settings()
+        self.driver = GraphDatabase.driver(uri, auth=auth, **_driver_options())
+        self.bookmark_manager = GraphDatabase.bookmark_manager()
+        self._timings = _QueryTimings()
 
     def close(self):
         self.driver.close()
 
-    def run(self, query: str, params: dict = None):
-        with self.driver.session() as session:
-            return session.run(query, params or {})
+    # -------------------------
+    # Sessions & timing
+    # -------------------------
+
+    def _session(self, access_mode: str, fetch_size: Optional[int] = None):
+        return self.driver.session(
+            database=self.database,
+            default_access_mode=access_mode,
+            fetch_size=fetch_size or config.GRAPH_FETCH_SIZE,
+            bookmark_manager=self.bookmark_manager,
+        )
 
-    def run_get_single(self, query: str, params: dict = None):
-        with self.driver.session() as session:
-            result = session.run(query, params or {})
-            record = result.single()
-            return dict(record) if record else None
+    @contextmanager
+    def _timed(self, mode: str, query: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._timings.record(mode, query, time.perf_counter() - start)
 
-    def run_get_list(self, query: str, params: dict = None):
+    def timings(self) -> Dict[str, dict]:
+        """Calls, total and slowest duration per access mode since startup."""
+        return self._timings.snapshot()
+
+    # -------------------------
+    # Transactions
+    # -------------------------
+
+    def execute_write(self, query: str, params: dict = None) -> ResultSummary:
+        """
+        Runs `query` in a managed write transaction. The driver retries it on
+        transient errors such as deadlocks and leader switches.
+        """
+        with self._timed("write", query), self._session(WRITE_ACCESS) as session:
+            return session.execute_write(lambda tx: tx.run(query, params or {}).consume())
+
+    def execute_read(self, query: str, params: dict = None) -> List[dict]:
+        """Runs `query` in a managed read transaction, routed to a reader, and returns every record."""
+        with self._timed("read", query), self._session(READ_ACCESS) as session:
+            return session.execute_read(lambda tx: [dict(record) for record in tx.run(query, params or {})])
+
+    def run(self, query: str, params: dict = None) -> ResultSummary:
+        """Schema changes and writes that return nothing; the result is consumed."""
+        return self.execute_write(query, params)
+
+    def iter_records(self, query: str, params: dict = None, fetch_size: Optional[int] = None) -> Iterator[dict]:
+        """
+        Yields one dict per record while the session stays open. The driver pulls
+        `fetch_size` records at a time, so the full result is never held in memory.
+        A stream cannot be replayed, so it is a routed read without retries.
+        """
+        with self._timed("stream", query), self._session(READ_ACCESS, fetch_size) as session:
+            for record in session.run(query, params or {}):
+                yield dict(record)
+
+    def run_get_single(self, query: str, params: dict = None, write: bool = False) -> Optional[dict]:
+        records = self.run_get_list(query, params, write)
+        return records[0] if records else None
+
+    def run_get_list(self, query: str, params: dict = None, write: bool = False) -> List[dict]:
         """
         Returns a list of dicts for each record.
-        Each dict maps field name -> value.
+        Each dict maps field name -> value. Queries that write must pass `write=True`.
         """
-        with self.driver.session() as session:
-            result = session.run(query, params or {})
-            return [dict(record) for record in result]
+        if not write:
+            return self.execute_read(query, params)
+        with self._timed("write", query), self._session(WRITE_ACCESS) as session:
+            return session.execute_write(lambda tx: [dict(record) for record in tx.run(query, params or {})])
+
+
+class AsyncGraphDB:
+    """
+    GraphDB on the async driver, for request handlers that run on the event loop.
+    A query waiting on Neo4j only suspends its coroutine, so one worker can serve
+    many concurrent requests without holding a thread for each. Like GraphDB, its
+    sessions share one bookmark manager for causally consistent reads.
+    """
+
+    def __init__(self):
+        uri, auth, self.database = _connection_settings()
+        self.driver = AsyncGraphDatabase.driver(uri, auth=auth, **_driver_options())
+        self.bookmark_manager = AsyncGraphDatabase.bookmark_manager()
+        self._timings = _QueryTimings()
+
+    async def close(self):
+        await self.driver.close()
+
+    def _session(self, access_mode: str):
+        return self.driver.session(
+            database=self.database,
+            default_access_mode=access_mode,
+            fetch_size=config.GRAPH_FETCH_SIZE,
+            bookmark_manager=self.bookmark_manager,
+        )
+
+    @asynccontextmanager
+    async def _timed(self, mode: str, query: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._timings.record(mode, query, time.perf_counter() - start)
+
+    def timings(self) -> Dict[str, dict]:
+        return self._timings.snapshot()
+
+    async def execute_write(self, query: str, params: dict = None) -> ResultSummary:
+        async def work(tx):
+            result = await tx.run(query, params or {})
+            return await result.consume()
+
+        async with self._timed("write", query), self._session(WRITE_ACCESS) as session:
+            return await session.execute_write(work)
+
+    async def execute_read(self, query: str, params: dict = None) -> List[dict]:
+        async def work(tx):
+            result = await tx.run(query, params or {})
+            return [dict(record) async for record in result]
+
+        async with self._timed("read", query), self._session(READ_ACCESS) as session:
+            return await session.execute_read(work)
+
+    async def run_get_single(self, query: str, params: dict = None) -> Optional[dict]:
+        records = await self.execute_read(query, params)
+        return records[0] if records else None
+
+    async def run_get_list(self, query: str, params: dict = None) -> List[dict]:
+        return await self.execute_read(query, params)
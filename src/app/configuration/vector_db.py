@@ -5,9 +5,6 @@ from chromadb.api.types import EmbeddingFunction
 from chromadb.api.models.Collection import Collection
 from dotenv import load_dotenv
 
-from sentence_transformers import SentenceTransformer
-import torch
-
 load_dotenv()
 
 
@@ -55,9 +52,16 @@ class VectorDB:
                 settings=Settings(anonymized_telemetry=False)
             )
 
-            # Load embedding model on GPU
+            # torch and sentence_transformers take seconds to import, so only load them here
+            import torch
+            from sentence_transformers import SentenceTransformer
+
+            from src.app.models import model_bundle
+
+            # Load embedding model on GPU, from the local model bundle
             model = SentenceTransformer(
-                model_name_or_path="BAAI/bge-small-en-v1.5",
+                model_name_or_path=str(model_bundle.ensure_group(model_bundle.GROUP_EMBEDDING)),
+                local_files_only=True,
                 device="cuda" if torch.cuda.is_available() else "cpu"
             )
 
@@ -92,6 +96,12 @@ class VectorDB:
     def insert(self, collection: Collection, texts, metadatas, ids):
         collection.add(documents=texts, metadatas=metadatas, ids=ids)
 
+    def upsert(self, collection: Collection, texts, metadatas, ids, embeddings=None):
+        collection.upsert(documents=texts, metadatas=metadatas, ids=ids, embeddings=embeddings)
+
+    def embed(self, texts):
+        return self.embedding_fn.embed_documents(texts)
+
     def query(self, collection: Collection, query_text, n_results=5, where=None):
         #Perform manual embedding here due to chromadb not invoking _call_ properly in embedding
         embedding_vector = self.embedding_fn.embed_query(query_text)
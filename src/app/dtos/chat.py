@@ -8,6 +8,8 @@ from src.app.dtos.intent import Intent
 class ChatRequest(BaseModel):
     prompt: str
     project_name: Optional[str] = None
+    # Git revision (branch, tag or SHA name used at ingestion); None searches every revision
+    revision: Optional[str] = None
 
 class RetrievedFile(BaseModel):
     path: str
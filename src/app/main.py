@@ -1,8 +1,20 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from src.app.configuration.dependencies import get_async_graph_db
 from src.app.routes import chat, status
 from fastapi.middleware.cors import CORSMiddleware
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # The async driver's connections belong to this event loop
+    if get_async_graph_db.is_initialized():
+        await get_async_graph_db().close()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
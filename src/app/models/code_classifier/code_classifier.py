@@ -1,64 +1,121 @@
 import json
 import os
-import requests
-import numpy as np
-import onnxruntime as ort
-from transformers import AutoTokenizer
+from typing import TYPE_CHECKING, List, Optional
+
+from src.app.configuration import config
+from src.app.models import model_bundle
+
+# onnxruntime, transformers and numpy are imported on first use so that importing
+# this module (e.g. for type hints) stays cheap
+if TYPE_CHECKING:
+    import onnxruntime as ort
+
+GRAPH_OPTIMIZATION_LEVELS = {
+    "disable": "ORT_DISABLE_ALL",
+    "basic": "ORT_ENABLE_BASIC",
+    "extended": "ORT_ENABLE_EXTENDED",
+    "all": "ORT_ENABLE_ALL",
+}
+
+
+def build_session_options(
+        intra_op_threads: int = config.CODE_CLASSIFIER_INTRA_OP_THREADS,
+        inter_op_threads: int = config.CODE_CLASSIFIER_INTER_OP_THREADS,
+        optimization_level: str = config.CODE_CLASSIFIER_GRAPH_OPTIMIZATION,
+) -> "ort.SessionOptions":
+    import onnxruntime as ort
+
+    options = ort.SessionOptions()
+    # 0 lets ONNX Runtime pick its own default
+    options.intra_op_num_threads = intra_op_threads
+    options.inter_op_num_threads = inter_op_threads
+    level = GRAPH_OPTIMIZATION_LEVELS.get(optimization_level.lower(), "ORT_ENABLE_ALL")
+    options.graph_optimization_level = getattr(ort.GraphOptimizationLevel, level)
+    return options
 
 
 class CodeClassifier:
-    def __init__(self, model_url, labels_url, model_name="code_classifier.onnx",
-                 backbone_model="microsoft/codebert-base"):
-
-        model_path = os.path.join(os.path.dirname(__file__), model_name)
-        label_path = os.path.join(os.path.dirname(__file__), "labels.json")
-
-        # Download ONNX model if missing
-        if model_url and not os.path.exists(model_path):
-            print("Downloading ONNX code classifier model...")
-            r = requests.get(model_url)
-            with open(model_path, "wb") as f:
-                f.write(r.content)
-            print("Download complete.")
-
-        # Download labels if missing
-        if labels_url and not os.path.exists(label_path):
-            print("Downloading labels...")
-            r = requests.get(labels_url)
-            with open(label_path, "wb") as f:
-                f.write(r.content)
-            print("Download complete.")
+    def __init__(self, model_dir: Optional[str] = None, tokenizer_dir: Optional[str] = None,
+                 model_name="code_classifier.onnx",
+                 max_length: int = config.CODE_CLASSIFIER_MAX_LENGTH,
+                 batch_size: int = config.CODE_CLASSIFIER_BATCH_SIZE,
+                 session_options: Optional["ort.SessionOptions"] = None):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        # Artifacts come from the local model bundle; missing ones are fetched once
+        # (streamed and checksummed) unless JAICA_OFFLINE is set
+        model_dir = model_dir or model_bundle.ensure_group(model_bundle.GROUP_CLASSIFIER)
+        tokenizer_dir = tokenizer_dir or model_bundle.ensure_group(model_bundle.GROUP_TOKENIZER)
+        model_path = os.path.join(model_dir, model_name)
+        label_path = os.path.join(model_dir, "labels.json")
 
         providers = ["CUDAExecutionProvider", "CPUExecutionProvider"]
-        self.session = ort.InferenceSession(model_path, providers=providers)
+        self.session = ort.InferenceSession(
+            model_path,
+            sess_options=session_options or build_session_options(),
+            providers=providers,
+        )
 
-        self.tokenizer = AutoTokenizer.from_pretrained(backbone_model)
+        self.tokenizer = AutoTokenizer.from_pretrained(str(tokenizer_dir), local_files_only=True)
+        self.max_length = max_length
+        self.batch_size = batch_size
+
+        # Models exported with a fixed sequence axis must still be padded to that width
+        seq_dim = self.session.get_inputs()[0].shape[1]
+        self.fixed_length = seq_dim if isinstance(seq_dim, int) else None
 
         with open(label_path) as f:
             self.classes = json.load(f)
 
     def predict(self, code_snippet: str) -> str:
-        encoded = self.tokenizer(
-            code_snippet,
-            padding="max_length",
+        return self.predict_batch([code_snippet])[0]
+
+    def predict_batch(self, code_snippets: List[str]) -> List[str]:
+        """
+        Classifies many snippets in a few session runs. Snippets are tokenized once
+        without padding, sorted by token length and run in buckets padded only to
+        the longest sequence in each bucket.
+        """
+        if not code_snippets:
+            return []
+
+        import numpy as np
+
+        max_length = self.fixed_length or self.max_length
+        token_ids = self.tokenizer(
+            code_snippets,
+            padding=False,
             truncation=True,
-            max_length=512,
-            return_tensors="np"  # IMPORTANT: NumPy for ONNX
-        )
+            max_length=max_length,
+        )["input_ids"]
 
-        # ONNXRuntime requires int64 (int64 = numpy.int64)
-        input_ids = encoded["input_ids"].astype("int64")
-        attention_mask = encoded["attention_mask"].astype("int64")
+        pad_id = self.tokenizer.pad_token_id
+        order = sorted(range(len(code_snippets)), key=lambda i: len(token_ids[i]))
+        predictions: List[Optional[str]] = [None] * len(code_snippets)
 
-        outputs = self.session.run(
-            None,
-            {
-                "input_ids": input_ids,
-                "attention_mask": attention_mask
-            }
-        )
+        for start in range(0, len(order), self.batch_size):
+            bucket = order[start:start + self.batch_size]
+            width = self.fixed_length or max(len(token_ids[i]) for i in bucket)
+
+            # ONNXRuntime requires int64 (int64 = numpy.int64)
+            input_ids = np.full((len(bucket), width), pad_id, dtype=np.int64)
+            attention_mask = np.zeros((len(bucket), width), dtype=np.int64)
+            for row, i in enumerate(bucket):
+                ids = token_ids[i]
+                input_ids[row, :len(ids)] = ids
+                attention_mask[row, :len(ids)] = 1
+
+            outputs = self.session.run(
+                None,
+                {
+                    "input_ids": input_ids,
+                    "attention_mask": attention_mask
+                }
+            )
 
-        logits = outputs[0]
-        pred_idx = int(np.argmax(logits, axis=-1)[0])
+            logits = outputs[0]
+            for i, pred_idx in zip(bucket, np.argmax(logits, axis=-1)):
+                predictions[i] = self.classes[int(pred_idx)]
 
-        return self.classes[pred_idx]
+        return predictions
@@ -16,8 +16,8 @@ torch.onnx.export(
     input_names=["input_ids", "attention_mask"],
     output_names=["logits"],
     dynamic_axes={
-        "input_ids": {0: "batch"},
-        "attention_mask": {0: "batch"},
+        "input_ids": {0: "batch", 1: "sequence"},
+        "attention_mask": {0: "batch", 1: "sequence"},
         "logits": {0: "batch"}
     },
     opset_version=17
@@ -0,0 +1,380 @@
+"""
+Local model bundle.
+
+Holds every model artifact the services need (ONNX code classifier, its tokenizer
+and the embedding model) in one directory, so containers and air-gapped hosts run
+without reaching the Hugging Face hub at runtime.
+
+Downloads stream to disk in chunks, resume from a `.part` file after interruptions
+and are verified by SHA256. `model_pins.json`, next to this module, pins every hub
+repository to a commit and every artifact to its digest; `verify` fails for any
+artifact without a pinned digest. `pin` resolves the revisions to commits, downloads
+the artifacts at those commits and writes the pins file to be committed.
+
+Usage (also available as `jaica models fetch|verify|pin`):
+
+    python -m src.app.models.model_bundle fetch
+    python -m src.app.models.model_bundle verify
+    python -m src.app.models.model_bundle pin
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.app.configuration import config
+
+LOCK_FILE_NAME = "bundle.lock.json"
+PINS_FILE = Path(__file__).with_name("model_pins.json")
+CHUNK_SIZE = 1024 * 1024
+DOWNLOAD_TIMEOUT = (10, 60)  # connect, read (seconds)
+
+GROUP_CLASSIFIER = "classifier"
+GROUP_TOKENIZER = "tokenizer"
+GROUP_EMBEDDING = "embedding"
+
+COMMIT_SHA = re.compile(r"[0-9a-f]{40}")
+
+
+def _load_pins() -> Dict[str, dict]:
+    """Repository -> {"revision": commit SHA, "sha256": {file: digest}}, from PINS_FILE."""
+    try:
+        return json.loads(PINS_FILE.read_text(encoding="utf-8")).get("repos", {})
+    except (OSError, ValueError):
+        return {}
+
+
+PINS = _load_pins()
+
+
+def _hub_url(repo: str, revision: str, file_name: str) -> str:
+    return f"https://huggingface.co/{repo}/resolve/{revision}/{file_name}"
+
+
+class ModelArtifact:
+    __slots__ = ("group", "repo", "revision", "file_name", "relative_path")
+
+    def __init__(self, group: str, repo: str, revision: str, file_name: str):
+        self.group = group
+        self.repo = repo
+        self.revision = revision
+        self.file_name = file_name
+        self.relative_path = f"{group}/{file_name}"
+
+    @property
+    def url(self) -> str:
+        return _hub_url(self.repo, self.revision, self.file_name)
+
+    @property
+    def pinned_sha256(self) -> Optional[str]:
+        """The pinned digest; none when the revision was overridden away from the pinned commit."""
+        pin = PINS.get(self.repo, {})
+        if pin.get("revision") != self.revision:
+            return None
+        return pin.get("sha256", {}).get(self.file_name)
+
+
+def _revision(repo: str, override: Optional[str]) -> str:
+    # Without a pin or an override the moving "main" is fetched, and verify reports it unpinned
+    return override or PINS.get(repo, {}).get("revision") or "main"
+
+
+def _hub_artifacts(group: str, repo: str, override: Optional[str], files: Iterable[str]) -> List[ModelArtifact]:
+    revision = _revision(repo, override)
+    return [ModelArtifact(group, repo, revision, f) for f in files]
+
+
+ARTIFACTS: List[ModelArtifact] = (
+    _hub_artifacts(
+        GROUP_CLASSIFIER,
+        config.CODE_CLASSIFIER_REPO,
+        config.CODE_CLASSIFIER_REVISION,
+        ("code_classifier.onnx", "labels.json"),
+    )
+    + _hub_artifacts(
+        GROUP_TOKENIZER,
+        config.CODE_CLASSIFIER_TOKENIZER_REPO,
+        config.CODE_CLASSIFIER_TOKENIZER_REVISION,
+        ("config.json", "vocab.json", "merges.txt", "tokenizer_config.json", "special_tokens_map.json"),
+    )
+    + _hub_artifacts(
+        GROUP_EMBEDDING,
+        config.EMBEDDING_MODEL_REPO,
+        config.EMBEDDING_MODEL_REVISION,
+        (
+            "config.json",
+            "config_sentence_transformers.json",
+            "model.safetensors",
+            "modules.json",
+            "sentence_bert_config.json",
+            "special_tokens_map.json",
+            "tokenizer.json",
+            "tokenizer_config.json",
+            "vocab.txt",
+            "1_Pooling/config.json",
+        ),
+    )
+)
+
+
+class ModelBundleError(RuntimeError):
+    pass
+
+
+# -------------------------
+# Paths
+# -------------------------
+
+def model_dir() -> Path:
+    return Path(config.JAICA_MODEL_DIR)
+
+
+def group_dir(group: str, root: Optional[Path] = None) -> Path:
+    return (root or model_dir()) / group
+
+
+def artifacts_for(groups: Optional[Iterable[str]] = None) -> List[ModelArtifact]:
+    if groups is None:
+        return list(ARTIFACTS)
+    groups = set(groups)
+    return [a for a in ARTIFACTS if a.group in groups]
+
+
+def is_group_present(group: str, root: Optional[Path] = None) -> bool:
+    root = root or model_dir()
+    return all((root / a.relative_path).is_file() for a in artifacts_for([group]))
+
+
+# -------------------------
+# Lock file
+# -------------------------
+
+_lock_file_mutex = threading.Lock()
+
+
+def _read_lock(root: Path) -> Dict[str, str]:
+    try:
+        return json.loads((root / LOCK_FILE_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_lock(root: Path, digests: Dict[str, str]):
+    tmp = root / (LOCK_FILE_NAME + ".tmp")
+    tmp.write_text(json.dumps(digests, indent=2, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, root / LOCK_FILE_NAME)
+
+
+def expected_sha256(artifact: ModelArtifact, root: Path) -> Optional[str]:
+    """The pinned digest, else the one recorded when the artifact was first downloaded."""
+    return artifact.pinned_sha256 or _read_lock(root).get(artifact.relative_path)
+
+
+def sha256_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# -------------------------
+# Download
+# -------------------------
+
+def download_artifact(artifact: ModelArtifact, root: Path, progress=None, check: bool = True) -> str:
+    """
+    Streams one artifact to disk, resuming a previous partial download when the
+    server supports range requests. Returns the SHA256 of the finished file, which
+    must match the expected digest unless `check` is off.
+    """
+    import requests
+
+    target = root / artifact.relative_path
+    part = target.with_name(target.name + ".part")
+    target.parent.mkdir(parents=True, exist_ok=True)
+
+    digest = hashlib.sha256()
+    offset = 0
+    if part.exists():
+        with open(part, "rb") as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+                offset += len(chunk)
+
+    headers = {"Range": f"bytes={offset}-"} if offset else {}
+    with requests.get(artifact.url, stream=True, timeout=DOWNLOAD_TIMEOUT, headers=headers) as response:
+        if offset and response.status_code == 416:
+            # The partial file is already complete
+            pass
+        else:
+            response.raise_for_status()
+            if offset and response.status_code != 206:
+                # Server ignored the range; start over
+                digest = hashlib.sha256()
+                offset = 0
+            mode = "ab" if offset else "wb"
+            with open(part, mode) as f:
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    if not chunk:
+                        continue
+                    f.write(chunk)
+                    digest.update(chunk)
+                    if progress:
+                        progress(artifact, len(chunk))
+
+    sha256 = digest.hexdigest()
+    expected = expected_sha256(artifact, root) if check else None
+    if expected and expected != sha256:
+        part.unlink(missing_ok=True)
+        raise ModelBundleError(
+            f"Checksum mismatch for {artifact.relative_path}: expected {expected}, got {sha256}"
+        )
+
+    os.replace(part, target)
+    return sha256
+
+
+def fetch(
+        groups: Optional[Iterable[str]] = None,
+        root: Optional[Path] = None,
+        force: bool = False,
+        progress=None,
+) -> List[Tuple[ModelArtifact, str]]:
+    """
+    Downloads missing (or, with `force`, all) artifacts of the given groups and
+    records their digests. Returns (artifact, status) pairs.
+    """
+    root = root or model_dir()
+    root.mkdir(parents=True, exist_ok=True)
+    results = []
+
+    for artifact in artifacts_for(groups):
+        target = root / artifact.relative_path
+        if target.is_file() and not force:
+            results.append((artifact, "present"))
+            continue
+
+        if force and target.is_file():
+            target.unlink()
+        sha256 = download_artifact(artifact, root, progress)
+
+        with _lock_file_mutex:
+            digests = _read_lock(root)
+            digests[artifact.relative_path] = sha256
+            _write_lock(root, digests)
+        results.append((artifact, "downloaded"))
+
+    return results
+
+
+def verify(groups: Optional[Iterable[str]] = None, root: Optional[Path] = None) -> List[Tuple[ModelArtifact, str]]:
+    """
+    Checks every artifact against its pinned digest. A digest merely recorded on
+    first download proves nothing about what the hub served, so it does not count.
+    Status is one of: ok, missing, unpinned, mismatch.
+    """
+    root = root or model_dir()
+    results = []
+    for artifact in artifacts_for(groups):
+        target = root / artifact.relative_path
+        if not target.is_file():
+            results.append((artifact, "missing"))
+            continue
+        expected = artifact.pinned_sha256
+        if not expected:
+            results.append((artifact, "unpinned"))
+            continue
+        results.append((artifact, "ok" if sha256_file(target) == expected else "mismatch"))
+    return results
+
+
+def resolve_commit(repo: str, revision: str) -> str:
+    """The commit SHA a branch or tag of a hub repository points at."""
+    if COMMIT_SHA.fullmatch(revision):
+        return revision
+    import requests
+
+    response = requests.get(f"https://huggingface.co/api/models/{repo}/revision/{revision}", timeout=DOWNLOAD_TIMEOUT)
+    response.raise_for_status()
+    return response.json()["sha"]
+
+
+def pin(root: Optional[Path] = None, progress=None) -> Dict[str, dict]:
+    """
+    Resolves every repository's revision to a commit, downloads all artifacts at
+    that commit into the bundle and writes their digests to PINS_FILE. Review the
+    artifacts and commit the file; afterwards fetch uses the pinned commits.
+    """
+    root = root or model_dir()
+    root.mkdir(parents=True, exist_ok=True)
+    commits = {repo: resolve_commit(repo, revision) for repo, revision in {
+        (a.repo, a.revision) for a in ARTIFACTS
+    }}
+
+    pins: Dict[str, dict] = {}
+    for artifact in ARTIFACTS:
+        pinned = ModelArtifact(artifact.group, artifact.repo, commits[artifact.repo], artifact.file_name)
+        (root / pinned.relative_path).unlink(missing_ok=True)
+        sha256 = download_artifact(pinned, root, progress, check=False)
+        repo_pin = pins.setdefault(pinned.repo, {"revision": pinned.revision, "sha256": {}})
+        repo_pin["sha256"][pinned.file_name] = sha256
+
+    with _lock_file_mutex:
+        digests = _read_lock(root)
+        for artifact in ARTIFACTS:
+            digests[artifact.relative_path] = pins[artifact.repo]["sha256"][artifact.file_name]
+        _write_lock(root, digests)
+
+    PINS_FILE.write_text(json.dumps({"repos": pins}, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    return pins
+
+
+def ensure_group(group: str) -> Path:
+    """
+    Returns the local directory of a model group, downloading it first when it is
+    missing and offline mode is off.
+    """
+    root = model_dir()
+    if not is_group_present(group, root):
+        if config.JAICA_OFFLINE:
+            raise ModelBundleError(
+                f"Model group '{group}' is missing from {root} and JAICA_OFFLINE is set. "
+                f"Run `jaica models fetch` first."
+            )
+        print(f"Downloading {group} model artifacts to {root}...")
+        fetch([group], root)
+        print("Download complete.")
+    return group_dir(group, root)
+
+
+def main(argv: Optional[List[str]] = None):
+    argv = sys.argv[1:] if argv is None else argv
+    command = argv[0] if argv else "fetch"
+    if command == "fetch":
+        for artifact, status in fetch(force="--force" in argv):
+            print(f"{status:<11} {artifact.relative_path}")
+    elif command == "verify":
+        results = verify()
+        for artifact, status in results:
+            print(f"{status:<11} {artifact.relative_path}")
+        if any(status == "unpinned" for _, status in results):
+            print(f"Unpinned artifacts: run `python -m src.app.models.model_bundle pin` and commit {PINS_FILE.name}")
+        if any(status != "ok" for _, status in results):
+            sys.exit(1)
+    elif command == "pin":
+        for repo, repo_pin in sorted(pin().items()):
+            print(f"{repo_pin['revision']} {repo} ({len(repo_pin['sha256'])} files)")
+        print(f"Wrote {PINS_FILE}")
+    else:
+        print("Usage: python -m src.app.models.model_bundle [fetch [--force] | verify | pin]")
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
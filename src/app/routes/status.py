@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends
-from src.app.configuration.dependencies import get_vector_db, get_graph_db_service
+from src.app.configuration.dependencies import (get_async_graph_db, get_graph_db_service, get_graph_query_cache,
+                                                 get_vector_db)
 from src.app.configuration.vector_db import VectorDB
 from src.app.services.graph_db_service import GraphDBService
 from src.app.configuration.config import MAIN_LLM_MODEL
@@ -36,6 +37,10 @@ def status_endpoint(
     try:
         graph_db_service.graph_db.driver.verify_connectivity()
         status_response["graph_db"] = "connected"
+        status_response["graph_db_queries"] = graph_db_service.graph_db.timings()
+        if get_async_graph_db.is_initialized():
+            status_response["graph_db_async_queries"] = get_async_graph_db().timings()
+        status_response["graph_query_cache"] = get_graph_query_cache().stats()
     except Exception as e:
         status_response["graph_db"] = f"error: {str(e)}"
 
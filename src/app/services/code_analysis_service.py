@@ -4,15 +4,15 @@ from typing import List, Optional, Dict
 
 from src.app.dtos.issue import Issue, IssueType
 from src.app.dtos.test import TestCodeAnalysisResult
-from src.app.models.code_classifier.code_classifier import CodeClassifier
 from src.app.services.detectors.java.java_detector import analyze_java
 from src.app.services.detectors.python.python_detector import analyze_python
 from src.app.services.file_metadata_service import extract_python_code, extract_java_code
+from src.app.services.language_resolution_service import LanguageResolutionService
 
 
 class CodeAnalysisService:
-    def __init__(self, code_classifier: CodeClassifier):
-        self.code_classifier = code_classifier
+    def __init__(self, language_resolver: LanguageResolutionService):
+        self.language_resolver = language_resolver
 
     def analyze_code_for_tests(self, file_path: str, class_name: Optional[str] = None, method_name: Optional[str] = None) -> TestCodeAnalysisResult:
         file_path = Path(file_path)
@@ -29,7 +29,7 @@ class CodeAnalysisService:
             else:
                 return TestCodeAnalysisResult(deep_nesting=False, long_function=False, many_params=False)
 
-        issues = self.analyze_raw_code(code)
+        issues = self.analyze_raw_code(code, str(file_path))
 
         long_function, deep_nesting, many_params = False, False, False
         param_count = None
@@ -51,8 +51,8 @@ class CodeAnalysisService:
         return TestCodeAnalysisResult(deep_nesting=deep_nesting, long_function=long_function, many_params=many_params, param_count=param_count)
 
 
-    def analyze_raw_code(self, code) -> List[Issue]:
-        language = self.code_classifier.predict(code).lower()
+    def analyze_raw_code(self, code, file_path: Optional[str] = None) -> List[Issue]:
+        language = self.language_resolver.resolve(code, file_path).lower()
 
         if language == "python":
             issues = analyze_python(code)
@@ -1,12 +1,84 @@
-from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional, Set, Tuple
 
-from src.app.configuration.graph_db import GraphDB
+from src.app.configuration import config
 from src.app.dtos.graph import GraphOperation
+from src.app.services.graph_query_cache import GraphQueryCache
+
+if TYPE_CHECKING:
+    from src.app.configuration.graph_db import AsyncGraphDB, GraphDB
+
+# Appends a revision to a node's `revisions` list once; the list length is the node's reference count
+_ADD_REVISION = """
+CASE WHEN $revision IN coalesce({alias}.revisions, []) THEN {alias}.revisions
+     ELSE coalesce({alias}.revisions, []) + $revision END
+"""
+
+
+# The only node properties the semantic linker reads; summaries and code stay in the database
+LINK_NODE_FIELDS = (
+    "node_id",
+    "node_kind",
+    "node_name",
+    "file_path",
+    "file_id",
+    "qualified_name",
+    "imports",
+    "symbols_defined",
+    "symbols_used",
+    "extends",
+    "implements",
+    "annotations",
+)
+
+_LINK_PROJECTION = "n {" + ", ".join(f".{f}" for f in LINK_NODE_FIELDS) + "} AS n"
+
+
+# Semantic links are stored as native relationship types, so traversals can expand by type
+SEMANTIC_LINK_TYPES = ("CALLS", "USES", "EXTENDS", "IMPLEMENTS", "OVERRIDES")
+
+_SEMANTIC_LINK_PATTERN = "|".join(SEMANTIC_LINK_TYPES)
+
+# Links written before native types were used; see migrate_semantic_links
+_LEGACY_SEMANTIC_LINK = "SEMANTIC_LINK"
+
+
+def _semantic_link_type(link_type: str) -> str:
+    """Relationship types cannot be query parameters; only known ones are ever formatted in."""
+    if link_type not in SEMANTIC_LINK_TYPES:
+        raise ValueError(f"Unknown semantic link type: {link_type}")
+    return link_type
+
+
+# Deletes those of the Symbol nodes in `symbols` that nothing defines or references any more
+_PRUNE_SYMBOLS = """
+CALL {
+    WITH symbols
+    UNWIND symbols AS s
+    WITH DISTINCT s
+    WHERE NOT (s)<-[:DEFINES|REFERENCES]-()
+    DELETE s
+}
+"""
+
+
+# Ingestion generation per project; see GraphQueryCache
+_GENERATIONS_QUERY = "MATCH (p:Project) RETURN p.name AS name, coalesce(p.generation, 0) AS generation"
+
+
+def _generations(records: List[dict]) -> Dict[str, int]:
+    return {r["name"]: r["generation"] for r in records}
+
+
+def _revision_filter(alias: str) -> str:
+    """Cypher condition restricting `alias` to $revision; a null revision matches everything."""
+    return f"($revision IS NULL OR $revision IN coalesce({alias}.revisions, []))"
 
 
 class GraphDBService:
-    def __init__(self, graph_db: GraphDB):
+    def __init__(self, graph_db: "GraphDB", query_cache: Optional[GraphQueryCache] = None):
         self.graph_db = graph_db
+        self.query_cache = query_cache or GraphQueryCache()
         self._create_constraints()
         self._create_indexes()
 
@@ -20,6 +92,16 @@ class GraphDBService:
             FOR (n:CodeNode)
             REQUIRE n.node_id IS UNIQUE
         """)
+        self.graph_db.run("""
+            CREATE CONSTRAINT code_content_hash_unique IF NOT EXISTS
+            FOR (c:CodeContent)
+            REQUIRE c.node_hash IS UNIQUE
+        """)
+        self.graph_db.run("""
+            CREATE CONSTRAINT symbol_qualified_name_unique IF NOT EXISTS
+            FOR (s:Symbol)
+            REQUIRE (s.project, s.qualified_name) IS UNIQUE
+        """)
 
     def _create_indexes(self):
         self.graph_db.run("""
@@ -38,6 +120,18 @@ class GraphDBService:
                           CREATE INDEX code_node_symbols_defined IF NOT EXISTS
                               FOR (n:CodeNode) ON (n.symbols_defined)
                           """)
+        self.graph_db.run("""
+                          CREATE INDEX code_node_qualified_name IF NOT EXISTS
+                              FOR (n:CodeNode) ON (n.qualified_name)
+                          """)
+        self.graph_db.run("""
+                          CREATE INDEX revision_project_name IF NOT EXISTS
+                              FOR (r:Revision) ON (r.project, r.name)
+                          """)
+        self.graph_db.run("""
+                          CREATE INDEX symbol_project_name IF NOT EXISTS
+                              FOR (s:Symbol) ON (s.project, s.name)
+                          """)
 
     def upsert_node(
             self,
@@ -54,6 +148,14 @@ class GraphDBService:
             symbols_defined: list[str],
             symbols_used: list[str],
             node_hash: str | None = None,
+            revision: str | None = None,
+            qualified_name: str | None = None,
+            file_id: str | None = None,
+            imports: list[str] | None = None,
+            extends: list[str] | None = None,
+            implements: list[str] | None = None,
+            annotations: list[str] | None = None,
+            symbols_used_counts: list[int] | None = None,
     ):
         query = """
         MERGE (n:CodeNode {node_id: $node_id})
@@ -85,12 +187,58 @@ class GraphDBService:
             "symbols_used": symbols_used,
         }
 
+        # Occurrences of each of symbols_used, by position (properties cannot hold maps)
+        if symbols_used_counts is not None:
+            query += "\nSET n.symbols_used_counts = $symbols_used_counts"
+            params["symbols_used_counts"] = symbols_used_counts
+
         if node_hash:
             query += "\nSET n.node_hash = $node_hash"
             params["node_hash"] = node_hash
 
+        if revision:
+            query += "\nSET n.revisions = " + _ADD_REVISION.format(alias="n")
+            params["revision"] = revision
+
+        # Scope data used by the semantic linker to resolve symbols
+        if qualified_name is not None:
+            query += "\nSET n.qualified_name = $qualified_name"
+            params["qualified_name"] = qualified_name
+        if file_id:
+            query += "\nSET n.file_id = $file_id"
+            params["file_id"] = file_id
+        if imports is not None:
+            query += "\nSET n.imports = $imports"
+            params["imports"] = imports
+
+        # Supertype clauses and annotations, from which the linker builds EXTENDS/IMPLEMENTS/OVERRIDES
+        for key, value in (("extends", extends), ("implements", implements), ("annotations", annotations)):
+            if value is not None:
+                query += f"\nSET n.{key} = ${key}"
+                params[key] = value
+
         self.graph_db.run(query, params)
 
+    def attach_content(self, node_id: str, node_hash: str, summary: str):
+        """
+        Points a code node at the shared CodeContent for its hash, replacing the
+        link to any previous version. Identical code in any project shares one
+        CodeContent node.
+        """
+        self.graph_db.run(
+            """
+            MATCH (n:CodeNode {node_id: $node_id})
+            MERGE (c:CodeContent {node_hash: $node_hash})
+            ON CREATE SET c.summary = $summary
+            WITH n, c
+            OPTIONAL MATCH (n)-[old:HAS_CONTENT]->(prev:CodeContent)
+            WHERE prev <> c
+            DELETE old
+            MERGE (n)-[:HAS_CONTENT]->(c)
+            """,
+            {"node_id": node_id, "node_hash": node_hash, "summary": summary},
+        )
+
     def upsert_project(self, project_name: str):
         self.graph_db.run(
             """
@@ -99,6 +247,74 @@ class GraphDBService:
             {"name": project_name},
         )
 
+    # -------------------------
+    # Revisions
+    # -------------------------
+
+    def upsert_revision(self, project_name: str, revision: str, commit: str):
+        self.graph_db.run(
+            """
+            MERGE (p:Project {name: $project})
+            MERGE (r:Revision {project: $project, name: $revision})
+            SET r.commit = $commit,
+                r.indexed_at = timestamp()
+            MERGE (p)-[:HAS_REVISION]->(r)
+            """,
+            {"project": project_name, "revision": revision, "commit": commit},
+        )
+
+    def list_revisions(self, project_name: str) -> List[dict]:
+        query = """
+        MATCH (r:Revision {project: $project})
+        RETURN r.name AS name, r.commit AS commit
+        ORDER BY r.name
+        """
+        return self.graph_db.run_get_list(query, {"project": project_name})
+
+    def existing_node_ids(self, node_ids: List[str]) -> Set[str]:
+        query = """
+        UNWIND $ids AS id
+        MATCH (n:CodeNode {node_id: id})
+        RETURN n.node_id AS node_id
+        """
+        return {r["node_id"] for r in self.graph_db.run_get_list(query, {"ids": node_ids})}
+
+    def add_revision_to_files(self, file_node_ids: List[str], revision: str):
+        """Adds `revision` to the given file nodes and everything they contain."""
+        query = f"""
+        UNWIND $ids AS id
+        MATCH (f:CodeNode {{node_id: id}})
+        OPTIONAL MATCH (f)-[:CONTAINS*]->(n:CodeNode)
+        WITH collect(DISTINCT f) + collect(DISTINCT n) AS nodes
+        UNWIND nodes AS x
+        SET x.revisions = {_ADD_REVISION.format(alias="x")}
+        """
+        for start in range(0, len(file_node_ids), 1000):
+            self.graph_db.run(query, {"ids": file_node_ids[start:start + 1000], "revision": revision})
+
+    def retain_revision_files(self, project_name: str, revision: str, file_node_ids: List[str]):
+        """
+        Removes `revision` from file nodes of the project that are not in
+        `file_node_ids` (and from what they contain), then deletes nodes no revision
+        references any more.
+        """
+        query = """
+        MATCH (f:CodeNode {project: $project, node_kind: 'file'})
+        WHERE $revision IN coalesce(f.revisions, []) AND NOT f.node_id IN $keep
+        OPTIONAL MATCH (f)-[:CONTAINS*]->(n:CodeNode)
+        WITH collect(DISTINCT f) + collect(DISTINCT n) AS nodes
+        UNWIND nodes AS x
+        SET x.revisions = [r IN x.revisions WHERE r <> $revision]
+        WITH x
+        WHERE size(x.revisions) = 0
+        OPTIONAL MATCH (x)-[:DEFINES|REFERENCES]->(s:Symbol)
+        WITH x, collect(s) AS symbols
+        WITH collect(x) AS nodes, reduce(acc = [], l IN collect(symbols) | acc + l) AS symbols
+        FOREACH (x IN nodes | DETACH DELETE x)
+        WITH symbols
+        """ + _PRUNE_SYMBOLS
+        self.graph_db.run(query, {"project": project_name, "revision": revision, "keep": file_node_ids})
+
     def get_node(self, node_id: str) -> Optional[dict]:
         query = """
         MATCH (n:CodeNode {node_id: $node_id})
@@ -123,6 +339,163 @@ class GraphDBService:
         results = self.graph_db.run_get_list(query, params)
         return [dict(r["n"]) for r in results]
 
+    # -------------------------
+    # Linker node loading (projected to LINK_NODE_FIELDS)
+    # -------------------------
+
+    def iter_link_nodes(self, project_name: str, fetch_size: int = config.GRAPH_FETCH_SIZE) -> Iterator[dict]:
+        """Streams every node of the project, projected to the properties the linker needs."""
+        query = f"""
+        MATCH (n:CodeNode {{project: $project}})
+        RETURN {_LINK_PROJECTION}
+        """
+        for record in self.graph_db.iter_records(query, {"project": project_name}, fetch_size=fetch_size):
+            yield record["n"]
+
+    def get_link_nodes_by_ids(self, node_ids: List[str]) -> List[dict]:
+        query = f"""
+        UNWIND $ids AS id
+        MATCH (n:CodeNode {{node_id: id}})
+        RETURN {_LINK_PROJECTION}
+        """
+        return self._link_nodes(query, {"ids": node_ids})
+
+    def get_link_nodes_defining(self, project_name: str, symbols: List[str]) -> List[dict]:
+        """Nodes of the project that define any of `symbols` (bare names)."""
+        query = f"""
+        UNWIND $symbols AS name
+        MATCH (:Symbol {{project: $project, name: name}})<-[:DEFINES]-(n:CodeNode)
+        WHERE n.node_kind <> 'file'
+        WITH DISTINCT n
+        RETURN {_LINK_PROJECTION}
+        """
+        return self._link_nodes(query, {"project": project_name, "symbols": symbols})
+
+    def get_link_nodes_using(self, project_name: str, symbols: List[str]) -> List[dict]:
+        """
+        Nodes of the project that use any of `symbols`, bare or qualified (`util.run`
+        uses `run`), or are named like one of them (and so may override it).
+        """
+        query = f"""
+        CALL {{
+            UNWIND $symbols AS name
+            MATCH (:Symbol {{project: $project, name: name}})<-[:REFERENCES]-(n:CodeNode)
+            RETURN n
+            UNION
+            UNWIND $symbols AS name
+            MATCH (n:CodeNode {{project: $project, node_name: name}})
+            RETURN n
+        }}
+        RETURN {_LINK_PROJECTION}
+        """
+        return self._link_nodes(query, {"project": project_name, "symbols": symbols})
+
+    def get_link_nodes_by_qualified_names(self, project_name: str, qualified_names: List[str]) -> List[dict]:
+        query = f"""
+        UNWIND $names AS name
+        MATCH (n:CodeNode {{project: $project, qualified_name: name}})
+        RETURN {_LINK_PROJECTION}
+        """
+        return self._link_nodes(query, {"project": project_name, "names": qualified_names})
+
+    def get_link_nodes_extending(self, project_name: str, names: List[str]) -> List[dict]:
+        """Types of the project that extend or implement any of `names`, bare or qualified."""
+        query = f"""
+        UNWIND $names AS name
+        MATCH (:Symbol {{project: $project, name: name}})<-[:REFERENCES]-(n:CodeNode)
+        WHERE n.node_kind IN ['class', 'interface', 'enum']
+          AND any(s IN coalesce(n.extends, []) + coalesce(n.implements, []) WHERE last(split(s, '.')) IN $names)
+        WITH DISTINCT n
+        RETURN {_LINK_PROJECTION}
+        """
+        return self._link_nodes(query, {"project": project_name, "names": names})
+
+    def get_link_nodes_contained(self, node_ids: List[str]) -> List[dict]:
+        """Nodes directly contained in any of `node_ids` (the members of a class)."""
+        query = f"""
+        UNWIND $ids AS id
+        MATCH (:CodeNode {{node_id: id}})-[:CONTAINS]->(n:CodeNode)
+        RETURN {_LINK_PROJECTION}
+        """
+        return self._link_nodes(query, {"ids": node_ids})
+
+    def get_link_file_nodes(self, project_name: str, file_node_ids: List[str], file_paths: List[str]) -> List[dict]:
+        query = f"""
+        MATCH (n:CodeNode {{project: $project, node_kind: 'file'}})
+        WHERE n.node_id IN $ids OR n.file_path IN $paths
+        RETURN {_LINK_PROJECTION}
+        """
+        return self._link_nodes(query, {"project": project_name, "ids": file_node_ids, "paths": file_paths})
+
+    def iter_library_exports(self, project_name: str, fetch_size: int = config.GRAPH_FETCH_SIZE) -> Iterator[dict]:
+        """
+        Streams what a library project exports to its dependents: named classes,
+        interfaces, enums, functions and methods that are not underscore-private.
+        """
+        query = """
+        MATCH (n:CodeNode {project: $project})
+        WHERE n.node_kind IN ['class', 'interface', 'enum', 'function', 'method']
+          AND n.qualified_name IS NOT NULL
+          AND NOT n.node_name STARTS WITH '_'
+        RETURN n.node_id AS node_id, n.node_kind AS node_kind,
+               n.node_name AS node_name, n.qualified_name AS qualified_name
+        """
+        yield from self.graph_db.iter_records(query, {"project": project_name}, fetch_size=fetch_size)
+
+    def _link_nodes(self, query: str, params: dict) -> List[dict]:
+        return [record["n"] for record in self.graph_db.iter_records(query, params, fetch_size=config.GRAPH_FETCH_SIZE)]
+
+    def delete_removed_nodes(self, file_node_id: str, keep_ids: List[str]) -> Dict[str, str]:
+        """
+        Deletes nodes under a file that are not in `keep_ids` (code removed from the
+        file), with their links. Returns node ID -> name of what was deleted.
+        """
+        query = """
+        MATCH (f:CodeNode {node_id: $file_id})-[:CONTAINS*]->(n:CodeNode)
+        WHERE NOT n.node_id IN $keep
+        WITH DISTINCT n
+        OPTIONAL MATCH (n)-[:DEFINES|REFERENCES]->(s:Symbol)
+        WITH n, collect(s) AS symbols
+        WITH collect(n) AS nodes,
+             collect({node_id: n.node_id, node_name: n.node_name}) AS removed,
+             reduce(acc = [], l IN collect(symbols) | acc + l) AS symbols
+        FOREACH (n IN nodes | DETACH DELETE n)
+        WITH removed, symbols
+        """ + _PRUNE_SYMBOLS + """
+        UNWIND removed AS r
+        RETURN r.node_id AS node_id, r.node_name AS node_name
+        """
+        results = self.graph_db.run_get_list(query, {"file_id": file_node_id, "keep": keep_ids}, write=True)
+        return {r["node_id"]: r["node_name"] for r in results}
+
+    def delete_missing_files(self, project_name: str, keep_paths: List[str]) -> Dict[str, str]:
+        """
+        Deletes working-tree files of the project whose path is not in `keep_paths`
+        (deleted from disk), with everything they contain and their links. Files
+        indexed for a revision are left to retain_revision_files. Returns node ID ->
+        name of the deleted code nodes.
+        """
+        query = """
+        MATCH (f:CodeNode {project: $project, node_kind: 'file'})
+        WHERE f.revisions IS NULL AND NOT f.file_path IN $keep
+        OPTIONAL MATCH (f)-[:CONTAINS*]->(n:CodeNode)
+        WITH collect(DISTINCT f) + collect(DISTINCT n) AS nodes,
+             collect(DISTINCT {node_id: n.node_id, node_name: n.node_name}) AS removed
+        UNWIND nodes AS x
+        OPTIONAL MATCH (x)-[:DEFINES|REFERENCES]->(s:Symbol)
+        WITH x, removed, collect(s) AS symbols
+        WITH collect(x) AS nodes, removed, reduce(acc = [], l IN collect(symbols) | acc + l) AS symbols
+        FOREACH (x IN nodes | DETACH DELETE x)
+        WITH removed, symbols
+        """ + _PRUNE_SYMBOLS + """
+        UNWIND removed AS r
+        WITH r
+        WHERE r.node_id IS NOT NULL
+        RETURN r.node_id AS node_id, r.node_name AS node_name
+        """
+        results = self.graph_db.run_get_list(query, {"project": project_name, "keep": keep_paths}, write=True)
+        return {r["node_id"]: r["node_name"] for r in results}
+
     def project_exists(self, project_name: str) -> bool:
         query = """
         MATCH (p:Project {name: $name})
@@ -148,6 +521,86 @@ class GraphDBService:
         results = self.graph_db.run_get_list(query, {})
         return [{"name": r["name"], "node_count": r["node_count"]} for r in results]
 
+    # -------------------------
+    # Symbols
+    # -------------------------
+
+    def write_symbols(self, project_name: str, rows: List[dict]):
+        """
+        Replaces the DEFINES and REFERENCES edges of the given nodes. Each row is
+        `{node_id, defines: [{qualified_name, name}], references: [{qualified_name,
+        name, count}]}`; Symbol nodes are merged on (project, qualified_name) and
+        those left unreferenced are deleted.
+        """
+        if not rows:
+            return
+        query = """
+        UNWIND $rows AS row
+        MATCH (n:CodeNode {node_id: row.node_id})
+        OPTIONAL MATCH (n)-[old:DEFINES|REFERENCES]->(prev:Symbol)
+        DELETE old
+        WITH n, row, collect(prev) AS symbols
+        CALL {
+            WITH n, row
+            UNWIND row.defines AS def
+            MERGE (d:Symbol {project: $project, qualified_name: def.qualified_name})
+            ON CREATE SET d.name = def.name
+            MERGE (n)-[:DEFINES]->(d)
+        }
+        CALL {
+            WITH n, row
+            UNWIND row.references AS ref
+            MERGE (s:Symbol {project: $project, qualified_name: ref.qualified_name})
+            ON CREATE SET s.name = ref.name
+            MERGE (n)-[r:REFERENCES]->(s)
+            SET r.count = ref.count
+        }
+        """ + _PRUNE_SYMBOLS
+        self.graph_db.execute_write(query, {"project": project_name, "rows": rows})
+
+    def backfill_symbols(self, project_name: str, batch_size: int = config.LINK_WRITE_BATCH_SIZE):
+        """
+        Writes Symbol edges for nodes ingested before the Symbol model existed, from
+        their stored qualified name and symbols_used, `batch_size` nodes per write
+        transaction. Runs once per project; afterwards it costs one query.
+        """
+        done = self.graph_db.run_get_single(
+            "MATCH (p:Project {name: $project}) RETURN p.symbols_backfilled AS done", {"project": project_name}
+        )
+        if done and done["done"]:
+            return
+
+        query = """
+        MATCH (n:CodeNode {project: $project})
+        WHERE (coalesce(n.qualified_name, '') <> '' OR (n.node_kind <> 'file' AND n.node_name IS NOT NULL))
+          AND NOT (n)-[:DEFINES]->(:Symbol)
+        WITH n
+        LIMIT $batch
+        // Nodes ingested before qualified names were recorded define their bare name
+        WITH n, CASE WHEN coalesce(n.qualified_name, '') = '' THEN n.node_name ELSE n.qualified_name END AS qualified
+        MERGE (d:Symbol {project: $project, qualified_name: qualified})
+        ON CREATE SET d.name = last(split(qualified, '.'))
+        MERGE (n)-[:DEFINES]->(d)
+        WITH n
+        CALL {
+            WITH n
+            WITH n, coalesce(n.symbols_used, []) AS used, coalesce(n.symbols_used_counts, []) AS counts
+            UNWIND range(0, size(used) - 1) AS i
+            MERGE (s:Symbol {project: $project, qualified_name: used[i]})
+            ON CREATE SET s.name = last(split(used[i], '.'))
+            MERGE (n)-[r:REFERENCES]->(s)
+            SET r.count = coalesce(counts[i], 1)
+        }
+        """
+        # Every node in a batch gets a DEFINES edge, so an empty batch creates nothing
+        while self.graph_db.execute_write(
+                query, {"project": project_name, "batch": max(1, batch_size)}
+        ).counters.relationships_created:
+            pass
+        self.graph_db.run(
+            "MATCH (p:Project {name: $project}) SET p.symbols_backfilled = true", {"project": project_name}
+        )
+
     def resolve_symbol(
             self,
             symbol: str,
@@ -155,17 +608,19 @@ class GraphDBService:
             limit: int = 5,
     ) -> list[dict]:
         """
-        Resolves a symbol to nodes that define it.
+        Resolves a symbol, bare (`save`) or qualified (`Repo.save`), to nodes that
+        define it. Seeks the Symbol index by the last segment.
         """
         query = """
-        MATCH (n:CodeNode)
-        WHERE n.project = $project
-          AND $symbol IN n.symbols_defined
+        MATCH (s:Symbol {project: $project, name: $name})<-[:DEFINES]-(n:CodeNode)
+        WHERE s.qualified_name = $symbol OR s.qualified_name ENDS WITH $suffix
         RETURN n
         LIMIT $limit
         """
         params = {
             "symbol": symbol,
+            "name": symbol.rsplit(".", 1)[-1],
+            "suffix": "." + symbol,
             "project": project_name,
             "limit": limit
         }
@@ -218,7 +673,7 @@ class GraphDBService:
             {"project": project_name, "node": node_id, "props": properties or {}},
         )
 
-    def link_batch(self, links: list[dict]):
+    def link_batch(self, links: list[dict], on_progress: Optional[Callable[[int], None]] = None):
         """
         Each link:
         {
@@ -233,14 +688,158 @@ class GraphDBService:
 
         query = """
         UNWIND $links AS link
-        MATCH (a:CodeNode {node_id: link.from})
-        MATCH (b:CodeNode {node_id: link.to})
+        MATCH (a:CodeNode {{node_id: link.from}})
+        MATCH (b:CodeNode {{node_id: link.to}})
         WHERE a <> b
-        MERGE (a)-[r:SEMANTIC_LINK {type: link.type}]->(b)
+        MERGE (a)-[r:{rel_type}]->(b)
         SET r += link.props
         """
 
-        self.graph_db.run(query, {"links": links})
+        self._write_chunked(query, links, on_progress)
+
+    def get_semantic_links(
+            self,
+            project_name: str,
+            from_ids: Optional[List[str]] = None,
+            target_names: Optional[List[str]] = None,
+    ) -> List[dict]:
+        """
+        Semantic links leaving the project's nodes. With `from_ids` or `target_names`
+        only links from those nodes, or to nodes with those names, are returned.
+        """
+        scoped = from_ids is not None or target_names is not None
+        query = f"""
+        MATCH (a:CodeNode {{project: $project}})-[r:{_SEMANTIC_LINK_PATTERN}]->(b:CodeNode)
+        WHERE NOT $scoped OR a.node_id IN $from_ids OR b.node_name IN $names
+        RETURN a.node_id AS from, b.node_id AS to, type(r) AS type,
+               r.confidence AS confidence, r.resolved_by AS resolved_by
+        """
+        params = {
+            "project": project_name,
+            "scoped": scoped,
+            "from_ids": from_ids or [],
+            "names": target_names or [],
+        }
+        return list(self.graph_db.iter_records(query, params, fetch_size=config.GRAPH_FETCH_SIZE))
+
+    def unlink_batch(self, links: list[dict], on_progress: Optional[Callable[[int], None]] = None):
+        """Deletes semantic links identified by their `from`, `to` and `type`."""
+        query = """
+        UNWIND $links AS link
+        MATCH (a:CodeNode {{node_id: link.from}})-[r:{rel_type}]->(b:CodeNode {{node_id: link.to}})
+        DELETE r
+        """
+        self._write_chunked(query, links, on_progress)
+
+    def migrate_semantic_links(
+            self,
+            batch_size: int = config.LINK_WRITE_BATCH_SIZE,
+            on_progress: Optional[Callable[[int], None]] = None,
+    ) -> int:
+        """
+        Rewrites links stored as `SEMANTIC_LINK {type: ...}` as native relationship
+        types, `batch_size` links per write transaction, keeping their properties.
+        Returns how many were migrated; a graph without legacy links costs one query
+        per type.
+        """
+        migrated = 0
+        for link_type in SEMANTIC_LINK_TYPES:
+            query = f"""
+            MATCH (a:CodeNode)-[old:{_LEGACY_SEMANTIC_LINK} {{type: $type}}]->(b:CodeNode)
+            WITH a, b, old
+            LIMIT $batch
+            MERGE (a)-[r:{link_type}]->(b)
+            SET r += properties(old)
+            REMOVE r.type
+            DELETE old
+            """
+            while True:
+                summary = self.graph_db.execute_write(query, {"type": link_type, "batch": max(1, batch_size)})
+                moved = summary.counters.relationships_deleted
+                if not moved:
+                    break
+                migrated += moved
+                if on_progress:
+                    on_progress(moved)
+        return migrated
+
+    def _write_chunked(
+            self,
+            query: str,
+            links: list[dict],
+            on_progress: Optional[Callable[[int], None]] = None,
+            chunk_size: int = config.LINK_WRITE_BATCH_SIZE,
+            max_parallel: int = config.LINK_WRITE_PARALLEL,
+    ):
+        """
+        Runs `query` over `links` in chunks, each in its own retried write transaction,
+        a few at a time. `query` has a `{rel_type}` placeholder and every chunk holds
+        links of one type. Sorting by source node keeps concurrent chunks from locking
+        the same nodes. A failed chunk does not undo the others; failures are raised
+        once every chunk has been attempted. `on_progress` gets the number of links
+        each finished chunk wrote.
+        """
+        by_type: Dict[str, list] = {}
+        for link in sorted(links, key=lambda l: l["from"]):
+            by_type.setdefault(_semantic_link_type(link["type"]), []).append(link)
+
+        chunks = [
+            (query.format(rel_type=link_type), typed[i:i + chunk_size])
+            for link_type, typed in by_type.items()
+            for i in range(0, len(typed), max(1, chunk_size))
+        ]
+        if not chunks:
+            return
+
+        errors = []
+        with ThreadPoolExecutor(max_workers=max(1, min(max_parallel, len(chunks))), thread_name_prefix="link-write") as executor:
+            futures = {
+                executor.submit(self.graph_db.execute_write, chunk_query, {"links": chunk}): chunk
+                for chunk_query, chunk in chunks
+            }
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    errors.append(e)
+                    continue
+                if on_progress:
+                    on_progress(len(futures[future]))
+
+        if errors:
+            raise RuntimeError(f"{len(errors)} of {len(chunks)} link write chunks failed: {errors[0]}") from errors[0]
+
+    # -------------------------
+    # Query cache
+    # -------------------------
+
+    def bump_generation(self, project_name: str):
+        """Marks the project's graph as changed, so cached chat queries that read it are not served again."""
+        self.graph_db.run(
+            "MATCH (p:Project {name: $project}) SET p.generation = coalesce(p.generation, 0) + 1",
+            {"project": project_name},
+        )
+        self.query_cache.invalidate_generations()
+
+    def _cached_list(self, query: str, params: dict) -> List[dict]:
+        if not self.query_cache.enabled:
+            return self.graph_db.run_get_list(query, params)
+
+        generations = self.query_cache.generations()
+        if generations is None:
+            generations = _generations(self.graph_db.run_get_list(_GENERATIONS_QUERY))
+            self.query_cache.set_generations(generations)
+
+        key = self.query_cache.key(generations, query, params)
+        hit, records = self.query_cache.get(key)
+        if not hit:
+            records = self.graph_db.run_get_list(query, params)
+            self.query_cache.put(key, records)
+        return records
+
+    def _cached_single(self, query: str, params: dict) -> Optional[dict]:
+        records = self._cached_list(query, params)
+        return records[0] if records else None
 
     # -------------------------
     # Query helpers
@@ -251,25 +850,13 @@ class GraphDBService:
             name: str,
             project_name: str,
             limit: int = 5,
+            revision: Optional[str] = None,
     ) -> List[dict]:
-        query = """
-        MATCH (n:CodeNode)
-        WHERE n.project = $project
-          AND (
-            n.node_name = $name
-            OR n.node_id ENDS WITH $name
-          )
-        RETURN n
-        LIMIT $limit
         """
-
-        params = {
-            "name": name,
-            "project": project_name,
-            "limit": limit
-        }
-
-        results = self.graph_db.run_get_list(query, params)
+        Nodes defining `name` (bare or qualified, via the Symbol index), or named
+        exactly `name` (file names such as `repo.py`).
+        """
+        results = self._cached_list(*_nodes_by_name_query(name, project_name, limit, revision))
         return [dict(r["n"]) for r in results]
 
     # -------------------------
@@ -281,42 +868,12 @@ class GraphDBService:
             node_id: str,
             operation: GraphOperation,
             max_depth: int = 5,
+            revision: Optional[str] = None,
     ) -> list[dict]:
-
-        op_to_types = {
-            GraphOperation.STRUCTURE: ["CONTAINS"],
-            GraphOperation.CALLS: ["CALLS"],
-            GraphOperation.CALLED_BY: ["CALLS"],
-            GraphOperation.USES: ["USES"],
-            GraphOperation.DEPENDENCIES: ["USES", "CALLS"],
-        }
-
-        if operation not in op_to_types:
-            raise ValueError(operation)
-
-        types = op_to_types[operation]
-
-        # Direction
-        if operation == GraphOperation.CALLED_BY:
-            arrow = f"<-[:SEMANTIC_LINK*1..{max_depth}]-"
-        else:
-            arrow = f"-[:SEMANTIC_LINK*1..{max_depth}]->"
-
-        query = f"""
-        MATCH path = (start:CodeNode {{node_id: $node_id}}){arrow}(target)
-        WHERE ALL(rel IN relationships(path) WHERE rel.type IN $types)
-        RETURN DISTINCT target AS n
-        """
-
-        params = {
-            "node_id": node_id,
-            "types": types
-        }
-
-        results =  self.graph_db.run_get_list(query, params)
+        results = self._cached_list(*_traverse_query(node_id, operation, max_depth, revision))
         return [dict(r["n"]) for r in results]
 
-    def list_methods(self, class_name: Optional[str], project_name: str) -> list[dict]:
+    def list_methods(self, class_name: Optional[str], project_name: str, revision: Optional[str] = None) -> list[dict]:
         """
         If class_name is provided → return methods/functions inside the class.
         If class_name is None → return all top-level functions in the project.
@@ -328,42 +885,27 @@ class GraphDBService:
                 "file_path": str
             }
         """
-        if class_name:
-            query = """
-            MATCH (c:CodeNode {node_kind: 'class', node_name: $class_name, project: $project})
-            OPTIONAL MATCH (c)-[:CONTAINS]->(m:CodeNode)
-            WHERE m.node_kind IN ['method', 'function']
-            RETURN m.node_name AS method_name, c.node_name AS class_name, m.file_path AS file_path
-            """
-            params = {"project": project_name, "class_name": class_name}
-        else:
-            # top-level functions not contained in a class
-            query = """
-            MATCH (m:CodeNode)
-            WHERE m.project = $project AND m.node_kind = 'function'
-              AND NOT ( (:CodeNode {node_kind: 'class', project: $project})-[:CONTAINS]->(m) )
-            RETURN m.node_name AS method_name, NULL AS class_name, m.file_path AS file_path
-            """
-            params = {"project": project_name}
-
-        results = self.graph_db.run_get_list(query, params)
-        return [r for r in results if r.get("method_name")]
+        results = self._cached_list(*_list_methods_query(class_name, project_name, revision))
+        return [dict(r) for r in results if r.get("method_name")]
 
-    def find_class_for_method(self, method_name: str, project_name: str) -> Optional[str]:
+    def find_class_for_method(
+            self,
+            method_name: str,
+            project_name: str,
+            revision: Optional[str] = None,
+    ) -> Optional[str]:
         """
         Returns the class containing the method, or None if it's a module-level function.
         """
-        query = """
-        MATCH (c:CodeNode {node_kind: 'class', project: $project})-[:CONTAINS]->(m:CodeNode)
-        WHERE m.node_name = $method_name AND m.node_kind IN ['method', 'function']
-        RETURN c.node_name AS class_name
-        LIMIT 1
-        """
-        params = {"project": project_name, "method_name": method_name}
-        result = self.graph_db.run_get_single(query, params)
+        result = self._cached_single(*_class_for_method_query(method_name, project_name, revision))
         return result["class_name"] if result else None
 
-    def find_method_or_function_node(self, method_name: str, project_name: str) -> Optional[dict]:
+    def find_method_or_function_node(
+            self,
+            method_name: str,
+            project_name: str,
+            revision: Optional[str] = None,
+    ) -> Optional[dict]:
         """
         Finds a method or module-level function node by name in the given project.
         Returns a dict with:
@@ -374,86 +916,295 @@ class GraphDBService:
             }
         Returns None if not found.
         """
-        query = """
-        MATCH (m:CodeNode)
-        WHERE m.project = $project
-          AND m.node_name = $method_name
-          AND m.node_kind IN ['method', 'function']
-        OPTIONAL MATCH (c:CodeNode {node_kind: 'class', project: $project})-[:CONTAINS]->(m)
-        RETURN m.node_name AS method_name,
-               c.node_name AS class_name,
-               m.file_path AS file_path
-        LIMIT 1
-        """
-        params = {"project": project_name, "method_name": method_name}
-        result = self.graph_db.run_get_single(query, params)
+        result = self._cached_single(*_method_or_function_query(method_name, project_name, revision))
         return dict(result) if result else None
 
-    def is_method_called_externally(self, class_name: Optional[str], method_name: str) -> bool:
+    def is_method_called_externally(self, class_name: Optional[str], method_name: str, project_name: str) -> bool:
         """
-        Returns True if the method/function is called from outside its class.
+        Returns True if the method/function of the project is called from outside its class.
         """
-        if class_name:
-            class_filter = """
-            MATCH (c:CodeNode {node_kind: 'class', node_name: $class_name})-[:CONTAINS]->(m:CodeNode)
-            """
-            params = {"class_name": class_name, "method_name": method_name}
-            external_filter = "AND NOT (caller)-[:CONTAINS]->(m)"
-        else:
-            class_filter = """
-            MATCH (m:CodeNode {node_kind: 'function', node_name: $method_name})
-            """
-            params = {"method_name": method_name}
-            external_filter = ""
+        result = self._cached_single(*_called_externally_query(class_name, method_name, project_name))
+        return result["called_externally"] if result else False
 
-        query = f"""
-        {class_filter}
-        MATCH (caller)-[r:SEMANTIC_LINK]->(m)
-        WHERE m.node_name = $method_name
-          AND r.type = 'CALLS'
-          {external_filter}
-        RETURN COUNT(caller) > 0 AS called_externally
+    def get_class_collaborator_count(self, class_name: str, project_name: str) -> int:
+        """
+        Returns the number of distinct classes that this class of the project depends on.
         """
+        result = self._cached_single(*_collaborator_count_query(class_name, project_name))
+        return result["collaborator_count"] if result else 0
 
-        result = self.graph_db.run_get_single(query, params)
+    def get_method_dependencies(self, class_name: Optional[str], method_name: str, project_name: str) -> list[str]:
+        """
+        Returns a list of classes or methods that the given method/function of the project depends on.
+        """
+        results = self._cached_list(*_method_dependencies_query(class_name, method_name, project_name))
+        return [r["dependency"] for r in results]
+
+
+class AsyncGraphDBService:
+    """
+    The read queries of GraphDBService that chat pipelines run, on the async driver.
+    Schema and writes stay with GraphDBService; both build the same Cypher.
+    """
+
+    def __init__(self, graph_db: "AsyncGraphDB", query_cache: Optional[GraphQueryCache] = None):
+        self.graph_db = graph_db
+        self.query_cache = query_cache or GraphQueryCache()
+
+    async def _cached_list(self, query: str, params: dict) -> List[dict]:
+        if not self.query_cache.enabled:
+            return await self.graph_db.run_get_list(query, params)
+
+        generations = self.query_cache.generations()
+        if generations is None:
+            generations = _generations(await self.graph_db.run_get_list(_GENERATIONS_QUERY))
+            self.query_cache.set_generations(generations)
+
+        key = self.query_cache.key(generations, query, params)
+        hit, records = self.query_cache.get(key)
+        if not hit:
+            records = await self.graph_db.run_get_list(query, params)
+            self.query_cache.put(key, records)
+        return records
+
+    async def _cached_single(self, query: str, params: dict) -> Optional[dict]:
+        records = await self._cached_list(query, params)
+        return records[0] if records else None
+
+    async def find_nodes_by_name(
+            self,
+            name: str,
+            project_name: str,
+            limit: int = 5,
+            revision: Optional[str] = None,
+    ) -> List[dict]:
+        results = await self._cached_list(*_nodes_by_name_query(name, project_name, limit, revision))
+        return [dict(r["n"]) for r in results]
+
+    async def traverse(
+            self,
+            node_id: str,
+            operation: GraphOperation,
+            max_depth: int = 5,
+            revision: Optional[str] = None,
+    ) -> list[dict]:
+        results = await self._cached_list(*_traverse_query(node_id, operation, max_depth, revision))
+        return [dict(r["n"]) for r in results]
+
+    async def list_methods(
+            self,
+            class_name: Optional[str],
+            project_name: str,
+            revision: Optional[str] = None,
+    ) -> list[dict]:
+        results = await self._cached_list(*_list_methods_query(class_name, project_name, revision))
+        return [dict(r) for r in results if r.get("method_name")]
+
+    async def find_class_for_method(
+            self,
+            method_name: str,
+            project_name: str,
+            revision: Optional[str] = None,
+    ) -> Optional[str]:
+        result = await self._cached_single(*_class_for_method_query(method_name, project_name, revision))
+        return result["class_name"] if result else None
+
+    async def find_method_or_function_node(
+            self,
+            method_name: str,
+            project_name: str,
+            revision: Optional[str] = None,
+    ) -> Optional[dict]:
+        result = await self._cached_single(*_method_or_function_query(method_name, project_name, revision))
+        return dict(result) if result else None
+
+    async def is_method_called_externally(self, class_name: Optional[str], method_name: str, project_name: str) -> bool:
+        result = await self._cached_single(*_called_externally_query(class_name, method_name, project_name))
         return result["called_externally"] if result else False
 
-    def get_class_collaborator_count(self, class_name: str) -> int:
-        """
-        Returns the number of distinct classes that this class depends on.
+    async def get_class_collaborator_count(self, class_name: str, project_name: str) -> int:
+        result = await self._cached_single(*_collaborator_count_query(class_name, project_name))
+        return result["collaborator_count"] if result else 0
+
+    async def get_method_dependencies(self, class_name: Optional[str], method_name: str, project_name: str) -> list[str]:
+        results = await self._cached_list(*_method_dependencies_query(class_name, method_name, project_name))
+        return [r["dependency"] for r in results]
+
+
+# -------------------------
+# Chat queries, shared by GraphDBService and AsyncGraphDBService
+# Each returns (query, params)
+# -------------------------
+
+def _nodes_by_name_query(name: str, project_name: str, limit: int, revision: Optional[str]) -> Tuple[str, dict]:
+    query = f"""
+    CALL {{
+        MATCH (s:Symbol {{project: $project, name: $symbol_name}})<-[:DEFINES]-(n:CodeNode)
+        WHERE s.qualified_name = $name OR s.qualified_name ENDS WITH $suffix
+        RETURN n
+        UNION
+        MATCH (n:CodeNode {{project: $project, node_name: $name}})
+        RETURN n
+    }}
+    WITH n
+    WHERE {_revision_filter("n")}
+    RETURN n
+    LIMIT $limit
+    """
+
+    params = {
+        "name": name,
+        "symbol_name": name.rsplit(".", 1)[-1],
+        "suffix": "." + name,
+        "project": project_name,
+        "limit": limit,
+        "revision": revision,
+    }
+    return query, params
+
+
+_OPERATION_LINK_TYPES = {
+    GraphOperation.STRUCTURE: ["CONTAINS"],
+    GraphOperation.CALLS: ["CALLS"],
+    GraphOperation.CALLED_BY: ["CALLS"],
+    GraphOperation.USES: ["USES"],
+    GraphOperation.DEPENDENCIES: ["USES", "CALLS"],
+}
+
+
+def _traverse_query(
+        node_id: str,
+        operation: GraphOperation,
+        max_depth: int,
+        revision: Optional[str],
+) -> Tuple[str, dict]:
+    if operation not in _OPERATION_LINK_TYPES:
+        raise ValueError(operation)
+
+    types = _OPERATION_LINK_TYPES[operation]
+
+    # Native types let Neo4j expand only the relationships asked for
+    pattern = f"{'|'.join(types)}*1..{int(max_depth)}"
+
+    # Direction
+    if operation == GraphOperation.CALLED_BY:
+        arrow = f"<-[:{pattern}]-"
+    else:
+        arrow = f"-[:{pattern}]->"
+
+    query = f"""
+    MATCH path = (start:CodeNode {{node_id: $node_id}}){arrow}(target)
+    WHERE ALL(x IN nodes(path) WHERE {_revision_filter("x")})
+    RETURN DISTINCT target AS n
+    """
+
+    params = {
+        "node_id": node_id,
+        "revision": revision,
+    }
+    return query, params
+
+
+def _list_methods_query(class_name: Optional[str], project_name: str, revision: Optional[str]) -> Tuple[str, dict]:
+    if class_name:
+        query = f"""
+        MATCH (c:CodeNode {{node_kind: 'class', node_name: $class_name, project: $project}})
+        WHERE {_revision_filter("c")}
+        OPTIONAL MATCH (c)-[:CONTAINS]->(m:CodeNode)
+        WHERE m.node_kind IN ['method', 'function']
+        RETURN m.node_name AS method_name, c.node_name AS class_name, m.file_path AS file_path
         """
-        query = """
-        MATCH (c:CodeNode {node_kind: 'class', node_name: $class_name})-[:CONTAINS]->(m:CodeNode)
-        MATCH (m)-[r:SEMANTIC_LINK]->(other:CodeNode {node_kind: 'class'})
-        WHERE r.type IN ['USES', 'CALLS']
-        RETURN COUNT(DISTINCT other) AS collaborator_count
+        params = {"project": project_name, "class_name": class_name, "revision": revision}
+    else:
+        # top-level functions not contained in a class
+        query = f"""
+        MATCH (m:CodeNode)
+        WHERE m.project = $project AND m.node_kind = 'function'
+          AND {_revision_filter("m")}
+          AND NOT ( (:CodeNode {{node_kind: 'class', project: $project}})-[:CONTAINS]->(m) )
+        RETURN m.node_name AS method_name, NULL AS class_name, m.file_path AS file_path
         """
-        params = {"class_name": class_name}
-        result = self.graph_db.run_get_single(query, params)
-        return result["collaborator_count"] if result else 0
+        params = {"project": project_name, "revision": revision}
+    return query, params
+
 
-    def get_method_dependencies(self, class_name: Optional[str], method_name: str) -> list[str]:
+def _class_for_method_query(method_name: str, project_name: str, revision: Optional[str]) -> Tuple[str, dict]:
+    query = f"""
+    MATCH (c:CodeNode {{node_kind: 'class', project: $project}})-[:CONTAINS]->(m:CodeNode)
+    WHERE m.node_name = $method_name AND m.node_kind IN ['method', 'function']
+      AND {_revision_filter("m")}
+    RETURN c.node_name AS class_name
+    LIMIT 1
+    """
+    params = {"project": project_name, "method_name": method_name, "revision": revision}
+    return query, params
+
+
+def _method_or_function_query(method_name: str, project_name: str, revision: Optional[str]) -> Tuple[str, dict]:
+    query = f"""
+    MATCH (m:CodeNode)
+    WHERE m.project = $project
+      AND m.node_name = $method_name
+      AND m.node_kind IN ['method', 'function']
+      AND {_revision_filter("m")}
+    OPTIONAL MATCH (c:CodeNode {{node_kind: 'class', project: $project}})-[:CONTAINS]->(m)
+    RETURN m.node_name AS method_name,
+           c.node_name AS class_name,
+           m.file_path AS file_path
+    LIMIT 1
+    """
+    params = {"project": project_name, "method_name": method_name, "revision": revision}
+    return query, params
+
+
+def _called_externally_query(class_name: Optional[str], method_name: str, project_name: str) -> Tuple[str, dict]:
+    # Callers may live in other projects, e.g. dependents of a library
+    if class_name:
+        class_filter = """
+        MATCH (c:CodeNode {node_kind: 'class', node_name: $class_name, project: $project})-[:CONTAINS]->(m:CodeNode)
         """
-        Returns a list of classes or methods that the given method/function depends on.
+        params = {"project": project_name, "class_name": class_name, "method_name": method_name}
+        external_filter = "AND NOT (caller)-[:CONTAINS]->(m)"
+    else:
+        class_filter = """
+        MATCH (m:CodeNode {node_kind: 'function', node_name: $method_name, project: $project})
         """
-        if class_name:
-            query = """
-            MATCH (c:CodeNode {node_kind: 'class', node_name: $class_name})-[:CONTAINS]->(m:CodeNode)
-            WHERE m.node_name = $method_name AND m.node_kind IN ['method', 'function']
-            MATCH (m)-[r:SEMANTIC_LINK]->(dep:CodeNode)
-            WHERE r.type IN ['USES', 'CALLS']
-            RETURN DISTINCT dep.node_name AS dependency
-            """
-            params = {"class_name": class_name, "method_name": method_name}
-        else:
-            query = """
-            MATCH (m:CodeNode {node_kind: 'function', node_name: $method_name})
-            MATCH (m)-[r:SEMANTIC_LINK]->(dep:CodeNode)
-            WHERE r.type IN ['USES', 'CALLS']
-            RETURN DISTINCT dep.node_name AS dependency
-            """
-            params = {"method_name": method_name}
+        params = {"project": project_name, "method_name": method_name}
+        external_filter = ""
 
-        results = self.graph_db.run_get_list(query, params)
-        return [r["dependency"] for r in results]
+    query = f"""
+    {class_filter}
+    MATCH (caller)-[:CALLS]->(m)
+    WHERE m.node_name = $method_name
+      {external_filter}
+    RETURN COUNT(caller) > 0 AS called_externally
+    """
+    return query, params
 
+
+def _collaborator_count_query(class_name: str, project_name: str) -> Tuple[str, dict]:
+    query = """
+    MATCH (c:CodeNode {node_kind: 'class', node_name: $class_name, project: $project})-[:CONTAINS]->(m:CodeNode)
+    MATCH (m)-[:USES|CALLS]->(other:CodeNode {node_kind: 'class'})
+    RETURN COUNT(DISTINCT other) AS collaborator_count
+    """
+    return query, {"project": project_name, "class_name": class_name}
+
+
+def _method_dependencies_query(class_name: Optional[str], method_name: str, project_name: str) -> Tuple[str, dict]:
+    if class_name:
+        query = """
+        MATCH (c:CodeNode {node_kind: 'class', node_name: $class_name, project: $project})-[:CONTAINS]->(m:CodeNode)
+        WHERE m.node_name = $method_name AND m.node_kind IN ['method', 'function']
+        MATCH (m)-[:USES|CALLS]->(dep:CodeNode)
+        RETURN DISTINCT dep.node_name AS dependency
+        """
+        params = {"project": project_name, "class_name": class_name, "method_name": method_name}
+    else:
+        query = """
+        MATCH (m:CodeNode {node_kind: 'function', node_name: $method_name, project: $project})
+        MATCH (m)-[:USES|CALLS]->(dep:CodeNode)
+        RETURN DISTINCT dep.node_name AS dependency
+        """
+        params = {"project": project_name, "method_name": method_name}
+    return query, params
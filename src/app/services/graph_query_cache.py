@@ -0,0 +1,131 @@
+import json
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from src.app.configuration import config
+
+
+def _approx_size(value: Any) -> int:
+    """Rough in-memory size of a query result, so the cache is bounded by bytes, not entries."""
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_approx_size(k) + _approx_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return sys.getsizeof(value) + sum(_approx_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class GraphQueryCache:
+    """
+    Read-through cache for chat queries, keyed by query, parameters and the
+    ingestion generation of the graph they read.
+
+    Every project carries a generation that ingestion and linking increment. A key
+    for a query scoped to a project includes that project's generation; any other
+    key includes all of them, so chat queries always pass a `project` parameter. Once a generation moves, older entries are never
+    looked up again and age out of the LRU. Generations themselves are re-read at
+    most every `generation_ttl` seconds, which bounds how long another process's
+    ingestion goes unnoticed; within the process it is noticed immediately.
+    """
+
+    def __init__(
+            self,
+            max_bytes: int = config.GRAPH_CACHE_MB * 1024 * 1024,
+            ttl: float = config.GRAPH_CACHE_TTL,
+            generation_ttl: float = config.GRAPH_CACHE_GENERATION_TTL,
+    ):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.generation_ttl = generation_ttl
+        self._lock = threading.Lock()
+        # key -> (expires at, size, records)
+        self._entries: OrderedDict[Hashable, Tuple[float, int, List[dict]]] = OrderedDict()
+        self._bytes = 0
+        self._generations: Optional[Dict[str, int]] = None
+        self._generations_read_at = 0.0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    # -------------------------
+    # Generations
+    # -------------------------
+
+    def generations(self) -> Optional[Dict[str, int]]:
+        """The last read project -> generation map, or None once it is due to be re-read."""
+        with self._lock:
+            if self._generations is None or time.monotonic() - self._generations_read_at > self.generation_ttl:
+                return None
+            return self._generations
+
+    def set_generations(self, generations: Dict[str, int]):
+        with self._lock:
+            self._generations = generations
+            self._generations_read_at = time.monotonic()
+
+    def invalidate_generations(self):
+        """Forces the next lookup to re-read generations; called after this process bumps one."""
+        with self._lock:
+            self._generations = None
+
+    @staticmethod
+    def key(generations: Dict[str, int], query: str, params: dict) -> Hashable:
+        project = params.get("project")
+        if project is not None:
+            generation = (project, generations.get(project, 0))
+        else:
+            generation = tuple(sorted(generations.items()))
+        return generation, query, json.dumps(params, sort_keys=True, default=str)
+
+    # -------------------------
+    # Entries
+    # -------------------------
+
+    def get(self, key: Hashable) -> Tuple[bool, Optional[List[dict]]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                self._drop(key)
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return True, entry[2]
+
+    def put(self, key: Hashable, records: List[dict]):
+        size = _approx_size(records)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic() + self.ttl, size, records)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self._evictions += 1
+
+    def _drop(self, key: Hashable):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 3) if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "evictions": self._evictions,
+            }
@@ -0,0 +1,156 @@
+"""
+Hierarchical chunking of parsed code for the vector index.
+
+- Classes, interfaces and enums are embedded as skeletons: their own lines (header,
+  fields, decorators, docstring) with every member reduced to its signature and
+  summary, so class vectors no longer repeat the members' bodies.
+- Methods and functions are embedded on their own.
+- Members longer than the window size are split into overlapping windows; every
+  window repeats the member's signature and parent so it stays meaningful alone.
+"""
+
+import hashlib
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from src.app.configuration import config
+from src.app.services.ingestion.node_records import NodeRecord
+
+SKELETON_TYPES = {"class", "interface", "enum"}
+MAX_SIGNATURE_LINES = 6
+
+COMMENT_PREFIXES = {
+    "python": "#",
+    "java": "//",
+}
+
+
+@dataclass
+class Chunk:
+    chunk_id: str
+    node: NodeRecord
+    kind: str  # skeleton | member | window
+    text: str
+    index: int = 0
+    count: int = 1
+
+    @property
+    def embedding_key(self) -> str:
+        """
+        Content-store key. Chunk text also depends on the parent, line range and member
+        summaries, not only the node's code, so the text itself is hashed; the node
+        hash prefix is what the store's garbage collection matches refs on.
+        """
+        return f"{self.node.node_hash}:{hashlib.sha256(self.text.encode('utf-8')).hexdigest()}"
+
+
+def _is_signature_end(line: str, language: str) -> bool:
+    stripped = line.rstrip()
+    if language == "python":
+        return stripped.endswith(":")
+    return "{" in stripped or stripped.endswith(";")
+
+
+def signature_lines(code_lines: List[str], language: str) -> List[str]:
+    """The declaration lines of a member, up to where its body starts."""
+    for i, line in enumerate(code_lines[:MAX_SIGNATURE_LINES]):
+        if _is_signature_end(line, language):
+            return code_lines[:i + 1]
+    return code_lines[:1]
+
+
+def class_skeleton(
+        node: NodeRecord,
+        children: List[NodeRecord],
+        summaries: Dict[str, str],
+        language: str,
+) -> str:
+    lines = node.full_code.split("\n")
+    comment = COMMENT_PREFIXES.get(language, "#")
+    first_line = node.start_line
+    out: List[str] = []
+    cursor = 0
+
+    for child in sorted(children, key=lambda c: c.start_line):
+        start, end = child.start_line - first_line, child.end_line - first_line
+        if start < cursor:
+            continue
+        out.extend(lines[cursor:start])
+
+        member_lines = lines[start:end + 1]
+        signature = signature_lines(member_lines, language)
+        out.extend(signature)
+        indent = member_lines[0][:len(member_lines[0]) - len(member_lines[0].lstrip())]
+        summary = child.summary or summaries.get(child.node_hash)
+        if summary:
+            out.append(f"{indent}    {comment} {' '.join(summary.split())}")
+        if len(member_lines) > len(signature):
+            out.append(f"{indent}    ...")
+        cursor = end + 1
+
+    out.extend(lines[cursor:])
+    return "\n".join(out[:node.max_lines])
+
+
+def _document(node: NodeRecord, code: str, extra: Optional[List[str]] = None) -> str:
+    header = [f"Type: {node.node_type}", f"Name: {node.node_name}"]
+    header.extend(extra or [])
+    header.append(f"Summary: {node.summary}")
+    return "\n".join(header) + f"\n\nCode:\n{code}"
+
+
+def build_chunks(
+        nodes: List[NodeRecord],
+        all_nodes: List[NodeRecord],
+        language: str,
+        summaries: Optional[Dict[str, str]] = None,
+        window_lines: int = config.CHUNK_WINDOW_LINES,
+        overlap_lines: int = config.CHUNK_OVERLAP_LINES,
+) -> List[Chunk]:
+    """
+    Builds the chunks for `nodes`. `all_nodes` is every node of the file, used to
+    find class members and parents; `summaries` maps node hash to summary for
+    members that were not re-summarized in this run.
+    """
+    language = language.lower()
+    summaries = summaries or {}
+    by_id = {n.node_id: n for n in all_nodes}
+    children: Dict[str, List[NodeRecord]] = {}
+    for n in all_nodes:
+        if n.parent_id:
+            children.setdefault(n.parent_id, []).append(n)
+
+    step = max(1, window_lines - overlap_lines)
+    chunks: List[Chunk] = []
+
+    for node in nodes:
+        if node.node_type in SKELETON_TYPES:
+            skeleton = class_skeleton(node, children.get(node.node_id, []), summaries, language)
+            chunks.append(Chunk(node.node_id, node, "skeleton", _document(node, skeleton)))
+            continue
+
+        code_lines = node.full_code.split("\n")
+        if len(code_lines) <= window_lines:
+            chunks.append(Chunk(node.node_id, node, "member", _document(node, "\n".join(code_lines))))
+            continue
+
+        parent = by_id.get(node.parent_id) if node.parent_id else None
+        context = [f"Signature: {' '.join(line.strip() for line in signature_lines(code_lines, language))}"]
+        if parent:
+            context.append(f"Parent: {parent.node_type} {parent.node_name}")
+
+        starts = list(range(0, len(code_lines) - overlap_lines, step))
+        for i, start in enumerate(starts):
+            window = code_lines[start:start + window_lines]
+            first, last = node.start_line + start, node.start_line + start + len(window) - 1
+            chunks.append(Chunk(
+                # The first window keeps the node ID so lookups by node ID keep working
+                node.node_id if i == 0 else f"{node.node_id}#w{i}",
+                node,
+                "window",
+                _document(node, "\n".join(window), context + [f"Lines: {first}-{last} (part {i + 1}/{len(starts)})"]),
+                index=i,
+                count=len(starts),
+            ))
+
+    return chunks
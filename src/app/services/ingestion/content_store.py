@@ -0,0 +1,221 @@
+import sqlite3
+import threading
+import time
+import zlib
+from array import array
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from src.app.configuration import config
+
+
+class ContentStore:
+    """
+    Content-addressed store for everything derived from a node's code: the code
+    blob and LLM summary keyed by node hash, and embeddings keyed by node hash and
+    chunk text (see chunking.Chunk.embedding_key). Identical code vendored into many
+    projects or branches is summarized and embedded once.
+
+    A second table records which node IDs point at which hash, which is what the
+    dedupe ratio is computed from. Refs follow the nodes ingestion writes and
+    removes; contents and code embeddings no ref points at are garbage collected.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path or Path(config.JAICA_DATA_DIR) / "content.sqlite3")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # node hash -> summary being computed, so concurrent workers never summarize the same code twice
+        self._inflight: Dict[str, Future] = {}
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS contents (
+                node_hash  TEXT PRIMARY KEY,
+                code       BLOB,
+                summary    TEXT,
+                created_at REAL
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key       TEXT PRIMARY KEY,
+                embedding BLOB NOT NULL
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS refs (
+                node_id   TEXT PRIMARY KEY,
+                project   TEXT NOT NULL,
+                node_hash TEXT NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS refs_project ON refs(project)")
+        self._conn.commit()
+
+    # -------------------------
+    # Summaries & code
+    # -------------------------
+
+    def get_summaries(self, node_hashes: Iterable[str]) -> Dict[str, str]:
+        return dict(self._select("SELECT node_hash, summary FROM contents WHERE summary IS NOT NULL AND node_hash IN", node_hashes))
+
+    def get_code(self, node_hash: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT code FROM contents WHERE node_hash = ?", (node_hash,)).fetchone()
+        return zlib.decompress(row[0]).decode("utf-8") if row and row[0] is not None else None
+
+    def summary_for(self, node_hash: str, code: Callable[[], str], summarize: Callable[[str], str]) -> str:
+        """
+        Returns the stored summary for `node_hash`, or computes and stores it. When
+        several workers ask for the same hash at once, only one calls `summarize`.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT summary FROM contents WHERE node_hash = ? AND summary IS NOT NULL", (node_hash,)
+            ).fetchone()
+            if row:
+                return row[0]
+            future = self._inflight.get(node_hash)
+            owner = future is None
+            if owner:
+                future = self._inflight[node_hash] = Future()
+
+        if not owner:
+            return future.result()
+
+        try:
+            text = code()
+            summary = summarize(text)
+            self.put(node_hash, summary=summary, code=text)
+            future.set_result(summary)
+            return summary
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(node_hash, None)
+
+    def put(self, node_hash: str, summary: Optional[str] = None, code: Optional[str] = None):
+        blob = zlib.compress(code.encode("utf-8")) if code is not None else None
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO contents (node_hash, code, summary, created_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT(node_hash) DO UPDATE SET
+                    code    = COALESCE(contents.code, excluded.code),
+                    summary = COALESCE(excluded.summary, contents.summary)
+                """,
+                (node_hash, blob, summary, time.time()),
+            )
+            self._conn.commit()
+
+    # -------------------------
+    # Embeddings
+    # -------------------------
+
+    def get_embeddings(self, keys: Iterable[str]) -> Dict[str, List[float]]:
+        rows = self._select("SELECT key, embedding FROM embeddings WHERE key IN", keys)
+        return {key: array("f", blob).tolist() for key, blob in rows}
+
+    def put_embeddings(self, embeddings: Dict[str, List[float]]):
+        if not embeddings:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, embedding) VALUES (?, ?)",
+                [(key, array("f", vector).tobytes()) for key, vector in embeddings.items()],
+            )
+            self._conn.commit()
+
+    # -------------------------
+    # References & stats
+    # -------------------------
+
+    def replace_file_refs(
+            self,
+            project_name: str,
+            id_prefix: str,
+            refs: List[Tuple[str, str]],
+            removed: Iterable[str] = (),
+    ):
+        """
+        Records that each (node_id, node_hash) of one file points at that content, and
+        drops refs of the file's nodes (IDs starting with `id_prefix`) that are gone,
+        as well as refs of the `removed` node IDs.
+        """
+        current = {node_id for node_id, _ in refs}
+        prefix = f"{id_prefix}:"
+        with self._lock:
+            stored = self._conn.execute(
+                "SELECT node_id FROM refs WHERE project = ? AND substr(node_id, 1, ?) = ?",
+                (project_name, len(prefix), prefix),
+            ).fetchall()
+            stale = {node_id for (node_id,) in stored if node_id not in current}
+            stale.update(node_id for node_id in removed if node_id not in current)
+            self._conn.executemany("DELETE FROM refs WHERE node_id = ?", [(node_id,) for node_id in stale])
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO refs (node_id, project, node_hash) VALUES (?, ?, ?)",
+                [(node_id, project_name, node_hash) for node_id, node_hash in refs],
+            )
+            self._conn.commit()
+
+    def remove_refs(self, node_ids: Iterable[str]):
+        """Drops the refs of nodes that no longer exist, e.g. those of deleted files."""
+        with self._lock:
+            self._conn.executemany("DELETE FROM refs WHERE node_id = ?", [(node_id,) for node_id in node_ids])
+            self._conn.commit()
+
+    def collect_garbage(self) -> Dict[str, int]:
+        """
+        Deletes contents and code embeddings no ref points at. Run it once ingestion
+        is done: content is stored before the refs of the node that produced it.
+        """
+        with self._lock:
+            inflight = list(self._inflight)
+            contents = self._conn.execute(
+                f"""
+                DELETE FROM contents
+                WHERE node_hash NOT IN (SELECT node_hash FROM refs)
+                  AND node_hash NOT IN ({",".join("?" for _ in inflight)})
+                """,
+                inflight,
+            ).rowcount
+            # Code embedding keys start with the node hash; docs embeddings have no refs and are kept
+            embeddings = self._conn.execute(
+                """
+                DELETE FROM embeddings
+                WHERE key NOT LIKE 'doc:%'
+                  AND substr(key, 1, instr(key, ':') - 1) NOT IN (SELECT node_hash FROM refs)
+                """
+            ).rowcount
+            self._conn.commit()
+        return {"contents": contents, "embeddings": embeddings}
+
+    def stats(self, project_name: Optional[str] = None) -> dict:
+        """
+        Returns node count, unique content count and dedupe ratio (the share of nodes
+        that did not need their own summary, embedding and code blob).
+        """
+        where, params = ("WHERE project = ?", (project_name,)) if project_name else ("", ())
+        with self._lock:
+            nodes, unique = self._conn.execute(
+                f"SELECT COUNT(*), COUNT(DISTINCT node_hash) FROM refs {where}", params
+            ).fetchone()
+        return {
+            "nodes": nodes,
+            "unique_contents": unique,
+            "dedupe_ratio": 1 - unique / nodes if nodes else 0.0,
+        }
+
+    def _select(self, query_prefix: str, keys: Iterable[str]) -> List[tuple]:
+        keys = list(dict.fromkeys(keys))
+        rows = []
+        # SQLite caps bound parameters per statement
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ",".join("?" for _ in chunk)
+            with self._lock:
+                rows.extend(self._conn.execute(f"{query_prefix} ({placeholders})", chunk).fetchall())
+        return rows
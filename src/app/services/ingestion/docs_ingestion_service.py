@@ -0,0 +1,347 @@
+"""
+Ingestion of project documentation and build files into the `docs` collection.
+
+Files are streamed one at a time, split into sections by heading (Markdown, reST),
+top-level key (YAML, properties) or size alone (pom.xml, requirements), and sections
+longer than the size limit are split again at blank lines. A file whose content
+hash matches what is already stored is skipped, and chunks are embedded in bulk
+batches across files.
+"""
+
+import fnmatch
+import hashlib
+import re
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from src.app.configuration import config
+from src.app.services.ingestion.content_store import ContentStore
+from src.app.services.ingestion.file_discovery import discover_files
+from src.app.services.ingestion.ingestion_scheduler import ModelScheduler
+from src.app.services.ingestion.ingestion_service import BUILD_OUTPUT_FOLDERS, IGNORE_CODE_FOLDERS
+
+if TYPE_CHECKING:
+    from src.app.configuration.vector_db import VectorDB
+
+# Bump when chunk text changes so cached embeddings and stored chunks are rebuilt
+DOCS_CHUNKING_VERSION = "d1"
+
+DOC_EXTENSIONS = {
+    ".md": "Markdown",
+    ".markdown": "Markdown",
+    ".rst": "reStructuredText",
+    ".yaml": "YAML",
+    ".yml": "YAML",
+    ".properties": "Properties",
+}
+
+# Files matched by name, whose extensions are too generic to ingest wholesale
+DOC_FILE_GLOBS = {
+    "pom.xml": "Maven POM",
+    "requirements*.txt": "Requirements",
+}
+
+MARKDOWN_HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+MARKDOWN_FENCE = re.compile(r"^\s*(```|~~~)")
+RST_ADORNMENT = re.compile(r"^([=\-~^\"'`#*+:.])\1{2,}\s*$")
+YAML_TOP_LEVEL_KEY = re.compile(r"^([^\s#\-][^:#]*?):(\s|$)")
+
+
+class DocChunk(NamedTuple):
+    section: str
+    text: str
+    index: int
+
+
+def doc_type_for(name: str) -> Optional[str]:
+    for pattern, doc_type in DOC_FILE_GLOBS.items():
+        if fnmatch.fnmatch(name, pattern):
+            return doc_type
+    return DOC_EXTENSIONS.get(Path(name).suffix.lower())
+
+
+# -------------------------
+# Sections
+# -------------------------
+
+def _markdown_sections(lines: List[str]) -> Iterator[Tuple[str, List[str]]]:
+    trail: List[Tuple[int, str]] = []
+    current: List[str] = []
+    in_fence = False
+
+    for line in lines:
+        if MARKDOWN_FENCE.match(line):
+            in_fence = not in_fence
+        heading = None if in_fence else MARKDOWN_HEADING.match(line)
+        if heading:
+            yield " > ".join(t for _, t in trail), current
+            level = len(heading.group(1))
+            trail = [(lvl, t) for lvl, t in trail if lvl < level] + [(level, heading.group(2))]
+            current = []
+        current.append(line)
+    yield " > ".join(t for _, t in trail), current
+
+
+def _rst_sections(lines: List[str]) -> Iterator[Tuple[str, List[str]]]:
+    # reST has no fixed heading levels: the order adornment styles first appear in defines them
+    styles: List[Tuple[str, bool]] = []
+    trail: List[Tuple[int, str]] = []
+    current: List[str] = []
+    i = 0
+
+    while i < len(lines):
+        title = lines[i].strip()
+        underline = lines[i + 1] if i + 1 < len(lines) else ""
+        adornment = RST_ADORNMENT.match(underline)
+        if title and not RST_ADORNMENT.match(lines[i]) and adornment and len(underline.rstrip()) >= len(title):
+            overline = bool(current) and RST_ADORNMENT.match(current[-1]) is not None
+            style = (adornment.group(1), overline)
+            if style not in styles:
+                styles.append(style)
+            level = styles.index(style)
+
+            if overline:
+                current.pop()
+            yield " > ".join(t for _, t in trail), current
+            trail = [(lvl, t) for lvl, t in trail if lvl < level] + [(level, title)]
+            current = ([lines[i - 1]] if overline else []) + [lines[i], underline]
+            i += 2
+            continue
+        current.append(lines[i])
+        i += 1
+    yield " > ".join(t for _, t in trail), current
+
+
+def _keyed_sections(lines: List[str], key_of) -> Iterator[Tuple[str, List[str]]]:
+    """Sections start at each new top-level key; comments stick to the key below them."""
+    key, current, pending = "", [], []
+    for line in lines:
+        stripped = line.strip()
+        if not stripped or stripped.startswith(("#", "!")):
+            pending.append(line)
+            continue
+        new_key = key_of(line)
+        if new_key is not None and new_key != key:
+            yield key, current
+            key, current = new_key, []
+        current.extend(pending)
+        pending = []
+        current.append(line)
+    current.extend(pending)
+    yield key, current
+
+
+def _yaml_key(line: str) -> Optional[str]:
+    if line.startswith("---"):
+        return "---"
+    match = YAML_TOP_LEVEL_KEY.match(line)
+    return match.group(1).strip("'\"") if match else None
+
+
+def _properties_key(line: str) -> Optional[str]:
+    key = re.split(r"\s*[=:\s]", line.strip(), maxsplit=1)[0]
+    return key.split(".", 1)[0]
+
+
+def split_sections(doc_type: str, lines: List[str]) -> List[Tuple[str, List[str]]]:
+    if doc_type == "Markdown":
+        sections = _markdown_sections(lines)
+    elif doc_type == "reStructuredText":
+        sections = _rst_sections(lines)
+    elif doc_type == "YAML":
+        sections = _keyed_sections(lines, _yaml_key)
+    elif doc_type == "Properties":
+        sections = _keyed_sections(lines, _properties_key)
+    else:
+        sections = [("", lines)]
+    return [(title, body) for title, body in sections if any(line.strip() for line in body)]
+
+
+# -------------------------
+# Chunks
+# -------------------------
+
+def _split_by_size(lines: List[str], max_chars: int) -> Iterator[List[str]]:
+    """Splits at the last blank line that fits, or mid-paragraph when there is none."""
+    current: List[str] = []
+    size = 0
+    last_break = 0
+    for line in lines:
+        if current and size + len(line) + 1 > max_chars:
+            cut = last_break or len(current)
+            yield current[:cut]
+            current = current[cut:]
+            size = sum(len(l) + 1 for l in current)
+            last_break = 0
+        current.append(line)
+        size += len(line) + 1
+        if not line.strip():
+            last_break = len(current)
+    if current:
+        yield current
+
+
+def chunk_document(
+        doc_type: str,
+        rel_path: str,
+        content: str,
+        max_chars: int = config.DOCS_CHUNK_MAX_CHARS,
+) -> List[DocChunk]:
+    sections = split_sections(doc_type, content.splitlines())
+
+    # Keyed formats produce many tiny sections; pack neighbours up to the size limit
+    if doc_type in ("YAML", "Properties"):
+        packed: List[Tuple[str, List[str]]] = []
+        for title, body in sections:
+            if packed and sum(len(l) + 1 for l in packed[-1][1] + body) <= max_chars:
+                packed[-1] = (", ".join(t for t in (packed[-1][0], title) if t), packed[-1][1] + body)
+            else:
+                packed.append((title, body))
+        sections = packed
+
+    chunks: List[DocChunk] = []
+    for title, body in sections:
+        for part in _split_by_size(body, max_chars):
+            text = "\n".join(part).strip()
+            if not text:
+                continue
+            header = [f"File: {rel_path}", f"Type: {doc_type}"]
+            if title:
+                header.append(f"Section: {title}")
+            chunks.append(DocChunk(title, "\n".join(header) + f"\n\n{text}", len(chunks)))
+    return chunks
+
+
+def _embedding_key(text: str) -> str:
+    return f"doc:{DOCS_CHUNKING_VERSION}:{hashlib.sha256(text.encode('utf-8')).hexdigest()}"
+
+
+# -------------------------
+# Service
+# -------------------------
+
+class DocsIngestionService:
+    def __init__(
+            self,
+            db: "VectorDB",
+            scheduler: Optional[ModelScheduler] = None,
+            content_store: Optional[ContentStore] = None,
+            batch_size: int = config.DOCS_EMBED_BATCH_SIZE,
+            max_chunk_chars: int = config.DOCS_CHUNK_MAX_CHARS,
+    ):
+        self.db = db
+        self.scheduler = scheduler or ModelScheduler()
+        self.content_store = content_store
+        self.batch_size = max(1, batch_size)
+        self.max_chunk_chars = max_chunk_chars
+
+    def discover(self, folder: Path, extra_ignore_globs: Optional[Iterable[str]] = None) -> Iterator[Path]:
+        extensions = set(DOC_EXTENSIONS) | {Path(p).suffix for p in DOC_FILE_GLOBS}
+        for path in discover_files(
+            folder,
+            extensions=extensions,
+            ignore_dirs=IGNORE_CODE_FOLDERS,
+            extra_ignore_globs=extra_ignore_globs,
+            build_output_dirs=BUILD_OUTPUT_FOLDERS,
+        ):
+            if doc_type_for(path.name):
+                yield path
+
+    def ingest_docs(
+            self,
+            folder: Path,
+            project_name: str,
+            extra_ignore_globs: Optional[Iterable[str]] = None,
+    ) -> Dict[str, int]:
+        """
+        Streams the project's docs into the docs collection. Returns counts of files
+        seen, files skipped as unchanged, chunks written and files removed.
+        """
+        folder = Path(folder)
+        stored = self._stored_file_hashes(project_name)
+        stats = {"files": 0, "unchanged": 0, "chunks": 0, "removed": 0}
+        pending: List[Tuple[str, dict, str]] = []
+        seen = set()
+
+        for path in self.discover(folder, extra_ignore_globs):
+            file_path = str(path)
+            seen.add(file_path)
+            stats["files"] += 1
+            try:
+                raw = path.read_bytes()
+            except OSError as e:
+                print(f"Skipping {path}: {e}")
+                continue
+
+            # Chunking settings are part of the hash, so changing them re-chunks every file
+            file_hash = hashlib.sha256(raw + f"{DOCS_CHUNKING_VERSION}:{self.max_chunk_chars}".encode()).hexdigest()
+            if stored.get(file_path) == file_hash:
+                stats["unchanged"] += 1
+                continue
+            if file_path in stored:
+                self._delete_file(project_name, file_path)
+
+            doc_type = doc_type_for(path.name)
+            rel_path = path.relative_to(folder).as_posix()
+            content = raw.decode("utf-8", errors="ignore")
+            for chunk in chunk_document(doc_type, rel_path, content, self.max_chunk_chars):
+                meta = {
+                    "project": project_name,
+                    "file_path": file_path,
+                    "language": doc_type,
+                    "section": chunk.section,
+                    "file_hash": file_hash,
+                    "chunk_index": chunk.index,
+                }
+                pending.append((f"{project_name}:{rel_path}#d{chunk.index}", meta, chunk.text))
+                stats["chunks"] += 1
+
+            if len(pending) >= self.batch_size:
+                self._flush(pending)
+                pending = []
+
+        if pending:
+            self._flush(pending)
+
+        for file_path in stored.keys() - seen:
+            self._delete_file(project_name, file_path)
+            stats["removed"] += 1
+
+        return stats
+
+    def _stored_file_hashes(self, project_name: str) -> Dict[str, str]:
+        result = self.db.docs.get(where={"project": project_name}, include=["metadatas"])
+        return {
+            meta["file_path"]: meta.get("file_hash")
+            for meta in result["metadatas"]
+            if meta and meta.get("file_path")
+        }
+
+    def _delete_file(self, project_name: str, file_path: str):
+        self.db.docs.delete(where={"$and": [{"project": project_name}, {"file_path": file_path}]})
+
+    def _flush(self, pending: List[Tuple[str, dict, str]]):
+        # A large file's chunks are written in several embedding batches
+        for start in range(0, len(pending), self.batch_size):
+            batch = pending[start:start + self.batch_size]
+            ids = [chunk_id for chunk_id, _, _ in batch]
+            metas = [meta for _, meta, _ in batch]
+            texts = [text for _, _, text in batch]
+
+            if not self.content_store:
+                self.scheduler.upsert_vectors(self.db, self.db.docs, texts, metas, ids)
+                continue
+
+            # Shared READMEs, licenses and configs are embedded once
+            keys = [_embedding_key(text) for text in texts]
+            embeddings = self.content_store.get_embeddings(keys)
+            missing = {k: text for k, text in zip(keys, texts) if k not in embeddings}
+            if missing:
+                computed = dict(zip(missing, self.scheduler.embed(self.db, list(missing.values()))))
+                self.content_store.put_embeddings(computed)
+                embeddings.update(computed)
+
+            self.scheduler.upsert_vectors(
+                self.db, self.db.docs, texts, metas, ids,
+                embeddings=[embeddings[k] for k in keys],
+            )
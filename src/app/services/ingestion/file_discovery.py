@@ -0,0 +1,353 @@
+import fnmatch
+import os
+import re
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Set, Tuple, TypeVar
+
+from src.app.configuration import config
+
+T = TypeVar("T")
+
+IGNORE_FILE_NAMES = (".gitignore", ".jaicaignore")
+
+GENERATED_FILE_GLOBS = (
+    "*.min.js",
+    "*.min.css",
+    "*_pb2.py",
+    "*_pb2_grpc.py",
+    "*.pb.go",
+    "*.generated.*",
+    "*.g.dart",
+)
+
+# Banners code generators write by convention; looser phrases such as "do not edit" also appear in license headers
+GENERATED_BANNER = re.compile(r"@generated\b|Code generated .* DO NOT EDIT\.")
+
+# A folder named in `build_output_dirs` is only output when it sits next to one of these
+BUILD_FILE_NAMES = {
+    "pom.xml", "build.gradle", "build.gradle.kts", "settings.gradle", "settings.gradle.kts",
+    "package.json", "setup.py", "setup.cfg", "pyproject.toml",
+}
+
+SNIFF_BYTES = 8192
+MARKER_SCAN_LINES = 10
+MINIFIED_AVG_LINE_LENGTH = 300
+MINIFIED_MAX_LINE_LENGTH = 1000
+
+
+# -------------------------
+# Ignore rules
+# -------------------------
+
+class IgnoreRule:
+    """
+    A single gitignore-style pattern, compiled to a regex matched against
+    a posix path relative to the directory that declared the rule.
+    """
+
+    __slots__ = ("pattern", "negated", "dir_only", "regex")
+
+    def __init__(self, pattern: str, negated: bool, dir_only: bool, regex: re.Pattern):
+        self.pattern = pattern
+        self.negated = negated
+        self.dir_only = dir_only
+        self.regex = regex
+
+    def matches(self, rel_path: str, is_dir: bool) -> bool:
+        if self.dir_only and not is_dir:
+            return False
+        return self.regex.fullmatch(rel_path) is not None
+
+
+def _translate_glob(pattern: str) -> str:
+    """
+    Translates a gitignore glob body to a regex.
+    Supports *, ?, [...] and ** in leading, trailing and middle positions.
+    """
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("/**", i) and i + 3 == n:
+            out.append("/.*")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            out.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            out.append("[^/]")
+            i += 1
+        elif pattern[i] == "[":
+            end = pattern.find("]", i + 1)
+            if end == -1:
+                out.append(re.escape(pattern[i]))
+                i += 1
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append(f"[{body}]")
+                i = end + 1
+        else:
+            out.append(re.escape(pattern[i]))
+            i += 1
+    return "".join(out)
+
+
+def compile_ignore_rule(line: str) -> Optional[IgnoreRule]:
+    line = line.rstrip("\n").rstrip()
+    if not line or line.startswith("#"):
+        return None
+
+    negated = line.startswith("!")
+    if negated:
+        line = line[1:]
+    if line.startswith("\\"):
+        line = line[1:]
+
+    dir_only = line.endswith("/")
+    body = line.rstrip("/")
+    if not body:
+        return None
+
+    # A slash anywhere but the end anchors the pattern to the declaring directory
+    anchored = "/" in body
+    body = body.lstrip("/")
+
+    regex = _translate_glob(body)
+    if not anchored:
+        regex = "(?:.*/)?" + regex
+
+    return IgnoreRule(line, negated, dir_only, re.compile(regex))
+
+
+def load_ignore_rules(directory: Path) -> List[IgnoreRule]:
+    rules: List[IgnoreRule] = []
+    for name in IGNORE_FILE_NAMES:
+        ignore_file = directory / name
+        try:
+            text = ignore_file.read_text(encoding="utf-8", errors="ignore")
+        except OSError:
+            continue
+        for line in text.splitlines():
+            rule = compile_ignore_rule(line)
+            if rule:
+                rules.append(rule)
+    return rules
+
+
+def _is_ignored(
+        rule_sets: List[Tuple[str, List[IgnoreRule]]],
+        rel_path: str,
+        is_dir: bool,
+) -> bool:
+    """
+    Evaluates rule sets from the outermost directory inwards.
+    The last matching rule wins, as in git.
+    """
+    ignored = False
+    for base, rules in rule_sets:
+        if base:
+            if not rel_path.startswith(base + "/"):
+                continue
+            local_path = rel_path[len(base) + 1:]
+        else:
+            local_path = rel_path
+        for rule in rules:
+            if rule.matches(local_path, is_dir):
+                ignored = not rule.negated
+    return ignored
+
+
+# -------------------------
+# File heuristics
+# -------------------------
+
+def is_generated_or_binary(path: Path, size: int, max_file_bytes: int) -> bool:
+    """
+    Cheap checks that avoid handing binary, generated or minified files to the parser.
+    Only the first few KB of a file are read.
+    """
+    # Empty files are kept: an empty __init__.py still defines a package
+    if size > max_file_bytes:
+        return True
+
+    name = path.name
+    if any(fnmatch.fnmatch(name, g) for g in GENERATED_FILE_GLOBS):
+        return True
+
+    try:
+        with open(path, "rb") as f:
+            head = f.read(SNIFF_BYTES)
+    except OSError:
+        return True
+
+    return looks_generated_or_binary(head)
+
+
+def looks_generated_or_binary(head: bytes) -> bool:
+    """Content half of `is_generated_or_binary`, for data that is already in memory."""
+    head = head[:SNIFF_BYTES]
+    if b"\x00" in head:
+        return True
+
+    text = head.decode("utf-8", errors="ignore")
+    lines = text.splitlines()
+
+    header = "\n".join(lines[:MARKER_SCAN_LINES])
+    if GENERATED_BANNER.search(header):
+        return True
+
+    if lines:
+        longest = max(len(line) for line in lines)
+        average = len(text) / len(lines)
+        if longest > MINIFIED_MAX_LINE_LENGTH or average > MINIFIED_AVG_LINE_LENGTH:
+            return True
+
+    return False
+
+
+# -------------------------
+# Walker
+# -------------------------
+
+def discover_files(
+        root: Path,
+        extensions: Optional[Iterable[str]] = None,
+        ignore_dirs: Optional[Set[str]] = None,
+        extra_ignore_globs: Optional[Iterable[str]] = None,
+        max_file_bytes: int = config.INGESTION_MAX_FILE_BYTES,
+        use_ignore_files: bool = True,
+        build_output_dirs: Optional[Set[str]] = None,
+) -> Iterator[Path]:
+    """
+    Streams files under `root` that are worth ingesting.
+
+    Directories are pruned before they are entered: named folders in `ignore_dirs`,
+    folders in `build_output_dirs` that sit next to a build file (so a source
+    package named `build` is kept), anything matched by `.gitignore` / `.jaicaignore`
+    files found along the way, and the configured extra globs. Files are filtered
+    by extension first and only then sniffed for binary, generated or minified content.
+    """
+    root = Path(root)
+    extensions = set(extensions) if extensions is not None else None
+    ignore_dirs = ignore_dirs or set()
+    build_output_dirs = build_output_dirs or set()
+
+    global_rules = [
+        rule
+        for rule in (compile_ignore_rule(g) for g in list(config.INGESTION_IGNORE_GLOBS) + list(extra_ignore_globs or []))
+        if rule
+    ]
+
+    # Stack of (directory, posix path relative to root, rule sets in effect)
+    root_rules = [("", global_rules)]
+    if use_ignore_files:
+        root_rules.append(("", load_ignore_rules(root)))
+    stack: List[Tuple[str, str, List[Tuple[str, List[IgnoreRule]]]]] = [(str(root), "", root_rules)]
+
+    while stack:
+        directory, rel_dir, rule_sets = stack.pop()
+
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError as e:
+            print(f"Skipping {directory}: {e}")
+            continue
+
+        has_build_file = any(entry.name in BUILD_FILE_NAMES for entry in entries)
+        subdirs = []
+        for entry in entries:
+            rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+
+            try:
+                if entry.is_symlink():
+                    continue
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+
+            if is_dir:
+                if entry.name in ignore_dirs:
+                    continue
+                if has_build_file and entry.name in build_output_dirs:
+                    continue
+                if _is_ignored(rule_sets, rel_path, True):
+                    continue
+                subdirs.append((entry.path, rel_path))
+                continue
+
+            if extensions is not None and os.path.splitext(entry.name)[1] not in extensions:
+                continue
+            if _is_ignored(rule_sets, rel_path, False):
+                continue
+
+            try:
+                size = entry.stat(follow_symlinks=False).st_size
+            except OSError:
+                continue
+
+            path = Path(entry.path)
+            if is_generated_or_binary(path, size, max_file_bytes):
+                continue
+
+            yield path
+
+        # Push in reverse so directories are visited in name order
+        for sub_path, sub_rel in reversed(subdirs):
+            sub_rules = rule_sets
+            if use_ignore_files:
+                nested = load_ignore_rules(Path(sub_path))
+                if nested:
+                    sub_rules = rule_sets + [(sub_rel, nested)]
+            stack.append((sub_path, sub_rel, sub_rules))
+
+
+def select_tracked_files(
+        files: Iterable[T],
+        extensions: Optional[Iterable[str]] = None,
+        ignore_dirs: Optional[Set[str]] = None,
+        extra_ignore_globs: Optional[Iterable[str]] = None,
+        max_file_bytes: int = config.INGESTION_MAX_FILE_BYTES,
+        build_output_dirs: Optional[Set[str]] = None,
+) -> Iterator[T]:
+    """
+    Applies the path-level filters of `discover_files` to entries listed from git
+    (anything with `path` and `size`). Content sniffing is left to the caller,
+    which reads the blob anyway.
+    """
+    files = list(files)
+    extensions = set(extensions) if extensions is not None else None
+    ignore_dirs = ignore_dirs or set()
+    build_output_dirs = build_output_dirs or set()
+    # Directories ("" for the root) holding a build file, whose build output folders are pruned
+    build_roots = {f.path.rpartition("/")[0] for f in files if f.path.rpartition("/")[2] in BUILD_FILE_NAMES}
+    rule_sets = [("", [
+        rule
+        for rule in (compile_ignore_rule(g) for g in list(config.INGESTION_IGNORE_GLOBS) + list(extra_ignore_globs or []))
+        if rule
+    ])]
+
+    for f in files:
+        parts = f.path.split("/")
+        if extensions is not None and os.path.splitext(parts[-1])[1] not in extensions:
+            continue
+        if f.size > max_file_bytes:
+            continue
+        if any(part in ignore_dirs for part in parts[:-1]):
+            continue
+        if any(part in build_output_dirs and "/".join(parts[:i]) in build_roots for i, part in enumerate(parts[:-1])):
+            continue
+        if any(_is_ignored(rule_sets, "/".join(parts[:i]), True) for i in range(1, len(parts))):
+            continue
+        if _is_ignored(rule_sets, f.path, False):
+            continue
+        if any(fnmatch.fnmatch(parts[-1], g) for g in GENERATED_FILE_GLOBS):
+            continue
+        yield f
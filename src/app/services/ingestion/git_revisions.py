@@ -0,0 +1,86 @@
+import subprocess
+import threading
+from pathlib import Path
+from typing import Iterator, NamedTuple
+
+
+class GitError(RuntimeError):
+    pass
+
+
+class TrackedFile(NamedTuple):
+    path: str
+    blob_sha: str
+    size: int
+
+
+def _git(repo: Path, *args: str) -> bytes:
+    try:
+        return subprocess.run(
+            ["git", "-C", str(repo), *args],
+            check=True,
+            capture_output=True,
+        ).stdout
+    except FileNotFoundError:
+        raise GitError("git executable not found")
+    except subprocess.CalledProcessError as e:
+        raise GitError(e.stderr.decode("utf-8", errors="replace").strip() or str(e))
+
+
+def resolve_commit(repo: Path, revision: str) -> str:
+    """Returns the commit SHA a branch, tag or SHA points at."""
+    return _git(repo, "rev-parse", "--verify", "--quiet", f"{revision}^{{commit}}").decode().strip()
+
+
+def list_tracked_files(repo: Path, commit: str) -> Iterator[TrackedFile]:
+    """
+    Lists every blob in the tree of `commit` with its SHA and size. Nothing is read
+    from the working tree, so any revision can be listed without checking it out.
+    """
+    output = _git(repo, "ls-tree", "-r", "-z", "--long", commit)
+    for entry in output.split(b"\0"):
+        if not entry:
+            continue
+        meta, path = entry.split(b"\t", 1)
+        mode, obj_type, sha, size = meta.split()
+        # Submodules are commits, symlinks are blobs with mode 120000
+        if obj_type != b"blob" or mode == b"120000":
+            continue
+        yield TrackedFile(path.decode("utf-8", errors="replace"), sha.decode(), int(size))
+
+
+class BlobReader:
+    """
+    Reads blobs through one long-lived `git cat-file --batch` process instead of
+    spawning git per file. Safe to share between worker threads.
+    """
+
+    def __init__(self, repo: Path):
+        self._process = subprocess.Popen(
+            ["git", "-C", str(repo), "cat-file", "--batch"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        )
+        self._lock = threading.Lock()
+
+    def read(self, blob_sha: str) -> bytes:
+        with self._lock:
+            self._process.stdin.write(blob_sha.encode() + b"\n")
+            self._process.stdin.flush()
+            header = self._process.stdout.readline().split()
+            if len(header) < 3 or header[1] == b"missing":
+                raise GitError(f"Blob {blob_sha} not found")
+            data = self._process.stdout.read(int(header[2]))
+            self._process.stdout.read(1)  # trailing newline
+            return data
+
+    def close(self):
+        if self._process.poll() is None:
+            self._process.stdin.close()
+            self._process.wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
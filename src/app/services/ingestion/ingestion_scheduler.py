@@ -0,0 +1,147 @@
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor, Future, as_completed
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from src.app.configuration import config
+
+# Stages reported through the `on_event` callback of MultiProjectIngestion.run
+STAGE_INGESTING = "ingesting"
+STAGE_INGESTED = "ingested"
+STAGE_LINKING = "linking"
+STAGE_LINKED = "linked"
+STAGE_FAILED = "failed"
+
+
+class ModelScheduler:
+    """
+    Shares LLM and embedding capacity between every project being ingested at once,
+    so adding projects adds queueing instead of overloading Ollama or the embedder.
+    """
+
+    def __init__(
+            self,
+            llm_concurrency: int = config.LLM_MAX_CONCURRENCY,
+            embedding_concurrency: int = config.EMBEDDING_MAX_CONCURRENCY,
+    ):
+        self._llm_slots = threading.BoundedSemaphore(max(1, llm_concurrency))
+        self._embedding_slots = threading.BoundedSemaphore(max(1, embedding_concurrency))
+
+    def summarize(self, code: str) -> str:
+        from src.app.services.llm_service import summarize_code
+
+        with self._llm_slots:
+            return summarize_code(code)
+
+    def embed(self, db, texts: List[str]) -> List[List[float]]:
+        with self._embedding_slots:
+            return db.embed(texts)
+
+    def upsert_vectors(self, db, collection, texts, metadatas, ids, embeddings=None):
+        if embeddings is not None:
+            # Nothing left to embed, so this does not need an embedding slot
+            db.upsert(collection, texts, metadatas, ids, embeddings=embeddings)
+            return
+        with self._embedding_slots:
+            db.upsert(collection, texts, metadatas, ids)
+
+
+def duplicate_project_names(folders: List[Path]) -> Dict[str, List[Path]]:
+    """
+    Project names (folder basenames) shared by different folders, with those folders.
+    Such projects would overwrite each other's Project node, nodes and links.
+    """
+    by_name: Dict[str, List[Path]] = {}
+    for folder in folders:
+        by_name.setdefault(folder.name, []).append(folder)
+    return {
+        name: paths for name, paths in by_name.items()
+        if len({path.resolve() for path in paths}) > 1
+    }
+
+
+class MultiProjectIngestion:
+    """
+    Ingests several projects at once under one global worker budget.
+
+    Every project gets a lightweight coordinator thread that feeds its files into a
+    single shared file executor. As soon as a project's files are done it is handed
+    to the linking executor, while other projects keep ingesting.
+    """
+
+    def __init__(
+            self,
+            ingest_fn: Callable[[Path, str, Executor], None],
+            link_fn: Optional[Callable[[str], None]] = None,
+            max_workers: int = config.INGESTION_MAX_WORKERS,
+            max_parallel_links: int = config.LINKING_MAX_PARALLEL,
+    ):
+        self.ingest_fn = ingest_fn
+        self.link_fn = link_fn
+        self.max_workers = max(1, max_workers)
+        self.max_parallel_links = max(1, max_parallel_links)
+
+    def run(
+            self,
+            folders: List[Path],
+            on_event: Optional[Callable[[str, str, Optional[Exception]], None]] = None,
+    ) -> Dict[str, Optional[Exception]]:
+        """
+        Returns project name -> error (None on success). Raises ValueError when two
+        folders share a name, since projects are named after their folder.
+        """
+        duplicates = duplicate_project_names(folders)
+        if duplicates:
+            raise ValueError("Several folders map to the same project name: " + "; ".join(
+                f"{name} <- {', '.join(str(path) for path in paths)}" for name, paths in duplicates.items()
+            ))
+
+        notify = on_event or (lambda project, stage, error: None)
+        outcomes: Dict[str, Optional[Exception]] = {}
+        lock = threading.Lock()
+
+        def record(project_name: str, error: Optional[Exception]):
+            with lock:
+                outcomes[project_name] = error
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="ingest-file") as file_executor, \
+                ThreadPoolExecutor(max_workers=self.max_parallel_links, thread_name_prefix="link") as link_executor, \
+                ThreadPoolExecutor(max_workers=len(folders) or 1, thread_name_prefix="ingest-project") as project_executor:
+
+            link_futures: List[Future] = []
+
+            def link(project_name: str):
+                notify(project_name, STAGE_LINKING, None)
+                try:
+                    self.link_fn(project_name)
+                except Exception as e:
+                    record(project_name, e)
+                    notify(project_name, STAGE_FAILED, e)
+                    return
+                notify(project_name, STAGE_LINKED, None)
+
+            def ingest(folder: Path):
+                project_name = folder.name
+                notify(project_name, STAGE_INGESTING, None)
+                try:
+                    self.ingest_fn(folder, project_name, file_executor)
+                except Exception as e:
+                    record(project_name, e)
+                    notify(project_name, STAGE_FAILED, e)
+                    return
+                record(project_name, None)
+                notify(project_name, STAGE_INGESTED, None)
+
+                if self.link_fn:
+                    with lock:
+                        link_futures.append(link_executor.submit(link, project_name))
+
+            for future in as_completed([project_executor.submit(ingest, f) for f in folders]):
+                future.result()
+
+            with lock:
+                pending_links = list(link_futures)
+            for future in as_completed(pending_links):
+                future.result()
+
+        return outcomes
@@ -1,20 +1,45 @@
 import hashlib
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from pathlib import Path
-from typing import List, Dict, Optional, Tuple
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from pathlib import Path, PurePosixPath
+from typing import Callable, List, Dict, Iterable, Iterator, Optional, Set, Tuple
 
-from src.app.configuration.vector_db import VectorDB
 from src.app.services.detectors.parsers import load_parser
-from src.app.models.code_classifier.code_classifier import CodeClassifier
-from src.app.services.graph_db_service import GraphDBService
-from src.app.services.llm_service import summarize_code
+from src.app.services.ingestion.content_store import ContentStore
+from src.app.services.ingestion.file_discovery import discover_files, looks_generated_or_binary, select_tracked_files
+from src.app.services.ingestion.git_revisions import BlobReader, TrackedFile, list_tracked_files, resolve_commit
+from src.app.services.ingestion.ingestion_scheduler import ModelScheduler
+from src.app.services.ingestion.ingestion_sinks import IngestionSink, NodeChanges, ParsedFile, SinkWrite, file_node_id
+from src.app.services.ingestion.node_records import NodeRecord, SourceBuffer
+from src.app.services.ingestion.symbol_scopes import (
+    DOTTED_NAME,
+    FileScope,
+    SymbolTable,
+    add_java_import,
+    add_python_import,
+    java_package,
+    join_name,
+    python_module_name,
+)
+from src.app.services.language_resolution_service import LanguageResolutionService, language_from_extension
 
 SUPPORTED_CODE_EXTENSIONS = {
     ".py": "Python",
     ".java": "Java",
 }
 
-IGNORE_CODE_FOLDERS = {".git", "__pycache__", "venv", ".idea", "docker", ".mvn"}
+IGNORE_CODE_FOLDERS = {
+    ".git", "__pycache__", "venv", ".venv", ".idea", "docker", ".mvn",
+    ".gradle", ".tox", ".mypy_cache", ".pytest_cache",
+}
+
+# Build output, only pruned next to a build file (pom.xml, package.json, ...); elsewhere these may be source packages
+BUILD_OUTPUT_FOLDERS = {"node_modules", "build", "target", "dist"}
+
+IMPORT_TYPES = {
+    "python": {"import_statement", "import_from_statement"},
+    "java": {"import_declaration"},
+}
 
 NODE_TYPES = {
     "python": {
@@ -31,13 +56,127 @@ NODE_TYPES = {
 }
 
 
+def _type_name(node) -> Optional[str]:
+    """`B`, `m.C`, `B<T>` or `Generic[T]` as a dotted name without type arguments."""
+    text = node.text.decode("utf-8").split("<", 1)[0].split("[", 1)[0]
+    text = "".join(text.split())
+    return text if DOTTED_NAME.match(text) else None
+
+
+def _type_list(node) -> List[str]:
+    names = []
+    for child in node.named_children:
+        if child.type == "type_list":
+            names.extend(_type_list(child))
+        elif child.type != "keyword_argument":
+            name = _type_name(child)
+            if name:
+                names.append(name)
+    return names
+
+
+def extract_supertypes(language: str, node) -> Tuple[List[str], List[str]]:
+    """The `extends` and `implements` clauses of a class, interface or enum declaration."""
+    if language == "python":
+        superclasses = node.child_by_field_name("superclasses")
+        return (_type_list(superclasses) if superclasses else []), []
+
+    extends: List[str] = []
+    implements: List[str] = []
+    superclass = node.child_by_field_name("superclass")
+    if superclass:
+        extends.extend(_type_list(superclass))
+    interfaces = node.child_by_field_name("interfaces")
+    if interfaces:
+        implements.extend(_type_list(interfaces))
+    for child in node.children:
+        # An interface's `extends` list is not a field in the grammar
+        if child.type == "extends_interfaces":
+            extends.extend(_type_list(child))
+    return extends, implements
+
+
+def extract_annotations(language: str, node) -> List[str]:
+    """Decorator (Python) or annotation (Java) names on a definition, without arguments."""
+    names = []
+    if language == "python":
+        parent = node.parent
+        if parent is not None and parent.type == "decorated_definition":
+            for child in parent.children:
+                if child.type == "decorator":
+                    text = child.text.decode("utf-8").lstrip("@").split("(", 1)[0]
+                    names.append("".join(text.split()))
+    else:
+        for child in node.children:
+            if child.type == "modifiers":
+                for modifier in child.children:
+                    if modifier.type in ("marker_annotation", "annotation"):
+                        name = modifier.child_by_field_name("name")
+                        if name:
+                            names.append(name.text.decode("utf-8"))
+    return names
+
+
+# Python target nodes that bind every identifier inside them
+_PYTHON_TARGET_PATTERNS = {
+    "pattern_list", "tuple_pattern", "list_pattern", "tuple", "list", "list_splat_pattern",
+    "parenthesized_expression", "as_pattern_target",
+}
+
+
+def _target_names(node) -> List[str]:
+    if node is None:
+        return []
+    if node.type == "identifier":
+        return [node.text.decode("utf-8")]
+    if node.type in _PYTHON_TARGET_PATTERNS:
+        return [name for child in node.named_children for name in _target_names(child)]
+    # `obj.attr = ...` and `m[0] = ...` bind nothing new
+    return []
+
+
+def _first_identifier(node) -> List[str]:
+    for child in node.named_children:
+        if child.type in ("identifier", "type_identifier"):
+            return [child.text.decode("utf-8")]
+    return []
+
+
+def extract_bindings(language: str, node) -> List[str]:
+    """Names a syntax node binds in the scope it appears in."""
+    kind = node.type
+    if language == "python":
+        if kind in ("parameters", "lambda_parameters"):
+            names = []
+            for child in node.named_children:
+                if child.type == "identifier":
+                    names.append(child.text.decode("utf-8"))
+                elif child.type in ("default_parameter", "typed_default_parameter"):
+                    names.extend(_target_names(child.child_by_field_name("name")))
+                else:
+                    names.extend(_first_identifier(child))
+            return names
+        if kind in ("assignment", "augmented_assignment", "for_statement", "for_in_clause"):
+            return _target_names(node.child_by_field_name("left"))
+        if kind == "as_pattern":
+            return _target_names(node.child_by_field_name("alias"))
+        if kind == "named_expression":
+            return _target_names(node.child_by_field_name("name"))
+        return []
+
+    # Java only records type names as usages, so type parameters are the locals that matter
+    if kind == "type_parameter":
+        return _first_identifier(node)
+    return []
+
+
 def compute_node_hash(code: str) -> str:
     return hashlib.sha256(code.encode("utf-8")).hexdigest()
 
 
 def extract_nodes(
         language: str,
-        content: str,
+        source: SourceBuffer,
         file_path: str,
         max_node_lines: int = 300,
 ) -> Dict:
@@ -47,24 +186,23 @@ def extract_nodes(
 
     try:
         parser = load_parser(language)
-        tree = parser.parse(bytes(content, "utf8"))
+        tree = parser.parse(source.data)
     except Exception as e:
         print(f"Failed to parse {file_path}: {e}")
         return {}
 
     root = tree.root_node
     target_types = NODE_TYPES[language]
-    lines = content.splitlines()
 
-    nodes: List[Dict] = []
+    nodes: List[NodeRecord] = []
     calls: List[Tuple[str, str, str]] = []
-    usages: List[Tuple[str, str, str]] = []
+    symbols = SymbolTable(language)
     defined_symbols: Dict[str, List[str]] = {}
+    import_statements: List[str] = []
+    package = ""
 
     scope_stack: List[str] = []
-
-    def extract_code(start: int, end: int) -> str:
-        return "\n".join(lines[start - 1: end])
+    name_stack: List[str] = []
 
     def get_node_name(node) -> Optional[str]:
         for child in node.children:
@@ -80,36 +218,54 @@ def extract_nodes(
                     return None
         return None
 
-    def walk(node):
+    def is_definition_name(node) -> bool:
+        # The name of a def/class is what it defines, and `f(key=...)` names a parameter; neither is a usage
+        parent = node.parent
+        return parent is not None and parent.type in (*target_types, "keyword_argument") \
+            and parent.child_by_field_name("name") == node
+
+    def walk(node, in_chain: bool = False):
+        nonlocal package
         pushed = False
+
+        # ---- IMPORTS ----
+        if node.type in IMPORT_TYPES.get(language, ()):
+            import_statements.append(node.text.decode("utf-8"))
+            return
+        if language == "java" and node.type == "package_declaration":
+            package = java_package(node.text.decode("utf-8"))
+            return
+
         if node.type in target_types:
             start_line = node.start_point[0] + 1
             end_line = node.end_point[0] + 1
 
-            full_code = extract_code(start_line, end_line)
-            truncated_code = extract_code(
-                start_line, min(end_line, start_line + max_node_lines - 1)
-            )
-
             node_name = get_node_name(node) or f"unnamed_{start_line}"
             node_id = f"{file_path}:{node_name}:{start_line}"
             parent_id = scope_stack[-1] if scope_stack else None
 
-            nodes.append(
-                {
-                    "node_id": node_id,
-                    "node_type": target_types[node.type],
-                    "node_name": node_name,
-                    "start_line": start_line,
-                    "end_line": end_line,
-                    "parent_id": parent_id,
-                    "full_code": full_code,
-                    "truncated_code": truncated_code,
-                }
+            # Offsets only; code is sliced from the shared buffer when needed
+            record = NodeRecord(
+                node_id=node_id,
+                node_type=target_types[node.type],
+                node_name=node_name,
+                start_line=start_line,
+                end_line=end_line,
+                parent_id=parent_id,
+                source=source,
+                max_lines=max_node_lines,
             )
+            # Relative to the module for now; parse_source prefixes the module name
+            record.qualified_name = join_name(*name_stack, node_name)
+            if record.node_type in ("class", "interface", "enum"):
+                record.extends, record.implements = extract_supertypes(language, node)
+            record.annotations = extract_annotations(language, node)
+            nodes.append(record)
 
             defined_symbols[node_id] = [node_name]
+            symbols.enter(node_id, record.node_type, parent_id)
             scope_stack.append(node_id)
+            name_stack.append(node_name)
             pushed = True
 
         # ---- CALLS ----
@@ -124,167 +280,378 @@ def extract_nodes(
                 if name_node:
                     calls.append((owner_id, name_node.text.decode("utf-8"), "java_method_invocation"))
 
-        # ---- USAGES ----
+        # ---- LOCAL BINDINGS ----
         if scope_stack:
             owner_id = scope_stack[-1]
-            if language == "python" and node.type == "identifier":
-                usages.append((owner_id, node.text.decode("utf-8"), "python_identifier"))
+            for name in extract_bindings(language, node):
+                symbols.bind(owner_id, name)
+            if language == "python" and node.type in ("global_statement", "nonlocal_statement"):
+                for child in node.named_children:
+                    symbols.declare_outer(owner_id, child.text.decode("utf-8"))
+
+        # ---- USAGES ----
+        child_in_chain = in_chain
+        if scope_stack and not in_chain:
+            owner_id = scope_stack[-1]
+            if language == "python" and node.type == "attribute":
+                # Keep `module.func` / `self.save` whole so the linker can resolve the qualifier
+                text = node.text.decode("utf-8")
+                if DOTTED_NAME.match(text):
+                    symbols.use(owner_id, "".join(text.split()))
+                    child_in_chain = True
+            if language == "python" and node.type == "identifier" and not is_definition_name(node):
+                symbols.use(owner_id, node.text.decode("utf-8"))
             if language == "java" and node.type in {"type_identifier", "scoped_type_identifier", "field_access"}:
-                usages.append((owner_id, node.text.decode("utf-8"), "java_symbol_usage"))
+                # Only the outermost of `java.util.List` / `this.repo.items`; its parts are not uses of their own.
+                # `new Foo().bar` is no name, but the types inside it are.
+                text = node.text.decode("utf-8")
+                if DOTTED_NAME.match(text):
+                    symbols.use(owner_id, "".join(text.split()))
+                    child_in_chain = True
 
         for child in node.children:
-            walk(child)
+            walk(child, child_in_chain)
 
         if pushed:
             scope_stack.pop()
+            name_stack.pop()
 
     walk(root)
 
     return {
         "nodes": nodes,
         "calls": calls,
-        "usages": usages,
+        "symbols": symbols,
         "defined_symbols": defined_symbols,
+        "import_statements": import_statements,
+        "package": package,
     }
 
 
+def build_file_scope(language: str, file_path: str, extracted: Dict) -> FileScope:
+    """Module name and import table of a file, from what extract_nodes collected."""
+    language = language.lower()
+    if language == "python":
+        scope = FileScope(python_module_name(file_path))
+        for statement in extracted["import_statements"]:
+            add_python_import(scope, statement, file_path)
+    else:
+        scope = FileScope(extracted.get("package", ""))
+        for statement in extracted["import_statements"]:
+            add_java_import(scope, statement)
+    return scope
+
+
 class IngestionService:
+    """
+    Parse-once ingestion pipeline. Each file is parsed, and each changed node
+    summarized, exactly once; the result then fans out to every enabled sink.
+    """
+
     def __init__(
             self,
-            db: VectorDB,
-            code_classifier: CodeClassifier,
-            graph_db_service: GraphDBService,
-            batch_size: int = 16,
+            sinks: List[IngestionSink],
+            language_resolver: LanguageResolutionService,
+            scheduler: Optional[ModelScheduler] = None,
+            content_store: Optional[ContentStore] = None,
     ):
-        self.batch_size = batch_size
-        self.code_classifier = code_classifier
-        self.db = db
-        self.graph_db_service = graph_db_service
-
-    def ingest_code_file(self, file_path: Path, project_name: str):
+        if not sinks:
+            raise ValueError("At least one ingestion sink is required")
+        self.sinks = sinks
+        self.language_resolver = language_resolver
+        self.scheduler = scheduler or ModelScheduler()
+        self.content_store = content_store
+        self._changes: Dict[str, NodeChanges] = {}
+        self._changes_lock = threading.Lock()
+
+    def parse_code_file(self, file_path: Path, project_name: str) -> Optional[ParsedFile]:
         try:
-            content = file_path.read_text(encoding="utf-8", errors="ignore")
+            data = file_path.read_bytes()
         except Exception as e:
             print(f"Skipping {file_path}: {e}")
-            return
+            return None
 
-        language = SUPPORTED_CODE_EXTENSIONS.get(file_path.suffix) or self.code_classifier.predict(
-            content
+        return self.parse_source(data, str(file_path), file_path.name, project_name)
+
+    def parse_source(
+            self,
+            data: bytes,
+            file_path: str,
+            file_name: str,
+            project_name: str,
+            revision: Optional[str] = None,
+            blob_sha: Optional[str] = None,
+    ) -> Optional[ParsedFile]:
+        # The buffer shares the bytes as read; text is only decoded when the extension is not enough
+        language = language_from_extension(file_path) or self.language_resolver.resolve(
+            data.decode("utf-8", errors="ignore"), file_path
         )
+        source = SourceBuffer(data)
 
-        extracted = extract_nodes(language, content, str(file_path))
+        # Node IDs of git blobs are prefixed with the blob-keyed file ID, so each blob's nodes are distinct
+        id_prefix = file_node_id(project_name, file_path, blob_sha) if blob_sha else file_path
+        extracted = extract_nodes(language, source, id_prefix)
         if not extracted:
-            return
-
-        # ---- FILE NODE ----
-        file_node_id = f"{project_name}:{file_path}"
-        self.graph_db_service.upsert_node(
-            node_id=file_node_id,
-            node_name=file_path.name,
-            node_type="file",
-            language=language,
-            file_path=str(file_path),
+            return None
+
+        scope = build_file_scope(language, file_path, extracted)
+        # Builtins are dropped unless the file defines or imports the same name
+        shadowed = {name for names in extracted["defined_symbols"].values() for name in names}
+        usages_by_node = extracted["symbols"].usages(shadowed | set(scope.imports))
+        nodes = extracted["nodes"]
+        for node in nodes:
+            node.node_hash = node.compute_hash()
+            node.qualified_name = join_name(scope.module, node.qualified_name)
+
+        return ParsedFile(
             project_name=project_name,
-            start_line=1,
-            end_line=len(content.splitlines()),
-            summary=f"File {file_path.name}",
-            node_hash=compute_node_hash(content),
-            symbols_defined=[],
-            symbols_used=[],
-            node_kind="file",
-        )
-        # --- LINK FILE TO PROJECT ---
-        self.graph_db_service.link_project_to_node(
-            project_name,
-            file_node_id,
-            "CONTAINS",
-            {"reason": "project_root"}
+            file_path=file_path,
+            file_name=file_name,
+            language=language,
+            file_hash=hashlib.sha256(source.data).hexdigest(),
+            line_count=source.line_count,
+            nodes=nodes,
+            defined_symbols=extracted["defined_symbols"],
+            usages_by_node=usages_by_node,
+            scope=scope,
+            revision=revision,
+            blob_sha=blob_sha,
         )
 
-        batch_texts, batch_metas, batch_ids = [], [], []
+    def ingest_code_file(self, file_path: Path, project_name: str) -> List[str]:
+        """
+        Ingests one file into every sink and returns the IDs of nodes that changed
+        in at least one sink that tracks what it holds.
+        """
+        parsed = self.parse_code_file(file_path, project_name)
+        if parsed is None:
+            return []
+        return self.ingest_parsed(parsed)
+
+    def ingest_parsed(self, parsed: ParsedFile) -> List[str]:
+        project_name = parsed.project_name
+        node_ids = [node.node_id for node in parsed.nodes]
+        stored_by_sink = [sink.lookup(project_name, node_ids) for sink in self.sinks]
+        writes = [SinkWrite(parsed) for _ in self.sinks]
+        changed_ids = []
+        # Sinks that hold nothing between runs take every node without marking it changed
+        stateless = [i for i, sink in enumerate(self.sinks) if not sink.tracks_state]
+
+        for node in parsed.nodes:
+            node_id = node.node_id
+            stored = [by_node.get(node_id) for by_node in stored_by_sink]
+            stale = [
+                i for i, entry in enumerate(stored)
+                if self.sinks[i].tracks_state and (entry is None or entry.node_hash != node.node_hash)
+            ]
+            if not stale and not stateless:
+                continue
 
-        # ---- CODE NODES ----
-        for node in extracted["nodes"]:
-            node_id = node["node_id"]
-            node_hash = compute_node_hash(node["full_code"])
+            # Reuse a summary any sink already holds for this exact version
+            summary = next(
+                (e.summary for e in stored if e and e.node_hash == node.node_hash and e.summary),
+                None,
+            )
+            if self.content_store:
+                # Identical code anywhere (other projects, vendored copies) shares one summary
+                node.summary = self.content_store.summary_for(
+                    node.node_hash,
+                    lambda: node.full_code,
+                    lambda code: summary or self.scheduler.summarize(code),
+                )
+            else:
+                node.summary = summary or self.scheduler.summarize(node.full_code)
 
-            existing = self.graph_db_service.get_node(node_id)
-            if existing and existing.get("node_hash") == node_hash:
-                continue
+            for i in stale + stateless:
+                writes[i].nodes.append(node)
+            if stale:
+                changed_ids.append(node_id)
 
-            summary = summarize_code(node["full_code"])
+        for sink, write in zip(self.sinks, writes):
+            sink.write(write)
 
-            self.graph_db_service.upsert_node(
-                node_id=node_id,
-                node_name=node["node_name"],
-                node_type=node["node_type"],
-                language=language,
-                file_path=str(file_path),
-                project_name=project_name,
-                start_line=node["start_line"],
-                end_line=node["end_line"],
-                summary=summary,
-                node_hash=node_hash,
-                symbols_defined=extracted["defined_symbols"].get(node_id, []),
-                symbols_used=[u[1] for u in extracted["usages"] if u[0] == node_id],
-                node_kind=node["node_type"],
+        removed = {node_id: name for write in writes for node_id, name in write.removed.items()}
+        self._record_changes(project_name, changed_ids, removed)
+
+        if self.content_store:
+            self.content_store.replace_file_refs(
+                project_name,
+                parsed.node_id_prefix,
+                [(node.node_id, node.node_hash) for node in parsed.nodes],
+                removed,
             )
 
-            # ---- STRUCTURE ----
-            parent_id = node.get("parent_id")
-            if parent_id:
-                self.graph_db_service.link(
-                    parent_id,
-                    node_id,
-                    "CONTAINS",
-                    {"reason": "ast_structure"},
-                )
+        return changed_ids
+
+    def _record_changes(self, project_name: str, changed_ids: List[str], removed: Dict[str, str]):
+        if not changed_ids and not removed:
+            return
+        with self._changes_lock:
+            changes = self._changes.setdefault(project_name, NodeChanges())
+            for node_id in changed_ids:
+                changes.removed.pop(node_id, None)
+            changes.changed.update(changed_ids)
+            changes.changed.difference_update(removed)
+            changes.removed.update(removed)
+
+    def pop_changes(self, project_name: str) -> NodeChanges:
+        """Returns and forgets the nodes written or removed for a project since the last call."""
+        with self._changes_lock:
+            return self._changes.pop(project_name, NodeChanges())
+
+    def restore_changes(self, project_name: str, restored: NodeChanges):
+        """
+        Puts back changes taken with pop_changes whose linking failed, so the next
+        link still revisits them. Changes recorded since then take precedence.
+        """
+        with self._changes_lock:
+            changes = self._changes.setdefault(project_name, NodeChanges())
+            changes.changed.update(i for i in restored.changed if i not in changes.removed)
+            for node_id, name in restored.removed.items():
+                if node_id not in changes.changed:
+                    changes.removed.setdefault(node_id, name)
+            changes.external.update(restored.external)
+
+    def ingest_codebase(
+            self,
+            folder: Path,
+            project_name: str,
+            max_workers: int = 2,
+            extra_ignore_globs: Optional[List[str]] = None,
+            executor: Optional[Executor] = None,
+    ):
+        """
+        Ingests every discovered file of a project. When `executor` is given the files
+        are run on it (shared between projects), otherwise a private pool is used.
+        Afterwards whatever was stored for files no longer on disk is deleted.
+        """
+        discovered: Set[str] = set()
+
+        def track(paths: Iterable[Path]) -> Iterator[Path]:
+            for path in paths:
+                discovered.add(str(path))
+                yield path
+
+        files = track(discover_files(
+            folder,
+            extensions=SUPPORTED_CODE_EXTENSIONS.keys(),
+            ignore_dirs=IGNORE_CODE_FOLDERS,
+            extra_ignore_globs=extra_ignore_globs,
+            build_output_dirs=BUILD_OUTPUT_FOLDERS,
+        ))
+
+        for sink in self.sinks:
+            sink.begin_project(project_name)
+
+        try:
+            if executor is not None:
+                self._ingest_files(executor, files, project_name, max_workers)
             else:
-                self.graph_db_service.link(
-                    file_node_id,
-                    node_id,
-                    "CONTAINS",
-                    {"reason": "file_structure"},
-                )
+                with ThreadPoolExecutor(max_workers=max_workers) as own_executor:
+                    self._ingest_files(own_executor, files, project_name, max_workers)
+            # Only a discovery that ran to completion tells which files were deleted
+            self._remove_missing_files(project_name, discovered)
+        finally:
+            for sink in self.sinks:
+                sink.finish_project(project_name)
+
+    def _remove_missing_files(self, project_name: str, file_paths: Set[str]):
+        removed = {}
+        for sink in self.sinks:
+            removed.update(sink.remove_missing_files(project_name, file_paths))
+        self._record_changes(project_name, [], removed)
+        if removed and self.content_store:
+            self.content_store.remove_refs(removed)
+
+    def ingest_revision(
+            self,
+            repo: Path,
+            project_name: str,
+            revision: str,
+            max_workers: int = 2,
+            extra_ignore_globs: Optional[List[str]] = None,
+            executor: Optional[Executor] = None,
+    ) -> Dict[str, int]:
+        """
+        Indexes one git revision (branch, tag or SHA) straight from the object store,
+        without checking it out. Files are keyed by blob, so a blob already stored for
+        any other revision is only tagged with this one; only new blobs are read,
+        parsed and written. Afterwards the revision is dropped from files it no longer
+        contains, and nodes no revision references are deleted.
+        """
+        repo = Path(repo)
+        commit = resolve_commit(repo, revision)
+        tracked = list(select_tracked_files(
+            list_tracked_files(repo, commit),
+            extensions=SUPPORTED_CODE_EXTENSIONS.keys(),
+            ignore_dirs=IGNORE_CODE_FOLDERS,
+            extra_ignore_globs=extra_ignore_globs,
+            build_output_dirs=BUILD_OUTPUT_FOLDERS,
+        ))
+        ids_by_path = {f.path: file_node_id(project_name, f.path, f.blob_sha) for f in tracked}
+        all_ids = list(ids_by_path.values())
+
+        for sink in self.sinks:
+            sink.begin_project(project_name)
+            sink.begin_revision(project_name, revision, commit)
 
-            # ---- VECTOR ----
-            batch_texts.append(
-                f"Type: {node['node_type']}\n"
-                f"Name: {node['node_name']}\n"
-                f"Summary: {summary}\n\n"
-                f"Code:\n{node['truncated_code']}"
-            )
-            batch_metas.append(
-                {
-                    "project": project_name,
-                    "file_path": str(file_path),
-                    "language": language,
-                    "node_type": node["node_type"],
-                    "node_name": node["node_name"],
-                    "symbols_defined": ",".join(
-                        extracted["defined_symbols"].get(node_id, [])),
-                }
-            )
-            batch_ids.append(node_id)
-
-            if len(batch_texts) >= self.batch_size:
-                self.db.insert(self.db.code, batch_texts, batch_metas, batch_ids)
-                batch_texts, batch_metas, batch_ids = [], [], []
-
-        if batch_texts:
-            self.db.insert(self.db.code, batch_texts, batch_metas, batch_ids)
-
-    def ingest_codebase(self, folder: Path, project_name: str, max_workers: int = 2):
-        self.graph_db_service.upsert_project(project_name)
-        files = [
-            f
-            for f in folder.rglob("*")
-            if f.is_file()
-               and f.suffix in SUPPORTED_CODE_EXTENSIONS
-               and not any(p in f.parts for p in IGNORE_CODE_FOLDERS)
-        ]
-
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = [executor.submit(self.ingest_code_file, f, project_name) for f in files]
-            for future in as_completed(futures):
-                future.result()
+        try:
+            missing = set()
+            tracking_sinks = 0
+            for sink in self.sinks:
+                existing = sink.existing_files(project_name, all_ids)
+                if existing is None:
+                    continue
+                tracking_sinks += 1
+                sink.add_revision(project_name, revision, [i for i in all_ids if i in existing])
+                missing.update(i for i in all_ids if i not in existing)
+            if not tracking_sinks:
+                missing = set(all_ids)
+
+            to_parse = [f for f in tracked if ids_by_path[f.path] in missing]
+            with BlobReader(repo) as reader:
+                ingest = lambda f: self._ingest_blob(reader, f, project_name, revision)
+                if executor is not None:
+                    self._run_bounded(executor, ingest, to_parse, max_workers)
+                else:
+                    with ThreadPoolExecutor(max_workers=max_workers) as own_executor:
+                        self._run_bounded(own_executor, ingest, to_parse, max_workers)
+
+            for sink in self.sinks:
+                sink.retain_revision(project_name, revision, all_ids)
+        finally:
+            for sink in self.sinks:
+                sink.finish_project(project_name)
+
+        return {"files": len(tracked), "parsed": len(to_parse), "reused": len(tracked) - len(to_parse)}
+
+    def _ingest_blob(self, reader: BlobReader, tracked: TrackedFile, project_name: str, revision: str) -> List[str]:
+        data = reader.read(tracked.blob_sha)
+        if looks_generated_or_binary(data):
+            return []
+
+        parsed = self.parse_source(
+            data,
+            tracked.path,
+            PurePosixPath(tracked.path).name,
+            project_name,
+            revision=revision,
+            blob_sha=tracked.blob_sha,
+        )
+        return self.ingest_parsed(parsed) if parsed else []
+
+    def _ingest_files(self, executor: Executor, files: Iterable[Path], project_name: str, max_workers: int):
+        self._run_bounded(executor, lambda f: self.ingest_code_file(f, project_name), files, max_workers)
+
+    def _run_bounded(self, executor: Executor, fn: Callable, items: Iterable, max_workers: int):
+        # Keep a bounded number of items in flight so discovery stays streaming
+        max_in_flight = max_workers * 4
+        pending = set()
+        for item in items:
+            pending.add(executor.submit(fn, item))
+            if len(pending) >= max_in_flight:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    future.result()
+        for future in as_completed(pending):
+            future.result()
@@ -0,0 +1,641 @@
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Set
+
+from src.app.configuration import config
+from src.app.services.ingestion.chunking import Chunk, build_chunks
+from src.app.services.ingestion.content_store import ContentStore
+from src.app.services.ingestion.ingestion_scheduler import ModelScheduler
+from src.app.services.ingestion.node_records import NodeRecord
+from src.app.services.ingestion.symbol_scopes import FileScope, reference_name
+
+if TYPE_CHECKING:
+    from src.app.configuration.vector_db import VectorDB
+    from src.app.services.graph_db_service import GraphDBService
+
+# Chroma metadata cannot hold lists, so revision membership is one boolean key per revision
+REVISION_KEY_PREFIX = "rev:"
+
+
+def revision_metadata_key(revision: str) -> str:
+    return f"{REVISION_KEY_PREFIX}{revision}"
+
+
+@dataclass
+class ParsedFile:
+    """
+    Everything the pipeline learned about one file. Parsed and summarized once,
+    then handed to every enabled sink.
+    """
+    project_name: str
+    file_path: str
+    file_name: str
+    language: str
+    file_hash: str
+    line_count: int
+    nodes: List[NodeRecord]
+    defined_symbols: Dict[str, List[str]]
+    # node ID -> {used symbol: occurrences}, without locals and builtins
+    usages_by_node: Dict[str, Dict[str, int]]
+    scope: FileScope = field(default_factory=FileScope)
+    revision: Optional[str] = None
+    blob_sha: Optional[str] = None
+
+    @property
+    def file_node_id(self) -> str:
+        return file_node_id(self.project_name, self.file_path, self.blob_sha)
+
+    @property
+    def node_id_prefix(self) -> str:
+        """What the IDs of the file's code nodes start with, before `:<name>:<line>`."""
+        return self.file_node_id if self.blob_sha else self.file_path
+
+
+def file_node_id(project_name: str, file_path: str, blob_sha: Optional[str] = None) -> str:
+    """
+    Files read from git are keyed by blob as well, so every revision containing the
+    same blob shares one file node (and the code nodes under it).
+    """
+    if blob_sha:
+        return f"{project_name}:{file_path}@{blob_sha[:12]}"
+    return f"{project_name}:{file_path}"
+
+
+@dataclass
+class StoredNode:
+    node_hash: Optional[str]
+    summary: Optional[str] = None
+
+
+@dataclass
+class SinkWrite:
+    """
+    The slice of a parsed file a single sink has to write: the file itself plus
+    the nodes this sink does not already hold at the current hash.
+    """
+    parsed: ParsedFile
+    nodes: List[NodeRecord] = field(default_factory=list)
+    # Filled in by sinks that drop nodes no longer in the file: node ID -> node name
+    removed: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class NodeChanges:
+    """
+    Nodes of a project that were written or removed since the project was last
+    linked, so the linker only has to revisit links that involve them. `external`
+    holds names whose exports changed in a library the project depends on.
+    """
+    changed: Set[str] = field(default_factory=set)
+    removed: Dict[str, str] = field(default_factory=dict)
+    external: Set[str] = field(default_factory=set)
+
+    def __len__(self) -> int:
+        return len(self.changed) + len(self.removed) + len(self.external)
+
+
+class IngestionSink:
+    """
+    Base class for ingestion outputs. Sinks only persist; parsing and summarization
+    happen once in IngestionService regardless of how many sinks are enabled.
+    """
+    name = "sink"
+    # Whether `lookup` reports what the sink holds. Sinks that hold nothing between runs
+    # get every node, but do not make nodes count as changed for linking.
+    tracks_state = True
+
+    def begin_project(self, project_name: str):
+        pass
+
+    def lookup(self, project_name: str, node_ids: List[str]) -> Dict[str, StoredNode]:
+        """
+        Returns what the sink already holds for the given nodes. Nodes whose stored
+        hash matches are skipped, and stored summaries are reused by other sinks.
+        """
+        return {}
+
+    def write(self, write: SinkWrite):
+        raise NotImplementedError
+
+    def remove_missing_files(self, project_name: str, file_paths: Set[str]) -> Dict[str, str]:
+        """
+        Deletes what the sink holds for working-tree files of the project that are
+        not in `file_paths`, i.e. were deleted since the last run. Returns node ID ->
+        name of the removed code nodes.
+        """
+        return {}
+
+    def finish_project(self, project_name: str):
+        pass
+
+    # ---- Revisions ----
+
+    def begin_revision(self, project_name: str, revision: str, commit: str):
+        pass
+
+    def existing_files(self, project_name: str, file_node_ids: List[str]) -> Optional[Set[str]]:
+        """
+        Returns which of the (blob-keyed) files the sink already holds, or None if
+        the sink does not track files and should not force re-parsing.
+        """
+        return None
+
+    def add_revision(self, project_name: str, revision: str, file_node_ids: List[str]):
+        """Marks already stored files, and their nodes, as part of `revision`."""
+        pass
+
+    def retain_revision(self, project_name: str, revision: str, file_node_ids: List[str]):
+        """
+        Drops `revision` from every file not in `file_node_ids`, deleting what no
+        revision references any more.
+        """
+        pass
+
+
+# -------------------------
+# Neo4j graph
+# -------------------------
+
+class GraphSink(IngestionSink):
+    name = "graph"
+
+    def __init__(self, graph_db_service: "GraphDBService"):
+        self.graph_db_service = graph_db_service
+
+    def begin_project(self, project_name: str):
+        self.graph_db_service.upsert_project(project_name)
+        self.graph_db_service.backfill_symbols(project_name)
+
+    def begin_revision(self, project_name: str, revision: str, commit: str):
+        self.graph_db_service.upsert_revision(project_name, revision, commit)
+
+    def remove_missing_files(self, project_name: str, file_paths: Set[str]) -> Dict[str, str]:
+        return self.graph_db_service.delete_missing_files(project_name, list(file_paths))
+
+    def finish_project(self, project_name: str):
+        # Cached chat queries over this project are stale from here on
+        self.graph_db_service.bump_generation(project_name)
+
+    def existing_files(self, project_name: str, file_node_ids: List[str]) -> Optional[Set[str]]:
+        return self.graph_db_service.existing_node_ids(file_node_ids)
+
+    def add_revision(self, project_name: str, revision: str, file_node_ids: List[str]):
+        self.graph_db_service.add_revision_to_files(file_node_ids, revision)
+
+    def retain_revision(self, project_name: str, revision: str, file_node_ids: List[str]):
+        self.graph_db_service.retain_revision_files(project_name, revision, file_node_ids)
+
+    def lookup(self, project_name: str, node_ids: List[str]) -> Dict[str, StoredNode]:
+        stored = {}
+        for node_id in node_ids:
+            existing = self.graph_db_service.get_node(node_id)
+            if existing:
+                stored[node_id] = StoredNode(existing.get("node_hash"), existing.get("summary"))
+        return stored
+
+    def write(self, write: SinkWrite):
+        parsed = write.parsed
+
+        # ---- FILE NODE ----
+        file_node_id = parsed.file_node_id
+        self.graph_db_service.upsert_node(
+            node_id=file_node_id,
+            node_name=parsed.file_name,
+            node_type="file",
+            language=parsed.language,
+            file_path=parsed.file_path,
+            project_name=parsed.project_name,
+            start_line=1,
+            end_line=parsed.line_count,
+            summary=f"File {parsed.file_name}",
+            node_hash=parsed.file_hash,
+            symbols_defined=[],
+            symbols_used=[],
+            node_kind="file",
+            revision=parsed.revision,
+            # A file's qualified name is its module; its import table is resolved against by the linker
+            qualified_name=parsed.scope.module,
+            imports=parsed.scope.to_list(),
+        )
+        # --- LINK FILE TO PROJECT ---
+        self.graph_db_service.link_project_to_node(
+            parsed.project_name,
+            file_node_id,
+            "CONTAINS",
+            {"reason": "project_root"}
+        )
+
+        # ---- REMOVED NODES ----
+        if not parsed.revision:
+            # Blob-keyed revision files never change, so only working-tree files can lose nodes
+            write.removed.update(self.graph_db_service.delete_removed_nodes(
+                file_node_id, [node.node_id for node in parsed.nodes]
+            ))
+
+        # ---- CODE NODES ----
+        for node in write.nodes:
+            node_id = node.node_id
+            usages = parsed.usages_by_node.get(node_id, {})
+            self.graph_db_service.upsert_node(
+                node_id=node_id,
+                node_name=node.node_name,
+                node_type=node.node_type,
+                language=parsed.language,
+                file_path=parsed.file_path,
+                project_name=parsed.project_name,
+                start_line=node.start_line,
+                end_line=node.end_line,
+                summary=node.summary,
+                node_hash=node.node_hash,
+                symbols_defined=parsed.defined_symbols.get(node_id, []),
+                symbols_used=list(usages),
+                symbols_used_counts=list(usages.values()),
+                node_kind=node.node_type,
+                revision=parsed.revision,
+                qualified_name=node.qualified_name,
+                file_id=file_node_id,
+                extends=list(node.extends),
+                implements=list(node.implements),
+                annotations=list(node.annotations),
+            )
+
+            # ---- SHARED CONTENT ----
+            self.graph_db_service.attach_content(node_id, node.node_hash, node.summary)
+
+            # ---- STRUCTURE ----
+            parent_id = node.parent_id
+            if parent_id:
+                self.graph_db_service.link(
+                    parent_id,
+                    node_id,
+                    "CONTAINS",
+                    {"reason": "ast_structure"},
+                )
+            else:
+                self.graph_db_service.link(
+                    file_node_id,
+                    node_id,
+                    "CONTAINS",
+                    {"reason": "file_structure"},
+                )
+
+        # ---- SYMBOLS ----
+        self.graph_db_service.write_symbols(parsed.project_name, self._symbol_rows(parsed, write.nodes))
+
+    @staticmethod
+    def _symbol_rows(parsed: ParsedFile, nodes: List[NodeRecord]) -> List[dict]:
+        """
+        DEFINES/REFERENCES rows for the file (which defines its module) and the
+        written nodes. `self.x` references resolve against the nearest enclosing type.
+        """
+        def symbol(qualified_name: str, **extra) -> dict:
+            return {"qualified_name": qualified_name, "name": qualified_name.rsplit(".", 1)[-1], **extra}
+
+        module = parsed.scope.module
+        rows = [{"node_id": parsed.file_node_id, "defines": [symbol(module)] if module else [], "references": []}]
+
+        records = {node.node_id: node for node in parsed.nodes}
+        for node in nodes:
+            owner = records.get(node.parent_id)
+            while owner is not None and owner.node_type not in ("class", "interface", "enum"):
+                owner = records.get(owner.parent_id)
+            owner_name = owner.qualified_name if owner is not None else None
+
+            references: Dict[str, int] = {}
+            for used, count in parsed.usages_by_node.get(node.node_id, {}).items():
+                name = reference_name(used, parsed.scope, owner_name)
+                references[name] = references.get(name, 0) + count
+            rows.append({
+                "node_id": node.node_id,
+                "defines": [symbol(node.qualified_name or node.node_name)],
+                "references": [symbol(name, count=count) for name, count in references.items()],
+            })
+        return rows
+
+
+# -------------------------
+# Chroma vectors
+# -------------------------
+
+class VectorSink(IngestionSink):
+    name = "vector"
+
+    def __init__(
+            self,
+            db: "VectorDB",
+            scheduler: ModelScheduler,
+            batch_size: int = 16,
+            content_store: Optional[ContentStore] = None,
+    ):
+        self.db = db
+        self.scheduler = scheduler
+        self.batch_size = batch_size
+        self.content_store = content_store
+
+    def lookup(self, project_name: str, node_ids: List[str]) -> Dict[str, StoredNode]:
+        if not node_ids:
+            return {}
+        result = self.db.code.get(ids=node_ids, include=["metadatas"])
+        stored = {}
+        for node_id, meta in zip(result["ids"], result["metadatas"]):
+            meta = meta or {}
+            stored[node_id] = StoredNode(meta.get("node_hash"), meta.get("summary"))
+        return stored
+
+    def write(self, write: SinkWrite):
+        parsed = write.parsed
+        if not parsed.revision:
+            # Revision files are keyed by blob, so their nodes never change; retain_revision drops them
+            write.removed.update(self._delete_removed_nodes(parsed))
+        if not write.nodes:
+            return
+
+        # Class skeletons list member summaries; members that did not change this run keep theirs in the store
+        summaries = {}
+        if self.content_store:
+            summaries = self.content_store.get_summaries(n.node_hash for n in parsed.nodes if n.summary is None)
+        chunks = build_chunks(write.nodes, parsed.nodes, parsed.language, summaries)
+
+        # Drop extra windows of earlier, longer versions of these nodes
+        self.db.code.delete(where={"chunk_of": {"$in": [n.node_id for n in write.nodes]}})
+
+        for start in range(0, len(chunks), self.batch_size):
+            batch = chunks[start:start + self.batch_size]
+            self._flush(
+                [c.text for c in batch],
+                [self._metadata(parsed, c) for c in batch],
+                [c.chunk_id for c in batch],
+                [c.embedding_key for c in batch],
+            )
+
+    def _delete_removed_nodes(self, parsed: ParsedFile) -> Dict[str, str]:
+        """
+        Deletes the vectors of nodes no longer in the working-tree file, with their
+        extra windows. Returns node ID -> name of what was deleted.
+        """
+        node_ids = {node.node_id for node in parsed.nodes}
+        result = self.db.code.get(
+            where={"$and": [{"project": parsed.project_name}, {"file_path": parsed.file_path}]},
+            include=["metadatas"],
+        )
+
+        stale, removed = [], {}
+        for vector_id, meta in zip(result["ids"], result["metadatas"]):
+            meta = meta or {}
+            if meta.get("file_id"):
+                continue  # indexed for a revision
+            node_id = meta.get("chunk_of") or vector_id
+            if node_id in node_ids:
+                continue
+            stale.append(vector_id)
+            if not meta.get("chunk_of"):
+                removed[vector_id] = meta.get("node_name")
+
+        if stale:
+            self.db.code.delete(ids=stale)
+        return removed
+
+    def remove_missing_files(self, project_name: str, file_paths: Set[str]) -> Dict[str, str]:
+        result = self.db.code.get(where={"project": project_name}, include=["metadatas"])
+
+        stale, removed = [], {}
+        for vector_id, meta in zip(result["ids"], result["metadatas"]):
+            meta = meta or {}
+            if meta.get("file_id") or meta.get("file_path") in file_paths:
+                continue  # indexed for a revision, or still on disk
+            stale.append(vector_id)
+            if not meta.get("chunk_of"):
+                removed[vector_id] = meta.get("node_name")
+
+        if stale:
+            self.db.code.delete(ids=stale)
+        return removed
+
+    def _metadata(self, parsed: ParsedFile, chunk: Chunk) -> dict:
+        node = chunk.node
+        meta = {
+            "project": parsed.project_name,
+            "file_path": parsed.file_path,
+            "language": parsed.language,
+            "node_type": node.node_type,
+            "node_name": node.node_name,
+            "node_hash": node.node_hash,
+            "summary": node.summary,
+            "symbols_defined": ",".join(parsed.defined_symbols.get(node.node_id, [])),
+            "chunk_kind": chunk.kind,
+        }
+        if chunk.index:
+            meta["chunk_of"] = node.node_id
+        if parsed.revision:
+            meta["file_id"] = parsed.file_node_id
+            meta[revision_metadata_key(parsed.revision)] = True
+        return meta
+
+    def existing_files(self, project_name: str, file_node_ids: List[str]) -> Optional[Set[str]]:
+        return {meta["file_id"] for _, meta in self._vectors_of_files(file_node_ids)}
+
+    def add_revision(self, project_name: str, revision: str, file_node_ids: List[str]):
+        key = revision_metadata_key(revision)
+        ids = [vector_id for vector_id, meta in self._vectors_of_files(file_node_ids) if not meta.get(key)]
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            # Chroma merges metadata on update, so only the new key is sent
+            self.db.code.update(ids=chunk, metadatas=[{key: True} for _ in chunk])
+
+    def retain_revision(self, project_name: str, revision: str, file_node_ids: List[str]):
+        key = revision_metadata_key(revision)
+        keep = set(file_node_ids)
+        result = self.db.code.get(where={key: True}, include=["metadatas"])
+
+        to_delete, to_update = [], []
+        for vector_id, meta in zip(result["ids"], result["metadatas"]):
+            meta = meta or {}
+            if meta.get("file_id") in keep:
+                continue
+            others = [k for k in meta if k.startswith(REVISION_KEY_PREFIX) and k != key and meta[k]]
+            (to_update if others else to_delete).append(vector_id)
+
+        if to_delete:
+            self.db.code.delete(ids=to_delete)
+        if to_update:
+            # A None value removes the key
+            self.db.code.update(ids=to_update, metadatas=[{key: None} for _ in to_update])
+
+    def _vectors_of_files(self, file_node_ids: List[str]):
+        for start in range(0, len(file_node_ids), 500):
+            result = self.db.code.get(
+                where={"file_id": {"$in": file_node_ids[start:start + 500]}},
+                include=["metadatas"],
+            )
+            for vector_id, meta in zip(result["ids"], result["metadatas"]):
+                if meta and meta.get("file_id"):
+                    yield vector_id, meta
+
+    def _flush(self, texts: List[str], metas: List[dict], ids: List[str], keys: List[str]):
+        if not self.content_store:
+            self.scheduler.upsert_vectors(self.db, self.db.code, texts, metas, ids)
+            return
+
+        # Identical chunk text of identical code is embedded once
+        embeddings = self.content_store.get_embeddings(keys)
+        missing = {k: text for k, text in zip(keys, texts) if k not in embeddings}
+        if missing:
+            computed = dict(zip(missing, self.scheduler.embed(self.db, list(missing.values()))))
+            self.content_store.put_embeddings(computed)
+            embeddings.update(computed)
+
+        self.scheduler.upsert_vectors(
+            self.db, self.db.code, texts, metas, ids,
+            embeddings=[embeddings[k] for k in keys],
+        )
+
+
+# -------------------------
+# Local catalog
+# -------------------------
+
+class CatalogSink(IngestionSink):
+    """
+    A local SQLite catalog of every ingested node. Cheap to query, works without
+    any database running and keeps summaries around for vector-only re-ingests.
+    """
+    name = "catalog"
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path or Path(config.JAICA_DATA_DIR) / "catalog.sqlite3")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS nodes (
+                node_id    TEXT PRIMARY KEY,
+                project    TEXT NOT NULL,
+                file_path  TEXT NOT NULL,
+                language   TEXT,
+                node_type  TEXT,
+                node_name  TEXT,
+                start_line INTEGER,
+                end_line   INTEGER,
+                node_hash  TEXT,
+                summary    TEXT,
+                updated_at REAL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS nodes_project ON nodes(project)")
+        self._conn.commit()
+
+    def lookup(self, project_name: str, node_ids: List[str]) -> Dict[str, StoredNode]:
+        if not node_ids:
+            return {}
+        placeholders = ",".join("?" for _ in node_ids)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT node_id, node_hash, summary FROM nodes WHERE node_id IN ({placeholders})",
+                node_ids,
+            ).fetchall()
+        return {node_id: StoredNode(node_hash, summary) for node_id, node_hash, summary in rows}
+
+    def write(self, write: SinkWrite):
+        parsed = write.parsed
+        now = time.time()
+        rows = [
+            (
+                node.node_id,
+                parsed.project_name,
+                parsed.file_path,
+                parsed.language,
+                node.node_type,
+                node.node_name,
+                node.start_line,
+                node.end_line,
+                node.node_hash,
+                node.summary,
+                now,
+            )
+            for node in write.nodes
+        ]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO nodes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+
+    def remove_missing_files(self, project_name: str, file_paths: Set[str]) -> Dict[str, str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT node_id, file_path, node_name FROM nodes WHERE project = ?", (project_name,)
+            ).fetchall()
+            # Working-tree node IDs start with the file path, revision ones with the blob-keyed file ID
+            removed = {
+                node_id: node_name for node_id, file_path, node_name in rows
+                if file_path not in file_paths and node_id.startswith(f"{file_path}:")
+            }
+            self._conn.executemany("DELETE FROM nodes WHERE node_id = ?", [(node_id,) for node_id in removed])
+            self._conn.commit()
+        return removed
+
+
+# -------------------------
+# JSONL export
+# -------------------------
+
+class JsonlExportSink(IngestionSink):
+    """
+    Writes one JSON line per node to `<export_dir>/<project>.jsonl`.
+    Holds nothing between runs, so every node of every file is exported.
+    """
+    name = "jsonl"
+    tracks_state = False
+
+    def __init__(self, export_dir: Path):
+        self.export_dir = Path(export_dir)
+        self.export_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._files = {}
+
+    def begin_project(self, project_name: str):
+        with self._lock:
+            self._files[project_name] = open(self.export_dir / f"{project_name}.jsonl", "w", encoding="utf-8")
+
+    def write(self, write: SinkWrite):
+        parsed = write.parsed
+        lines = []
+        for node in write.nodes:
+            node_id = node.node_id
+            lines.append(json.dumps({
+                "node_id": node_id,
+                "project": parsed.project_name,
+                "file_path": parsed.file_path,
+                "language": parsed.language,
+                "node_type": node.node_type,
+                "node_name": node.node_name,
+                "qualified_name": node.qualified_name,
+                "extends": list(node.extends),
+                "implements": list(node.implements),
+                "annotations": list(node.annotations),
+                "parent_id": node.parent_id,
+                "start_line": node.start_line,
+                "end_line": node.end_line,
+                "node_hash": node.node_hash,
+                "summary": node.summary,
+                "symbols_defined": parsed.defined_symbols.get(node_id, []),
+                "symbols_used": parsed.usages_by_node.get(node_id, {}),
+                "code": node.full_code,
+            }))
+        if not lines:
+            return
+        with self._lock:
+            self._files[parsed.project_name].write("\n".join(lines) + "\n")
+
+    def finish_project(self, project_name: str):
+        with self._lock:
+            f = self._files.pop(project_name, None)
+        if f:
+            f.close()
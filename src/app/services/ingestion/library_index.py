@@ -0,0 +1,146 @@
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from src.app.configuration import config
+
+
+class LibraryExport(NamedTuple):
+    node_id: str
+    node_kind: str
+    node_name: str
+    qualified_name: str
+
+
+class LibraryIndex:
+    """
+    Exported symbols of designated library projects, and which projects depend on
+    which libraries. A dependent project resolves symbols nothing in the project
+    explains against the exports of its libraries, read from here instead of
+    loading the libraries' nodes from the graph on every link.
+
+    A library publishes its exports after it is linked; publishing returns the
+    names whose exports changed, which is what its dependents have to relink.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path or Path(config.JAICA_DATA_DIR) / "libraries.sqlite3")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # library -> (published_at, exports), so concurrent links of dependents share one read
+        self._cache: Dict[str, Tuple[float, List[LibraryExport]]] = {}
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS libraries (
+                project      TEXT PRIMARY KEY,
+                published_at REAL
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS exports (
+                library        TEXT NOT NULL,
+                node_id        TEXT NOT NULL,
+                node_kind      TEXT NOT NULL,
+                node_name      TEXT NOT NULL,
+                qualified_name TEXT NOT NULL,
+                PRIMARY KEY (library, node_id)
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS dependencies (
+                project TEXT NOT NULL,
+                library TEXT NOT NULL,
+                PRIMARY KEY (project, library)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS dependencies_library ON dependencies(library)")
+        self._conn.commit()
+
+    # -------------------------
+    # Designation & dependencies
+    # -------------------------
+
+    def add_library(self, project_name: str):
+        with self._lock:
+            self._conn.execute("INSERT OR IGNORE INTO libraries (project) VALUES (?)", (project_name,))
+            self._conn.commit()
+
+    def is_library(self, project_name: str) -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM libraries WHERE project = ?", (project_name,)).fetchone()
+        return row is not None
+
+    def add_dependencies(self, project_name: str, libraries: Iterable[str]):
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO dependencies (project, library) VALUES (?, ?)",
+                [(project_name, library) for library in libraries if library != project_name],
+            )
+            self._conn.commit()
+
+    def libraries_of(self, project_name: str) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT library FROM dependencies WHERE project = ? ORDER BY library", (project_name,)
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def dependents_of(self, library: str) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT project FROM dependencies WHERE library = ? ORDER BY project", (library,)
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    # -------------------------
+    # Exports
+    # -------------------------
+
+    def publish(self, library: str, exports: Iterable[LibraryExport]) -> Set[str]:
+        """
+        Replaces the library's exports. Returns the names of exports that were
+        added, removed or changed kind or qualified name.
+        """
+        new = {e.node_id: LibraryExport(*e) for e in exports}
+        with self._lock:
+            old = {
+                row[0]: LibraryExport(*row)
+                for row in self._conn.execute(
+                    "SELECT node_id, node_kind, node_name, qualified_name FROM exports WHERE library = ?", (library,)
+                )
+            }
+            changed = {e.node_name for node_id, e in new.items() if old.get(node_id) != e}
+            changed |= {e.node_name for node_id, e in old.items() if new.get(node_id) != e}
+            if not changed and old:
+                return set()
+
+            self._conn.execute("DELETE FROM exports WHERE library = ?", (library,))
+            self._conn.executemany(
+                "INSERT INTO exports (library, node_id, node_kind, node_name, qualified_name) VALUES (?, ?, ?, ?, ?)",
+                [(library, *e) for e in new.values()],
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO libraries (project, published_at) VALUES (?, ?)", (library, time.time())
+            )
+            self._conn.commit()
+            self._cache.pop(library, None)
+        return changed
+
+    def exports(self, library: str) -> List[LibraryExport]:
+        with self._lock:
+            row = self._conn.execute("SELECT published_at FROM libraries WHERE project = ?", (library,)).fetchone()
+            if not row or row[0] is None:
+                return []
+            cached = self._cache.get(library)
+            if cached and cached[0] == row[0]:
+                return cached[1]
+            exports = [
+                LibraryExport(*r)
+                for r in self._conn.execute(
+                    "SELECT node_id, node_kind, node_name, qualified_name FROM exports WHERE library = ?", (library,)
+                )
+            ]
+            self._cache[library] = (row[0], exports)
+        return exports
@@ -0,0 +1,115 @@
+import hashlib
+from array import array
+from typing import Optional, Sequence, Tuple
+
+
+class SourceBuffer:
+    """
+    One file's UTF-8 source plus the byte offset of every line start. Shared by all
+    node records of the file, so nested nodes never copy overlapping text. The bytes
+    are kept as read; invalid UTF-8 is dropped when a slice is decoded.
+    """
+    __slots__ = ("data", "line_starts", "has_cr")
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.has_cr = b"\r" in data
+
+        # Rows are split on "\n" only, the same way tree-sitter counts them
+        starts = array("Q", [0])
+        pos = data.find(b"\n")
+        while pos != -1:
+            starts.append(pos + 1)
+            pos = data.find(b"\n", pos + 1)
+        self.line_starts = starts
+
+    @property
+    def line_count(self) -> int:
+        if not self.data:
+            return 0
+        count = len(self.line_starts)
+        return count - 1 if self.data.endswith(b"\n") else count
+
+    def line_span(self, start_line: int, end_line: int) -> Tuple[int, int]:
+        """Byte range of lines `start_line`..`end_line` (1-based, inclusive), without the final newline."""
+        starts = self.line_starts
+        start = starts[min(start_line, len(starts)) - 1]
+        end = starts[end_line] - 1 if end_line < len(starts) else len(self.data)
+        return start, max(start, end)
+
+    def text(self, start_line: int, end_line: int) -> str:
+        start, end = self.line_span(start_line, end_line)
+        chunk = self.data[start:end].decode("utf-8", errors="ignore")
+        if self.has_cr and "\r" in chunk:
+            # Normalize CRLF so hashes do not depend on the checkout's EOL style
+            chunk = chunk.replace("\r\n", "\n")
+            if chunk.endswith("\r"):
+                chunk = chunk[:-1]
+        return chunk
+
+    def sha256(self, start_line: int, end_line: int) -> str:
+        if self.has_cr:
+            return hashlib.sha256(self.text(start_line, end_line).encode("utf-8")).hexdigest()
+        start, end = self.line_span(start_line, end_line)
+        return hashlib.sha256(memoryview(self.data)[start:end]).hexdigest()
+
+
+class NodeRecord:
+    """
+    A code node extracted from a file. Holds only offsets into the file's shared
+    SourceBuffer; code text is materialized on access and never cached.
+    """
+    __slots__ = (
+        "node_id",
+        "node_type",
+        "node_name",
+        "start_line",
+        "end_line",
+        "parent_id",
+        "max_lines",
+        "source",
+        "node_hash",
+        "summary",
+        "qualified_name",
+        "extends",
+        "implements",
+        "annotations",
+    )
+
+    def __init__(
+            self,
+            node_id: str,
+            node_type: str,
+            node_name: str,
+            start_line: int,
+            end_line: int,
+            parent_id: Optional[str],
+            source: SourceBuffer,
+            max_lines: int,
+    ):
+        self.node_id = node_id
+        self.node_type = node_type
+        self.node_name = node_name
+        self.start_line = start_line
+        self.end_line = end_line
+        self.parent_id = parent_id
+        self.max_lines = max_lines
+        self.source = source
+        self.node_hash: Optional[str] = None
+        self.summary: Optional[str] = None
+        self.qualified_name: Optional[str] = None
+        # Supertype clauses of classes and decorator/annotation names, as written in the source
+        self.extends: Sequence[str] = ()
+        self.implements: Sequence[str] = ()
+        self.annotations: Sequence[str] = ()
+
+    @property
+    def full_code(self) -> str:
+        return self.source.text(self.start_line, self.end_line)
+
+    def compute_hash(self) -> str:
+        """SHA256 of the node's full code, hashed straight from the buffer when possible."""
+        return self.source.sha256(self.start_line, self.end_line)
+
+    def __repr__(self):
+        return f"NodeRecord({self.node_id!r}, {self.node_type!r}, lines {self.start_line}-{self.end_line})"
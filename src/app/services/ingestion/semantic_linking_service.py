@@ -1,254 +1,291 @@
+import threading
 import time
-from collections import defaultdict
-from typing import Dict, List
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
 
+from src.app.configuration import config
 from src.app.services.graph_db_service import GraphDBService
+from src.app.services.ingestion.ingestion_sinks import NodeChanges
+from src.app.services.ingestion.library_index import LibraryExport, LibraryIndex
+from src.app.services.ingestion.symbol_index import LINK_TYPES, RESOLUTIONS, Link, SymbolIndex
 
 
-# --- simple node-kind compatibility rules ---
-ALLOWED_CALLER_KINDS = {"function", "method"}
-ALLOWED_CALLEE_KINDS = {"function", "method"}
+LINK_SOURCE = "semantic_linker:v3"
 
-ALLOWED_USAGE_KINDS = {
-    "class",
-    "interface",
-    "enum",
-    "function",
-    "method",
-}
+TYPE_NODE_KINDS = ("class", "interface", "enum")
 
 
 class SemanticLinkingService:
-    def __init__(self, graph_db_service: GraphDBService):
-        self.graph_db_service = graph_db_service
+    """
+    Resolves symbols used by a node to the nodes that define them, using the
+    import table and module of the file the symbol is used in (see SymbolIndex).
+    A bare name that no scope explains only resolves when exactly one node in the
+    project defines it, so common names like `get` or `run` do not link to every
+    definition.
 
-    def run(self, project_name: str):
-        nodes = self.graph_db_service.get_nodes_by_project(project_name)
-        symbol_index = self._build_symbol_index(nodes)
+    With a LibraryIndex, imported or qualified symbols the project does not define
+    are resolved against the exports of the library projects it depends on, and
+    linking a library republishes its exports and relinks its dependents.
 
-        links: list[dict] = []
+    Runs for the same project are serialized, so two link threads never diff
+    against the same stored links at once.
 
-        links += self._collect_calls(nodes, symbol_index)
-        links += self._collect_usages(nodes, symbol_index)
-        links += self._collect_implements(nodes, symbol_index)
-        links += self._collect_overrides(nodes, symbol_index)
+    EXTENDS, IMPLEMENTS and OVERRIDES come from the supertype clauses recorded at
+    extraction, never from which names a class or method happens to use.
+    """
 
-        if links:
-            links = self._dedupe(links)
-            self.graph_db_service.link_batch(links)
+    def __init__(self, graph_db_service: GraphDBService, library_index: Optional[LibraryIndex] = None):
+        self.graph_db_service = graph_db_service
+        self.library_index = library_index
+        self._links_migrated = False
+        self._symbols_ready: Set[str] = set()
+        self._locks_guard = threading.Lock()
+        self._project_locks: Dict[str, threading.Lock] = {}
 
+    def _project_lock(self, project_name: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._project_locks.setdefault(project_name, threading.Lock())
 
-    def _build_symbol_index(self, nodes: List[dict]) -> Dict[str, List[dict]]:
+    def run(
+            self,
+            project_name: str,
+            changes: Optional[NodeChanges] = None,
+            on_progress: Optional[Callable[[int, int], None]] = None,
+            skip_dependents: Iterable[str] = (),
+    ):
         """
-        Maps symbol_name -> defining nodes
+        Links the whole project, or with `changes` only what the changed and removed
+        nodes affect. Either way only the difference to the stored links is written;
+        `on_progress(done, total)` is called as link writes complete. When the project
+        is a library, dependents in `skip_dependents` are not relinked; they must be
+        linked afterwards and pick up the new exports themselves.
         """
-        index: Dict[str, List[dict]] = defaultdict(list)
+        if changes is not None and not changes:
+            return
+        with self._project_lock(project_name):
+            self._link_project(project_name, changes, on_progress)
 
-        for node in nodes:
-            for symbol in node.get("symbols_defined", []):
-                normalized = self._normalize_symbol(symbol)
-                index[normalized].append(node)
+        # Outside the lock: relinking a dependent takes the dependent's lock
+        if self.library_index and self.library_index.is_library(project_name):
+            self.publish_library(project_name, skip=skip_dependents)
 
-        return index
-
-    def _collect_calls(
-            self,
-            nodes: list[dict],
-            symbol_index: dict[str, list[dict]],
-    ) -> list[dict]:
-        links = []
-
-        for node in nodes:
-            caller_id = node["node_id"]
-            caller_kind = node.get("node_kind")
-
-            if caller_kind not in ALLOWED_CALLER_KINDS:
-                continue
-
-            for used in node.get("symbols_used", []):
-                symbol = self._normalize_symbol(used)
-                candidates = symbol_index.get(symbol)
-
-                if not candidates:
-                    continue
-
-                callee = self._select_best_candidate(
-                    candidates,
-                    allowed_kinds=ALLOWED_CALLEE_KINDS,
-                )
-
-                if not callee:
-                    continue
-
-                if callee["node_id"] == caller_id:
-                    continue  # guard self-link
-
-                links.append({
-                    "from": caller_id,
-                    "to": callee["node_id"],
-                    "type": "CALLS",
-                    "props": {
-                        "confidence": 0.6,
-                        "source": "semantic_linker:v1",
-                        "created_at": time.time(),
-                    },
-                })
-
-        return links
-
-    def _collect_usages(
+    def _link_project(
             self,
-            nodes: list[dict],
-            symbol_index: dict[str, list[dict]],
-    ) -> list[dict]:
-        links = []
-
-        for node in nodes:
-            user_id = node["node_id"]
-
-            for used in node.get("symbols_used", []):
-                symbol = used.split(".")[-1]
-                candidates = symbol_index.get(symbol)
-
-                if not candidates:
-                    continue
-
-                target = self._select_best_candidate(candidates, ALLOWED_USAGE_KINDS)
-
-                if not target:
-                    continue
-
-                if target["node_id"] == user_id:
-                    continue
-
-                links.append({
-                    "from": user_id,
-                    "to": target["node_id"],
-                    "type": "USES",
-                    "props": {
-                        "confidence": 0.5,
-                        "source": "semantic_linker:v1",
-                        "created_at": time.time(),
-                    },
-                })
-
-        return links
-
-    def _collect_implements(
-            self,
-            nodes: list[dict],
-            symbol_index: dict[str, list[dict]],
-    ) -> list[dict]:
-        links = []
-
-        for node in nodes:
-            if node.get("node_kind") != "class":
-                continue
-
-            class_id = node["node_id"]
-
-            for used in node.get("symbols_used", []):
-                symbol = used.split(".")[-1]
-                candidates = symbol_index.get(symbol)
-
-                if not candidates:
-                    continue
-
-                for target in candidates:
-                    if target.get("node_kind") != "interface":
-                        continue
-
-                    links.append({
-                        "from": class_id,
-                        "to": target["node_id"],
-                        "type": "IMPLEMENTS",
-                        "props": {
-                            "confidence": 0.75,
-                            "source": "semantic_linker:v1",
-                            "created_at": time.time(),
-                        },
-                    })
-
-        return links
-
-    def _collect_overrides(
+            project_name: str,
+            changes: Optional[NodeChanges],
+            on_progress: Optional[Callable[[int, int], None]],
+    ):
+        if not self._links_migrated:
+            # Legacy SEMANTIC_LINK edges would otherwise sit next to their native replacements
+            self.graph_db_service.migrate_semantic_links()
+            self._links_migrated = True
+
+        if changes is None or len(changes) > config.LINKING_INCREMENTAL_MAX_NODES:
+            # Streamed straight into the index; no node dict outlives its record
+            index = SymbolIndex()
+            for node in self.graph_db_service.iter_link_nodes(project_name):
+                index.add(node)
+            self._add_library_exports(project_name, index)
+            index.finalize()
+            links = index.links()
+            existing = self.graph_db_service.get_semantic_links(project_name)
+        else:
+            if project_name not in self._symbols_ready:
+                # Incremental loading seeks DEFINES/REFERENCES edges, which older nodes may lack
+                self.graph_db_service.backfill_symbols(project_name)
+                self._symbols_ready.add(project_name)
+            index, links, existing = self._collect_incremental(project_name, changes)
+
+        if self._write_diff(index, links, existing, on_progress):
+            self.graph_db_service.bump_generation(project_name)
+            # Links into a library change what its own cached queries see, e.g. external callers
+            for library in self.library_index.libraries_of(project_name) if self.library_index else ():
+                self.graph_db_service.bump_generation(library)
+
+    def publish_library(self, library: str, skip: Iterable[str] = ()) -> Dict[str, int]:
+        """
+        Publishes the library's exports and relinks, in each dependent project except
+        those in `skip`, only the uses of names whose exports changed. Returns
+        dependent -> number of changed names.
+        """
+        self.library_index.add_library(library)
+        exports = (LibraryExport(**e) for e in self.graph_db_service.iter_library_exports(library))
+        changed = self.library_index.publish(library, exports)
+        if not changed:
+            return {}
+
+        relinked = {}
+        for dependent in self.library_index.dependents_of(library):
+            if dependent not in skip and self.graph_db_service.project_exists(dependent):
+                self.run(dependent, NodeChanges(external=changed))
+                relinked[dependent] = len(changed)
+        return relinked
+
+    def _add_library_exports(self, project_name: str, index: SymbolIndex):
+        if not self.library_index:
+            return
+        for library in self.library_index.libraries_of(project_name):
+            for export in self.library_index.exports(library):
+                index.add_external(*export)
+
+    def _collect_incremental(
             self,
-            nodes: list[dict],
-            symbol_index: dict[str, list[dict]],
-    ) -> list[dict]:
-        links = []
-
-        for node in nodes:
-            if node.get("node_kind") != "method":
-                continue
-
-            method_name = node["node_name"]
-            method_id = node["node_id"]
-
-            for used in node.get("symbols_used", []):
-                symbol = used.split(".")[-1]
-                candidates = symbol_index.get(symbol)
-
-                if not candidates:
-                    continue
-
-                for parent in candidates:
-                    if parent.get("node_kind") != "method":
-                        continue
-
-                    if parent["node_name"] != method_name:
-                        continue
-
-                    links.append({
-                        "from": method_id,
-                        "to": parent["node_id"],
-                        "type": "OVERRIDES",
-                        "props": {
-                            "confidence": 0.8,
-                            "source": "semantic_linker:v1",
-                            "created_at": time.time(),
-                        },
-                    })
-
-        return links
-
-
-    # -------------------------
-    # HELPERS
-    # -------------------------
-    def _normalize_symbol(self, symbol: str) -> str:
+            project_name: str,
+            changes: NodeChanges,
+    ) -> Tuple[SymbolIndex, Iterable[Link], List[dict]]:
         """
-        Normalizes symbols like:
-        - self.foo -> foo
-        - Class.method -> method
-        - module.func -> func
+        Recomputes the links leaving changed nodes, and the links of any node to a
+        symbol a changed or removed node, or a changed library export, defines (a new
+        definition can take over, or make ambiguous, what a name used elsewhere
+        resolves to). Members of a changed or removed type, and of every type below
+        it, count as changed names, since what they override depends on its
+        supertypes and members.
         """
-        return symbol.split(".")[-1].strip()
-
-    def _select_best_candidate(
-        self,
-        candidates: List[dict],
-        allowed_kinds: set,
-    ) -> dict | None:
+        graph = self.graph_db_service
+        changed = graph.get_link_nodes_by_ids(sorted(changes.changed))
+        changed_ids = {n["node_id"] for n in changed}
+        files = {n["node_id"]: n for n in self._file_nodes(project_name, changed)}
+
+        affected = {s for n in changed for s in n.get("symbols_defined") or []} | set(changes.removed.values())
+        affected |= changes.external
+        types = [n for n in changed if n.get("node_kind") in TYPE_NODE_KINDS]
+        types += self._subtypes(project_name, {n["node_name"] for n in types} | set(changes.removed.values()))
+        if types:
+            affected |= {n["node_name"] for n in graph.get_link_nodes_contained(sorted(n["node_id"] for n in types))}
+        used = {s.split(".")[-1].strip() for n in changed for s in n.get("symbols_used") or []}
+        # Imports can alias a name, so resolving a use may need the definitions of the imported name
+        used |= {e.partition("=")[2].rsplit(".", 1)[-1] for f in files.values() for e in f.get("imports") or []}
+
+        users = graph.get_link_nodes_using(project_name, sorted(affected)) if affected else []
+        definers = graph.get_link_nodes_defining(project_name, sorted(affected | used))
+
+        nodes = {n["node_id"]: n for n in changed + users + definers}
+        self._add_hierarchy(project_name, changed + users, nodes)
+        missing = [n for n in nodes.values() if n.get("file_id") not in files]
+        files.update((f["node_id"], f) for f in self._file_nodes(project_name, missing))
+
+        index = SymbolIndex()
+        positions = {node_id: index.add(node) for node_id, node in {**files, **nodes}.items()}
+        self._add_library_exports(project_name, index)
+        index.finalize()
+
+        sources = [positions[node_id] for node_id in changed_ids]
+        user_sources = [positions[n["node_id"]] for n in users if n["node_id"] not in changed_ids]
+        affected_names = {sid for sid in map(index.lookup, affected) if sid}
+
+        def links() -> Iterable[Link]:
+            yield from index.links(sources)
+            for link in index.links(user_sources):
+                if index.names[link[1]] in affected_names:
+                    yield link
+
+        existing = graph.get_semantic_links(project_name, from_ids=sorted(changed_ids), target_names=sorted(affected))
+        return index, links(), existing
+
+    def _subtypes(self, project_name: str, names: Set[str]) -> List[dict]:
+        """Every type extending or implementing one named in `names`, transitively."""
+        found: Dict[str, dict] = {}
+        searched = set()
+        while names:
+            searched |= names
+            below = [n for n in self.graph_db_service.get_link_nodes_extending(project_name, sorted(names))
+                     if n["node_id"] not in found]
+            found.update((n["node_id"], n) for n in below)
+            names = {n["node_name"] for n in below} - searched
+        return list(found.values())
+
+    def _add_hierarchy(self, project_name: str, sources: List[dict], nodes: Dict[str, dict]):
         """
-        Picks the first compatible candidate.
-        Deterministic and safe.
+        Adds to `nodes` the owner types of the source methods and every type up their
+        supertype chains, which overrides and supertype links resolve through.
         """
-        for node in candidates:
-            if node.get("node_kind") in allowed_kinds:
-                return node
-        return None
-
-    def _dedupe(self, links: list[dict]) -> list[dict]:
-        seen = set()
-        unique = []
-
-        for l in links:
-            key = (l["from"], l["to"], l["type"])
-            if key in seen:
-                continue
-            seen.add(key)
-            unique.append(l)
-
-        return unique
+        graph = self.graph_db_service
+        owners = {
+            n["qualified_name"].rsplit(".", 1)[0] for n in sources
+            if n.get("node_kind") in ("function", "method") and "." in (n.get("qualified_name") or "")
+        }
+        types = graph.get_link_nodes_by_qualified_names(project_name, sorted(owners)) if owners else []
+        types += [n for n in sources if n.get("node_kind") in TYPE_NODE_KINDS]
+
+        searched = set()
+        while types:
+            nodes.update((n["node_id"], n) for n in types)
+            names = {
+                s.rsplit(".", 1)[-1] for n in types for s in (n.get("extends") or []) + (n.get("implements") or [])
+            } - searched
+            searched |= names
+            types = [n for n in graph.get_link_nodes_defining(project_name, sorted(names))
+                     if n["node_id"] not in nodes] if names else []
+
+    def _file_nodes(self, project_name: str, nodes: List[dict]) -> List[dict]:
+        if not nodes:
+            return []
+        return self.graph_db_service.get_link_file_nodes(
+            project_name,
+            sorted({n["file_id"] for n in nodes if n.get("file_id")}),
+            # Nodes ingested before scopes were recorded have no file_id
+            sorted({n["file_path"] for n in nodes if not n.get("file_id")}),
+        )
+
+    def _write_diff(
+            self,
+            index: SymbolIndex,
+            links: Iterable[Link],
+            existing: List[dict],
+            on_progress: Optional[Callable[[int, int], None]] = None,
+    ) -> int:
+        """
+        Creates new links, deletes links that no longer resolve and updates links
+        whose resolution changed. Unchanged links are not touched and keep their
+        `created_at`. Returns the number of links written or deleted.
+        """
+        stored = {(l["from"], l["to"], l["type"]): l for l in existing}
+        node_ids = index.node_ids
+        created_at = time.time()
+
+        writes = []
+        for source, target, link_type, resolution in links:
+            key = (node_ids[source], node_ids[target], LINK_TYPES[link_type])
+            resolved_by, confidence = RESOLUTIONS[resolution]
+            # Links are unique per key, so whatever is left in `stored` afterwards is stale
+            old = stored.pop(key, None)
+            if old is None:
+                writes.append(self._link(key, resolved_by, confidence, created_at))
+            elif (old.get("confidence"), old.get("resolved_by")) != (confidence, resolved_by):
+                writes.append(self._link(key, resolved_by, confidence))
+
+        stale = [{"from": f, "to": t, "type": k} for (f, t, k) in stored]
+
+        total = len(stale) + len(writes)
+        done = 0
+        lock = threading.Lock()
+
+        def advance(count: int):
+            nonlocal done
+            with lock:
+                done += count
+                current = done
+            if on_progress:
+                on_progress(current, total)
+
+        if stale:
+            self.graph_db_service.unlink_batch(stale, advance)
+        if writes:
+            self.graph_db_service.link_batch(writes, advance)
+        return total
 
+    # -------------------------
+    # HELPERS
+    # -------------------------
+    def _link(
+            self,
+            key: Tuple[str, str, str],
+            resolved_by: str,
+            confidence: float,
+            created_at: Optional[float] = None,
+    ) -> dict:
+        """Updates leave out `created_at`, so a link keeps the time it was first made."""
+        source, target, link_type = key
+        props = {"confidence": confidence, "resolved_by": resolved_by, "source": LINK_SOURCE}
+        if created_at is not None:
+            props["created_at"] = created_at
+        return {"from": source, "to": target, "type": link_type, "props": props}
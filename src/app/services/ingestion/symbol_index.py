@@ -0,0 +1,462 @@
+"""
+Compact symbol index behind the semantic linker.
+
+Every string (names, symbols, modules, file keys) is interned to an int, nodes
+live in parallel arrays addressed by an integer index, used symbols sit in one
+flat array, and candidate lists are bucketed by target kind up front. Links are
+produced in a single pass over the source nodes, every relationship type at once.
+
+Inheritance is not guessed from used symbols: EXTENDS and IMPLEMENTS come from
+the supertype clauses extraction records on each class, and OVERRIDES from
+walking a method's owner up those resolved supertypes to the nearest same-named
+member.
+"""
+
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Union
+
+from src.app.services.ingestion.symbol_scopes import OVERRIDE_ANNOTATIONS, SELF_RECEIVERS, FileScope, qualified_match
+
+# ---- node kinds ----
+KIND_CODES = {
+    "file": 0,
+    "class": 1,
+    "interface": 2,
+    "enum": 3,
+    "function": 4,
+    "method": 5,
+    "constructor": 6,
+}
+KIND_OTHER = 7
+
+
+def _mask(*kinds: str) -> int:
+    return sum(1 << KIND_CODES[k] for k in kinds)
+
+
+CALLER_KINDS = _mask("function", "method")
+CALLEE_KINDS = _mask("function", "method")
+USAGE_KINDS = _mask("class", "interface", "enum", "function", "method")
+TYPE_KINDS = _mask("class", "interface", "enum")
+SUPERTYPE_KINDS = _mask("class", "interface")
+
+# Candidate buckets, one per target kind set
+TARGET_GROUPS = (CALLEE_KINDS, USAGE_KINDS, SUPERTYPE_KINDS)
+GROUP_CALLEE, GROUP_USAGE, GROUP_SUPERTYPE = range(3)
+
+# ---- link types ----
+LINK_TYPES = ("CALLS", "USES", "EXTENDS", "IMPLEMENTS", "OVERRIDES")
+CALLS, USES, EXTENDS, IMPLEMENTS, OVERRIDES = range(5)
+
+# ---- resolution strategies with their confidence, strongest first ----
+RESOLUTIONS = (
+    ("enclosing_class", 0.9),
+    ("import", 0.95),
+    ("qualified_name", 0.9),
+    ("same_file", 0.85),
+    ("same_module", 0.8),
+    ("wildcard_import", 0.7),
+    ("unique_name", 0.5),
+    ("library", 0.9),
+    # Overrides found by walking the owner's supertypes, and those the method also declares
+    ("inheritance", 0.9),
+    ("override_annotation", 0.95),
+)
+(BY_SELF, BY_IMPORT, BY_QUALIFIED_NAME, BY_FILE, BY_MODULE, BY_WILDCARD, BY_UNIQUE_NAME, BY_LIBRARY,
+ BY_INHERITANCE, BY_OVERRIDE_ANNOTATION) = range(len(RESOLUTIONS))
+
+# Every group can cross into library projects: calls, usages and supertypes
+LIBRARY_GROUPS = (GROUP_CALLEE, GROUP_USAGE, GROUP_SUPERTYPE)
+
+# (source index, target index, link type, resolution)
+Link = Tuple[int, int, int, int]
+
+# A single node index, or a list of them once a key has several
+Bucket = Union[int, List[int]]
+
+
+def _put(table: Dict[int, Bucket], key: int, index: int):
+    # Most keys have one node; storing it bare saves a list per entry
+    found = table.get(key)
+    if found is None:
+        table[key] = index
+    elif isinstance(found, int):
+        if found != index:
+            table[key] = [found, index]
+    elif found[-1] != index:
+        found.append(index)
+
+
+def _get(table: Dict[int, Bucket], key: int) -> Sequence[int]:
+    found = table.get(key)
+    if found is None:
+        return ()
+    return (found,) if isinstance(found, int) else found
+
+
+def _pair(scope: int, name: int) -> int:
+    return scope << 32 | name
+
+
+def _suffix_key(qualified_name: str) -> int:
+    """
+    Hash of the last two segments: whatever a dotted target suffix-matches shares
+    them. Only the hash is kept; collisions are filtered by `qualified_match`.
+    """
+    return hash(".".join(qualified_name.rsplit(".", 2)[-2:]))
+
+
+class SymbolIndex:
+    """
+    Add nodes (projected dicts, see LINK_NODE_FIELDS) with `add`, call `finalize`,
+    then read links from `links`. Nothing keeps a reference to the added dicts.
+    """
+
+    def __init__(self):
+        self.strings: List[str] = [""]
+        self._ids: Dict[str, int] = {"": 0}
+
+        self.node_ids: List[str] = []
+        self.kinds = array("B")
+        self.names = array("I")
+        self.qualified = array("I")
+        self.owners = array("I")
+        self.files = array("I")
+        self.used = array("I")
+        self.used_start = array("Q", [0])
+        # Supertype symbols per node, each `symbol << 1 | 1` for an implements clause
+        self.supertypes = array("I")
+        self.supertypes_start = array("Q", [0])
+        # Nodes annotated @Override / decorated @override
+        self.marked_overrides: Set[int] = set()
+
+        self.scopes: Dict[int, FileScope] = {}
+        self._scopes_by_path: Dict[int, FileScope] = {}
+        self._file_paths = array("I")
+        self._modules: Dict[int, int] = {}
+        self._defined: List[Tuple[int, int]] = []
+
+        # Definitions by name per target group, and by name within a file or module
+        # or by qualified-name suffix. See `_put` for the value layout.
+        self.by_name: Tuple[Dict[int, Bucket], ...] = tuple({} for _ in TARGET_GROUPS)
+        self.by_file: Dict[int, Bucket] = {}
+        self.by_module: Dict[int, Bucket] = {}
+        self.by_suffix: Dict[int, Bucket] = {}
+        # Library exports, by qualified-name suffix; never candidates of in-project strategies
+        self.by_library: Dict[int, Bucket] = {}
+        # Types by qualified name, and functions and methods by (owner qualified name, name)
+        self.by_type: Dict[int, Bucket] = {}
+        self.by_member: Dict[int, Bucket] = {}
+        self._supertypes_of: Dict[int, List[Tuple[int, int, int]]] = {}
+
+    def intern(self, value: Optional[str]) -> int:
+        if not value:
+            return 0
+        sid = self._ids.get(value)
+        if sid is None:
+            sid = self._ids[value] = len(self.strings)
+            self.strings.append(value)
+        return sid
+
+    def lookup(self, value: str) -> Optional[int]:
+        return self._ids.get(value)
+
+    def __len__(self) -> int:
+        return len(self.node_ids)
+
+    # -------------------------
+    # Building
+    # -------------------------
+
+    def add(self, node: dict) -> int:
+        index = len(self.node_ids)
+        kind = KIND_CODES.get(node.get("node_kind"), KIND_OTHER)
+        file_path = self.intern(node.get("file_path"))
+
+        if kind == KIND_CODES["file"]:
+            scope = FileScope.from_list(node.get("qualified_name"), node.get("imports"))
+            file_key = self.intern(node["node_id"])
+            self.scopes[file_key] = scope
+            self._scopes_by_path.setdefault(file_path, scope)
+        else:
+            # Nodes ingested before scopes were recorded have no file_id; fall back to their path
+            file_key = self.intern(node.get("file_id")) or file_path
+
+        self.node_ids.append(node["node_id"])
+        self.kinds.append(kind)
+        self.names.append(self.intern(node.get("node_name")))
+        self.qualified.append(self.intern(node.get("qualified_name")))
+        self.files.append(file_key)
+        self._file_paths.append(file_path)
+
+        for symbol in node.get("symbols_defined") or []:
+            self._defined.append((self.intern(symbol.split(".")[-1].strip()), index))
+        # Deduplicated at extraction; nodes ingested before that may still repeat symbols
+        self.used.extend(self.intern(symbol) for symbol in dict.fromkeys(node.get("symbols_used") or []))
+        self.used_start.append(len(self.used))
+        self.supertypes.extend(self.intern(symbol) << 1 for symbol in node.get("extends") or [])
+        self.supertypes.extend(self.intern(symbol) << 1 | 1 for symbol in node.get("implements") or [])
+        self.supertypes_start.append(len(self.supertypes))
+        if not OVERRIDE_ANNOTATIONS.isdisjoint(node.get("annotations") or ()):
+            self.marked_overrides.add(index)
+        return index
+
+    def add_external(self, node_id: str, node_kind: str, node_name: str, qualified_name: str) -> int:
+        """
+        Adds a node exported by a library project. It is only a target, and only for
+        imported or qualified symbols nothing in the project resolves.
+        """
+        index = len(self.node_ids)
+        self.node_ids.append(node_id)
+        self.kinds.append(KIND_CODES.get(node_kind, KIND_OTHER))
+        self.names.append(self.intern(node_name))
+        self.qualified.append(self.intern(qualified_name))
+        self.files.append(0)
+        self._file_paths.append(0)
+        self.used_start.append(len(self.used))
+        self.supertypes_start.append(len(self.supertypes))
+        if qualified_match(qualified_name, node_name):
+            _put(self.by_library, _suffix_key(qualified_name), index)
+        return index
+
+    def finalize(self):
+        """
+        Resolves node scopes and owners, and files every definition under its name
+        per target kind group, and under its name per file, per module and per
+        qualified-name suffix, so no strategy scans every node sharing a name.
+        Types and members, library exports included, are filed for override lookup.
+        """
+        for i in range(len(self.node_ids)):
+            file_key = self.files[i]
+            scope = self.scopes.get(file_key) or self._scopes_by_path.get(self._file_paths[i])
+            if scope is None:
+                scope = self.scopes[file_key] = FileScope()
+            elif file_key not in self.scopes:
+                self.scopes[file_key] = scope
+            self._modules.setdefault(file_key, self.intern(scope.module))
+
+            qualified_name = self.strings[self.qualified[i]]
+            if not qualified_name:
+                qualified_name = ".".join(p for p in (scope.module, self.strings[self.names[i]]) if p)
+                self.qualified[i] = self.intern(qualified_name)
+            owner = self.intern(qualified_name.rsplit(".", 1)[0]) if "." in qualified_name else 0
+            self.owners.append(owner)
+
+            bit = 1 << self.kinds[i]
+            if bit & TYPE_KINDS:
+                _put(self.by_type, self.qualified[i], i)
+            elif bit & CALLEE_KINDS and owner:
+                _put(self.by_member, _pair(owner, self.names[i]), i)
+
+        for name, index in self._defined:
+            bit = 1 << self.kinds[index]
+            for group, mask in enumerate(TARGET_GROUPS):
+                if bit & mask:
+                    _put(self.by_name[group], name, index)
+            file_key = self.files[index]
+            _put(self.by_file, _pair(file_key, name), index)
+            _put(self.by_module, _pair(self._modules[file_key], name), index)
+            qualified_name = self.strings[self.qualified[index]]
+            if qualified_match(qualified_name, self.strings[name]):
+                _put(self.by_suffix, _suffix_key(qualified_name), index)
+        self._defined = []
+
+    # -------------------------
+    # Resolution
+    # -------------------------
+
+    def _parts(self, symbol: int) -> Tuple[Tuple[str, ...], int]:
+        """Segments of a used symbol and the ID of its last one (0 if nothing is named so)."""
+        parts = tuple(p for p in (p.strip() for p in self.strings[symbol].split(".")) if p)
+        return parts, (self._ids.get(parts[-1], 0) if parts else 0)
+
+    def _select(self, nodes: Sequence[int], source: int, mask: int) -> List[int]:
+        kinds = self.kinds
+        return [c for c in nodes if c != source and (1 << kinds[c]) & mask]
+
+    def _qualified(self, target: str, bucket: Sequence[int], source: int, mask: int) -> List[int]:
+        """Nodes whose qualified name is `target` or ends with it."""
+        nodes = _get(self.by_suffix, _suffix_key(target)) if "." in target else bucket
+        strings, qualified = self.strings, self.qualified
+        return [c for c in self._select(nodes, source, mask) if qualified_match(strings[qualified[c]], target)]
+
+    def resolve(self, symbol: int, source: int, group: int) -> Tuple[List[int], int]:
+        """
+        Returns the target indices `symbol`, used inside node `source`, refers to
+        among nodes of the given target group, and how it was resolved (-1 if not).
+        Scopes are tried from most to least specific; the first one that explains
+        the symbol wins. Library exports are only tried when none does.
+        """
+        parts, name = self._parts(symbol)
+        if not parts:
+            return [], -1
+        scope = self.scopes[self.files[source]]
+        head = parts[0]
+
+        # Imports may alias (`from .models import User as U`), so look up the imported name
+        imported = scope.imports.get(head)
+        if imported:
+            if len(parts) > 1:
+                imported = ".".join((imported,) + parts[1:])
+            name = self._ids.get(imported.rsplit(".", 1)[-1], 0)
+
+        matches, how = self._resolve_local(parts, name, imported, scope, source, group)
+        if matches or not self.by_library or group not in LIBRARY_GROUPS:
+            return matches, how
+
+        if imported:
+            targets = [imported]
+        else:
+            targets = [".".join(parts)] if len(parts) > 1 and head not in SELF_RECEIVERS else []
+            targets += [".".join((package,) + parts) for package in scope.wildcards]
+        mask = TARGET_GROUPS[group]
+        for target in targets:
+            if "." not in target:
+                continue
+            matches = [
+                c for c in self._select(_get(self.by_library, _suffix_key(target)), source, mask)
+                if qualified_match(self.strings[self.qualified[c]], target)
+            ]
+            if matches:
+                return matches, BY_LIBRARY
+        return [], how
+
+    def _resolve_local(
+            self,
+            parts: Tuple[str, ...],
+            name: int,
+            imported: Optional[str],
+            scope: FileScope,
+            source: int,
+            group: int,
+    ) -> Tuple[List[int], int]:
+        head = parts[0]
+        file_key = self.files[source]
+        mask = TARGET_GROUPS[group]
+
+        bucket = _get(self.by_name[group], name)
+        if len(bucket) <= 2:
+            bucket = [c for c in bucket if c != source]
+        if not bucket:
+            return [], -1
+
+        # self.save / this.repo: a member of the enclosing class, which lives in the same file
+        same_file = _get(self.by_file, _pair(file_key, name))
+        if head in SELF_RECEIVERS and len(parts) == 2:
+            owner, owners = self.owners[source], self.owners
+            matches = [c for c in self._select(same_file, source, mask) if owner and owners[c] == owner]
+            if matches:
+                return matches, BY_SELF
+
+        # An imported qualifier or name settles it; no weaker project scope is tried
+        if imported:
+            return self._qualified(imported, bucket, source, mask), BY_IMPORT
+
+        if len(parts) > 1 and head not in SELF_RECEIVERS:
+            matches = self._qualified(".".join(parts), bucket, source, mask)
+            if matches:
+                return matches, BY_QUALIFIED_NAME
+
+        matches = self._select(same_file, source, mask)
+        if matches:
+            return matches, BY_FILE
+
+        module = self._modules[file_key]
+        if module:
+            matches = self._select(_get(self.by_module, _pair(module, name)), source, mask)
+            if matches:
+                return matches, BY_MODULE
+
+        for package in scope.wildcards:
+            matches = self._qualified(f"{package}.{self.strings[name]}", bucket, source, mask)
+            if matches:
+                return matches, BY_WILDCARD
+
+        if len(bucket) == 1:
+            return list(bucket), BY_UNIQUE_NAME
+        return [], -1
+
+    # -------------------------
+    # Links
+    # -------------------------
+
+    def _supertypes(self, node: int) -> List[Tuple[int, int, int]]:
+        """(target, EXTENDS or IMPLEMENTS, resolution) for each resolved supertype clause of `node`."""
+        found = self._supertypes_of.get(node)
+        if found is None:
+            found = []
+            for entry in self.supertypes[self.supertypes_start[node]:self.supertypes_start[node + 1]]:
+                targets, how = self.resolve(entry >> 1, node, GROUP_SUPERTYPE)
+                link_type = IMPLEMENTS if entry & 1 else EXTENDS
+                found.extend((target, link_type, how) for target in targets)
+            self._supertypes_of[node] = found
+        return found
+
+    def _overridden(self, method: int) -> List[int]:
+        """
+        The members `method` overrides: walking up from its owner type, breadth
+        first, the nearest supertypes that declare a member of the same name.
+        """
+        owner = self.owners[method]
+        if not owner:
+            return []
+        # The owner type lives in the method's file; anything else is a namesake
+        types = [t for t in _get(self.by_type, owner) if self.files[t] == self.files[method]]
+        name, found, visited = self.names[method], [], set(types)
+        while types and not found:
+            parents = []
+            for node in types:
+                for parent, _, _ in self._supertypes(node):
+                    if parent not in visited:
+                        visited.add(parent)
+                        parents.append(parent)
+            for parent in parents:
+                found.extend(_get(self.by_member, _pair(self.qualified[parent], name)))
+            types = parents
+        return found
+
+    def links(self, sources: Optional[Iterable[int]] = None) -> Iterator[Link]:
+        """
+        Yields every link leaving `sources` (all nodes by default), each
+        (source, target, type) once, in a single pass over their used symbols
+        and supertype clauses.
+        """
+        kinds, used, starts = self.kinds, self.used, self.used_start
+        file_kind = KIND_CODES["file"]
+
+        for source in range(len(self.node_ids)) if sources is None else sources:
+            kind = kinds[source]
+            if kind == file_kind:
+                continue
+            bit = 1 << kind
+            seen = set()
+
+            for symbol in used[starts[source]:starts[source + 1]]:
+                usages, how = self.resolve(symbol, source, GROUP_USAGE)
+                found = [(USES, usages, how)]
+
+                # Callees are a subset of the usage kinds: when the usage resolution has
+                # callee targets (or an import settled it), the callee group resolves the same
+                if bit & CALLER_KINDS:
+                    targets = [t for t in usages if (1 << kinds[t]) & CALLEE_KINDS]
+                    if targets or how == BY_IMPORT:
+                        found.append((CALLS, targets, how))
+                    else:
+                        found.append((CALLS, *self.resolve(symbol, source, GROUP_CALLEE)))
+
+                for link_type, targets, resolution in found:
+                    for target in targets:
+                        key = (target, link_type)
+                        if key not in seen:
+                            seen.add(key)
+                            yield source, target, link_type, resolution
+
+            if bit & TYPE_KINDS:
+                for target, link_type, resolution in self._supertypes(source):
+                    if (target, link_type) not in seen:
+                        seen.add((target, link_type))
+                        yield source, target, link_type, resolution
+            elif bit & CALLEE_KINDS:
+                resolution = BY_OVERRIDE_ANNOTATION if source in self.marked_overrides else BY_INHERITANCE
+                for target in self._overridden(source):
+                    yield source, target, OVERRIDES, resolution
@@ -0,0 +1,244 @@
+"""
+Per-file scope tables used to resolve symbols to qualified targets.
+
+Every file gets a module name (the Java package, or the dotted file path for
+Python) and a table mapping each imported name to what it refers to. Code nodes
+get a qualified name: the module followed by the names of their enclosing
+classes and their own name. The semantic linker resolves a used symbol through
+the table of the file that uses it instead of matching bare names project-wide.
+
+While a file is extracted, a SymbolTable records what each node binds locally
+and what it uses, so only names that can refer to another node are stored.
+"""
+
+import builtins
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set
+
+WILDCARD = "*"
+
+# Receivers that refer to the enclosing class rather than to an imported name
+SELF_RECEIVERS = {"self", "cls", "this", "super"}
+
+DOTTED_NAME = re.compile(r"^[A-Za-z_][\w]*(?:\s*\.\s*[A-Za-z_][\w]*)*$")
+
+# Annotations (Java) and decorators (Python) declaring that a method overrides a supertype's
+OVERRIDE_ANNOTATIONS = {"Override", "override", "typing.override", "typing_extensions.override"}
+
+
+@dataclass
+class FileScope:
+    module: str = ""
+    imports: Dict[str, str] = field(default_factory=dict)
+    wildcards: List[str] = field(default_factory=list)
+
+    def to_list(self) -> List[str]:
+        """Neo4j properties cannot hold maps, so the table is stored as `alias=target` strings."""
+        return [f"{alias}={target}" for alias, target in self.imports.items()] + \
+               [f"{WILDCARD}={target}" for target in self.wildcards]
+
+    @classmethod
+    def from_list(cls, module: Optional[str], entries: Optional[Iterable[str]]) -> "FileScope":
+        scope = cls(module or "")
+        for entry in entries or []:
+            alias, _, target = entry.partition("=")
+            if alias == WILDCARD:
+                scope.wildcards.append(target)
+            elif target:
+                scope.imports[alias] = target
+        return scope
+
+
+def qualified_match(qualified_name: Optional[str], target: str) -> bool:
+    """
+    True if `qualified_name` is `target` or ends with it on a dot boundary. Python
+    modules are named after the full file path, so imports match by suffix.
+    """
+    if not qualified_name:
+        return False
+    return qualified_name == target or qualified_name.endswith("." + target)
+
+
+def join_name(*parts: Optional[str]) -> str:
+    return ".".join(p for p in parts if p)
+
+
+def reference_name(symbol: str, scope: FileScope, owner: Optional[str] = None) -> str:
+    """
+    Best qualified name for a used symbol without the rest of the project: an
+    imported head is expanded through the file's import table and `self.x` to a
+    member of `owner` (the enclosing class). Anything else stays as written.
+    """
+    head, _, rest = symbol.partition(".")
+    if head in SELF_RECEIVERS and head != "super" and owner and rest and "." not in rest:
+        return join_name(owner, rest)
+    imported = scope.imports.get(head)
+    if imported:
+        return join_name(imported, rest)
+    return symbol
+
+
+# -------------------------
+# Python
+# -------------------------
+
+def python_module_name(file_path: str) -> str:
+    path = file_path.replace("\\", "/")
+    if path.endswith(".py"):
+        path = path[:-3]
+    parts = [p for p in path.split("/") if p and p not in (".", "..") and not p.endswith(":")]
+    if parts and parts[-1] == "__init__":
+        parts.pop()
+    return ".".join(parts)
+
+
+def _python_package(module: str, file_path: str) -> str:
+    if file_path.replace("\\", "/").endswith("/__init__.py"):
+        return module
+    return module.rsplit(".", 1)[0] if "." in module else ""
+
+
+def _resolve_relative(module_ref: str, package: str) -> str:
+    dots = len(module_ref) - len(module_ref.lstrip("."))
+    if not dots:
+        return module_ref
+    base = package.split(".") if package else []
+    if dots > 1:
+        base = base[:len(base) - (dots - 1)]
+    return join_name(".".join(base), module_ref[dots:])
+
+
+def add_python_import(scope: FileScope, statement: str, file_path: str):
+    """Adds one `import ...` or `from ... import ...` statement to the scope."""
+    text = " ".join(statement.replace("\\\n", " ").split())
+    if text.startswith("from "):
+        module_ref, _, names = text[5:].partition(" import ")
+        module_ref = _resolve_relative(module_ref.strip(), _python_package(scope.module, file_path))
+        names = names.strip().strip("()")
+        for part in names.split(","):
+            part = part.strip()
+            if not part:
+                continue
+            if part == WILDCARD:
+                scope.wildcards.append(module_ref)
+                continue
+            name, _, alias = part.partition(" as ")
+            scope.imports[(alias or name).strip()] = join_name(module_ref, name.strip())
+    elif text.startswith("import "):
+        for part in text[7:].split(","):
+            name, _, alias = part.strip().partition(" as ")
+            name = name.strip()
+            if not name:
+                continue
+            if alias:
+                scope.imports[alias.strip()] = name
+            else:
+                # `import a.b` binds `a`
+                head = name.split(".", 1)[0]
+                scope.imports.setdefault(head, head)
+
+
+# -------------------------
+# Java
+# -------------------------
+
+def java_package(statement: str) -> str:
+    text = " ".join(statement.split())
+    if text.startswith("package "):
+        return text[8:].rstrip(";").strip()
+    return ""
+
+
+def add_java_import(scope: FileScope, statement: str):
+    text = " ".join(statement.split()).rstrip(";").strip()
+    if not text.startswith("import "):
+        return
+    target = text[7:].strip()
+    if target.startswith("static "):
+        target = target[7:].strip()
+    target = target.replace(" ", "")
+    if target.endswith(".*"):
+        scope.wildcards.append(target[:-2])
+    else:
+        scope.imports[target.rsplit(".", 1)[-1]] = target
+
+
+# -------------------------
+# Extraction-time symbol table
+# -------------------------
+
+# Names no project node defines unless the file shadows them
+BUILTIN_NAMES = {
+    "python": frozenset(dir(builtins)),
+    "java": frozenset({
+        "Object", "String", "StringBuilder", "CharSequence", "Boolean", "Byte", "Character", "Short", "Integer",
+        "Long", "Float", "Double", "Number", "Void", "Math", "System", "Thread", "Runnable", "Iterable",
+        "Comparable", "AutoCloseable", "Cloneable", "Class", "Enum", "Record", "Throwable", "Exception", "Error",
+        "RuntimeException", "IllegalArgumentException", "IllegalStateException", "NullPointerException",
+        "UnsupportedOperationException", "IndexOutOfBoundsException", "InterruptedException", "Override",
+        "Deprecated", "SuppressWarnings", "FunctionalInterface", "SafeVarargs", "var",
+    }),
+}
+
+
+class SymbolTable:
+    """
+    Names bound inside each node of one file (parameters, assignment, loop, `with`
+    and `except` targets, type parameters) and the symbols each node uses.
+    `usages` drops uses of locals, receivers and builtins, and counts the rest.
+
+    Python methods do not see names bound in their class body, so enclosing
+    classes are skipped there; Java members see every enclosing scope.
+    """
+
+    def __init__(self, language: str):
+        self.language = language
+        self._parents: Dict[str, Optional[str]] = {}
+        self._classes: Set[str] = set()
+        self._bound: Dict[str, Set[str]] = {}
+        self._declared: Dict[str, Set[str]] = {}
+        self._used: Dict[str, List[str]] = {}
+
+    def enter(self, node_id: str, node_type: str, parent_id: Optional[str]):
+        self._parents[node_id] = parent_id
+        if node_type in ("class", "interface", "enum"):
+            self._classes.add(node_id)
+
+    def bind(self, node_id: str, name: str):
+        self._bound.setdefault(node_id, set()).add(name)
+
+    def declare_outer(self, node_id: str, name: str):
+        """`global` / `nonlocal`: the name is not local to this node even if assigned."""
+        self._declared.setdefault(node_id, set()).add(name)
+
+    def use(self, node_id: str, symbol: str):
+        self._used.setdefault(node_id, []).append(symbol)
+
+    def _locals(self, node_id: str) -> Set[str]:
+        names = self._bound.get(node_id, set()) - self._declared.get(node_id, set())
+        parent = self._parents.get(node_id)
+        while parent is not None:
+            if self.language != "python" or parent not in self._classes:
+                names |= self._bound.get(parent, set())
+            parent = self._parents.get(parent)
+        return names
+
+    def usages(self, shadowed: Iterable[str] = ()) -> Dict[str, Dict[str, int]]:
+        """
+        node ID -> {symbol: occurrences}, in order of first use. `shadowed` are names
+        the file defines or imports, which are kept even if they are builtins.
+        """
+        builtin = BUILTIN_NAMES.get(self.language, frozenset()) - set(shadowed)
+        counts: Dict[str, Dict[str, int]] = {}
+        for node_id, symbols in self._used.items():
+            local = self._locals(node_id)
+            node_counts: Dict[str, int] = {}
+            for symbol in symbols:
+                # Dotted uses stay even on a local receiver: `repo.save` still names a member
+                if "." not in symbol and (symbol in local or symbol in builtin or symbol in SELF_RECEIVERS):
+                    continue
+                node_counts[symbol] = node_counts.get(symbol, 0) + 1
+            if node_counts:
+                counts[node_id] = node_counts
+        return counts
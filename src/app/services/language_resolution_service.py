@@ -0,0 +1,187 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.app.configuration import config
+
+if TYPE_CHECKING:
+    from src.app.models.code_classifier.code_classifier import CodeClassifier
+
+EXTENSION_LANGUAGES = {
+    ".py": "Python",
+    ".pyw": "Python",
+    ".pyi": "Python",
+    ".java": "Java",
+    ".js": "JavaScript",
+    ".mjs": "JavaScript",
+    ".ts": "TypeScript",
+    ".kt": "Kotlin",
+    ".go": "Go",
+    ".rb": "Ruby",
+    ".rs": "Rust",
+    ".cs": "C#",
+    ".c": "C",
+    ".h": "C",
+    ".cpp": "C++",
+    ".hpp": "C++",
+    ".php": "PHP",
+    ".sh": "Shell",
+}
+
+SHEBANG_LANGUAGES = (
+    (re.compile(r"python[0-9.]*\b"), "Python"),
+    (re.compile(r"\bjava\b"), "Java"),
+    (re.compile(r"\b(?:node|deno)\b"), "JavaScript"),
+    (re.compile(r"\b(?:ba|z|k|da)?sh\b"), "Shell"),
+    (re.compile(r"\bruby\b"), "Ruby"),
+    (re.compile(r"\bphp\b"), "PHP"),
+)
+
+# Lexical signals scored per language; each pattern counts once per match
+HEURISTIC_SIGNALS = {
+    "Python": (
+        re.compile(r"^\s*def \w+\s*\(.*\)\s*(->\s*[^:]+)?:\s*$", re.MULTILINE),
+        re.compile(r"^\s*class \w+(\(.*\))?:\s*$", re.MULTILINE),
+        re.compile(r"^\s*from [\w.]+ import ", re.MULTILINE),
+        re.compile(r"^\s*import [\w.]+(\s+as\s+\w+)?\s*$", re.MULTILINE),
+        re.compile(r"^\s*(elif|except|finally)\b.*:\s*$", re.MULTILINE),
+        re.compile(r"\bself\.\w+"),
+        re.compile(r"^\s*@\w+(\.\w+)*(\(.*\))?\s*$\n\s*(async\s+)?def ", re.MULTILINE),
+    ),
+    "Java": (
+        re.compile(r"^\s*package [\w.]+;\s*$", re.MULTILINE),
+        re.compile(r"^\s*import (static )?[\w.*]+;\s*$", re.MULTILINE),
+        re.compile(r"\b(public|private|protected)\s+(static\s+)?(final\s+)?[\w<>\[\], ]+\s+\w+\s*[(;=]"),
+        re.compile(r"\b(class|interface|enum)\s+\w+(<[^>]*>)?\s*(extends|implements|\{)"),
+        re.compile(r"@(Override|Autowired|Test|Inject)\b"),
+        re.compile(r"\bSystem\.out\.print"),
+        re.compile(r"\bnew \w+(<[^>]*>)?\("),
+        re.compile(r";\s*$", re.MULTILINE),
+    ),
+}
+
+HEURISTIC_MIN_SCORE = 2
+HEURISTIC_MIN_MARGIN = 2.0
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8", errors="ignore")).hexdigest()
+
+
+def language_from_extension(file_path: Optional[str]) -> Optional[str]:
+    if not file_path:
+        return None
+    return EXTENSION_LANGUAGES.get(Path(file_path).suffix.lower())
+
+
+def language_from_shebang(content: str) -> Optional[str]:
+    if not content.startswith("#!"):
+        return None
+    first_line = content.split("\n", 1)[0]
+    for pattern, language in SHEBANG_LANGUAGES:
+        if pattern.search(first_line):
+            return language
+    return None
+
+
+def language_from_heuristics(content: str) -> Optional[str]:
+    """
+    Scores cheap lexical signals per language. Returns a language only when it
+    clearly wins; anything close is left to the classifier.
+    """
+    scores = {
+        language: sum(len(p.findall(content)) for p in patterns)
+        for language, patterns in HEURISTIC_SIGNALS.items()
+    }
+    ranked = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
+    (best, best_score), (_, runner_up) = ranked[0], ranked[1]
+
+    if best_score < HEURISTIC_MIN_SCORE:
+        return None
+    if runner_up and best_score < runner_up * HEURISTIC_MIN_MARGIN:
+        return None
+    return best
+
+
+class LanguageResolutionService:
+    """
+    Resolves the language of a file or snippet with a chain of increasingly
+    expensive checks: extension, shebang, lexical heuristics and finally the
+    ONNX classifier. Content-based results are cached by content hash.
+
+    The classifier is obtained from `code_classifier_provider` only when a snippet
+    is genuinely ambiguous, so the model is never loaded for known file types.
+    """
+
+    def __init__(
+            self,
+            code_classifier_provider: Callable[[], "CodeClassifier"],
+            cache_size: int = config.LANGUAGE_CACHE_SIZE,
+    ):
+        self.code_classifier_provider = code_classifier_provider
+        self.cache_size = cache_size
+        self._cache: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def resolve(self, content: str, file_path: Optional[str] = None) -> str:
+        return self.resolve_batch([(content, file_path)])[0]
+
+    def resolve_batch(self, items: Sequence[Tuple[str, Optional[str]]]) -> List[str]:
+        """
+        Resolves many snippets at once. Only the ones no cheap check can decide
+        reach the classifier.
+        """
+        results: List[Optional[str]] = [None] * len(items)
+        # content hash -> (content, indices waiting on it), so duplicates are classified once
+        ambiguous: Dict[str, Tuple[str, List[int]]] = {}
+
+        for i, (content, file_path) in enumerate(items):
+            language = language_from_extension(file_path)
+            if language:
+                results[i] = language
+                continue
+
+            key = content_hash(content)
+            cached = self._cache_get(key)
+            if cached:
+                results[i] = cached
+                continue
+
+            language = language_from_shebang(content) or language_from_heuristics(content)
+            if language:
+                self._cache_put(key, language)
+                results[i] = language
+                continue
+
+            ambiguous.setdefault(key, (content, []))[1].append(i)
+
+        if ambiguous:
+            keys = list(ambiguous)
+            predictions = self.code_classifier_provider().predict_batch([ambiguous[key][0] for key in keys])
+            for key, language in zip(keys, predictions):
+                self._cache_put(key, language)
+                for i in ambiguous[key][1]:
+                    results[i] = language
+
+        return results
+
+    # -------------------------
+    # Cache
+    # -------------------------
+
+    def _cache_get(self, key: str) -> Optional[str]:
+        with self._lock:
+            language = self._cache.get(key)
+            if language is not None:
+                self._cache.move_to_end(key)
+            return language
+
+    def _cache_put(self, key: str, language: str):
+        with self._lock:
+            self._cache[key] = language
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
@@ -1,7 +1,8 @@
+import functools
 import json
 import re
 
-from ollama import chat, generate
+from ollama import AsyncClient, chat, generate
 
 from src.app.configuration.config import (MAIN_LLM_MODEL, INTENT_CLASSIFIER_SYSTEM_PROMPT, DEFAULT_SYSTEM_PROMPT,
                                           GRAPH_SYMBOL_EXTRACTION_SYSTEM_PROMPT, TEST_ANALYSIS_EXTRACTION_SYSTEM_PROMPT)
@@ -44,8 +45,10 @@ def classify_intent(prompt: str) -> Intent:
         {"role": "system", "content": INTENT_CLASSIFIER_SYSTEM_PROMPT},
         {"role": "user", "content": prompt}
     ])
+    return _parse_intent(llm_response.message.content)
 
-    label = llm_response.message.content.strip().upper().replace('"', '')
+def _parse_intent(content: str) -> Intent:
+    label = content.strip().upper().replace('"', '')
     intent = Intent.from_str(label)
     if intent is None:
         intent = Intent.GENERAL
@@ -60,8 +63,10 @@ def extract_class_method(prompt: str) -> TestAnalysisExtractedEntities | None:
             {"role": "user", "content": prompt}
         ]
     )
+    return _parse_class_method(llm_response.message.content)
 
-    raw = llm_response.message.content.strip()
+def _parse_class_method(content: str) -> TestAnalysisExtractedEntities | None:
+    raw = content.strip()
     raw = re.sub(r"^```json\s*|\s*```$", "", raw, flags=re.IGNORECASE).strip()
 
     raw = _extract_json_object(raw)
@@ -86,8 +91,10 @@ def extract_graph_query_plan(prompt: str) -> GraphQueryPlan | None:
             {"role": "system", "content": GRAPH_SYMBOL_EXTRACTION_SYSTEM_PROMPT},
             {"role": "user", "content": prompt},
         ])
+    return _parse_graph_query_plan(llm_response.message.content)
 
-    raw = llm_response.message.content.strip()
+def _parse_graph_query_plan(content: str) -> GraphQueryPlan | None:
+    raw = content.strip()
     raw = re.sub(r"^```json\s*|\s*```$", "", raw, flags=re.IGNORECASE).strip()
 
     raw = _extract_json_object(raw)
@@ -111,6 +118,57 @@ def extract_graph_query_plan(prompt: str) -> GraphQueryPlan | None:
         return None
 
 
+# -------------------------
+# Async variants, for pipelines running on the event loop
+# -------------------------
+
+@functools.lru_cache(maxsize=1)
+def _async_client() -> AsyncClient:
+    return AsyncClient()
+
+async def async_general_model_chat_stream(prompt: str, system_prompt: str = DEFAULT_SYSTEM_PROMPT):
+    try:
+        stream = await _async_client().chat(
+            model=MAIN_LLM_MODEL,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {'role': 'user', 'content': prompt}
+            ],
+            stream=True
+        )
+        async for chunk in stream:
+            if hasattr(chunk, 'message') and hasattr(chunk.message, 'content'):
+                yield chunk.message.content
+    except Exception as e:
+        yield f"Error generating answer: {str(e)}"
+
+async def async_classify_intent(prompt: str) -> Intent:
+    llm_response = await _async_client().chat(model=MAIN_LLM_MODEL, messages=[
+        {"role": "system", "content": INTENT_CLASSIFIER_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ])
+    return _parse_intent(llm_response.message.content)
+
+async def async_extract_class_method(prompt: str) -> TestAnalysisExtractedEntities | None:
+    llm_response = await _async_client().chat(
+        model=MAIN_LLM_MODEL,
+        messages=[
+            {"role": "system", "content": TEST_ANALYSIS_EXTRACTION_SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ]
+    )
+    return _parse_class_method(llm_response.message.content)
+
+async def async_extract_graph_query_plan(prompt: str) -> GraphQueryPlan | None:
+    llm_response = await _async_client().chat(
+        model=MAIN_LLM_MODEL,
+        messages=[
+            {"role": "system", "content": GRAPH_SYMBOL_EXTRACTION_SYSTEM_PROMPT},
+            {"role": "user", "content": prompt},
+        ])
+    return _parse_graph_query_plan(llm_response.message.content)
+
+
 def summarize_code(code: str) -> str:
     prompt = f"""
 You are a helpful programming assistant.
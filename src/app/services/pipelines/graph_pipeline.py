@@ -1,11 +1,13 @@
 import json
+import asyncio
 from typing import List, Tuple, Optional
 
 from src.app.dtos.chat import ChatRequest, DependencyGraph, DependencyEdge, ContentChunk, MetadataChunk
 from src.app.dtos.graph import GraphQueryPlan
 from src.app.dtos.intent import Intent
-from src.app.services.graph_db_service import GraphDBService
-from src.app.services.llm_service import extract_graph_query_plan, general_model_chat, general_model_chat_stream
+from src.app.services.graph_db_service import AsyncGraphDBService, GraphDBService
+from src.app.services.llm_service import (async_extract_graph_query_plan, async_general_model_chat_stream,
+                                         extract_graph_query_plan, general_model_chat, general_model_chat_stream)
 
 UI_MAX_EDGES_PER_NODE=5
 
@@ -25,6 +27,7 @@ class GraphReasoningPipeline:
         nodes = self._resolve_nodes(
             symbols=plan.symbols,
             project_name=chat_request.project_name,
+            revision=chat_request.revision,
         )
 
         # Graph question, but no symbols resolved
@@ -33,7 +36,7 @@ class GraphReasoningPipeline:
             yield json.dumps(content_chunk.model_dump(by_alias=True, exclude_none=False)) + "\n"
             return
 
-        contexts, dependency_graph = self._traverse(nodes, plan)
+        contexts, dependency_graph = self._traverse(nodes, plan, chat_request.revision)
 
         # No graph edges worth showing
         if not dependency_graph or not dependency_graph.edges:
@@ -47,7 +50,7 @@ class GraphReasoningPipeline:
         )
         yield json.dumps(metadata_chunk.model_dump(by_alias=True, exclude_none=False)) + "\n"
 
-        graph_prompt = self._get_graph_prompt(chat_request.prompt, contexts)
+        graph_prompt = _get_graph_prompt(chat_request.prompt, contexts)
         for chunk in general_model_chat_stream(graph_prompt):
             content_chunk = ContentChunk(content=chunk)
             yield json.dumps(content_chunk.model_dump(by_alias=True, exclude_none=False)) + "\n"
@@ -62,24 +65,25 @@ class GraphReasoningPipeline:
         nodes = self._resolve_nodes(
             symbols=plan.symbols,
             project_name=chat_request.project_name,
+            revision=chat_request.revision,
         )
 
         # Graph question, but no symbols resolved
         if not nodes:
             return None, None
 
-        contexts, dependency_graph = self._traverse(nodes, plan)
+        contexts, dependency_graph = self._traverse(nodes, plan, chat_request.revision)
 
         # No graph edges worth showing
         if not dependency_graph or not dependency_graph.edges:
             return None, None
 
-        graph_prompt = self._get_graph_prompt(chat_request.prompt, contexts)
+        graph_prompt = _get_graph_prompt(chat_request.prompt, contexts)
         answer = general_model_chat(graph_prompt)
 
         return answer, dependency_graph
 
-    def _resolve_nodes(self, symbols: List[str], project_name: str) -> List[dict]:
+    def _resolve_nodes(self, symbols: List[str], project_name: str, revision: Optional[str] = None) -> List[dict]:
         resolved = []
 
         for symbol in symbols:
@@ -87,6 +91,7 @@ class GraphReasoningPipeline:
                 name=symbol,
                 project_name=project_name,
                 limit=3,
+                revision=revision,
             )
             resolved.extend(nodes)
 
@@ -96,79 +101,170 @@ class GraphReasoningPipeline:
             self,
             nodes: List[dict],
             plan: GraphQueryPlan,
+            revision: Optional[str] = None,
     ) -> Tuple[List[str], DependencyGraph]:
-
-        contexts: List[str] = []
-        edges: List[DependencyEdge] = []
-        used_nodes = set()
-
-        for node in nodes:
-            source_name = node["node_name"]
-            used_nodes.add(source_name)
-
-            related = self.graph_db_service.traverse(
+        related_by_node = [
+            self.graph_db_service.traverse(
                 node_id=node["node_id"],
                 operation=plan.operation,
                 max_depth=10,  # deep for reasoning
+                revision=revision,
             )
+            for node in nodes
+        ]
+        return _build_graph(nodes, related_by_node, plan)
 
-            # Limit graph expansion for UI
-            graph_related = related[:UI_MAX_EDGES_PER_NODE]
 
-            for rel in graph_related:
-                target_name = rel["node_name"]
-                used_nodes.add(target_name)
+class AsyncGraphReasoningPipeline:
+    """
+    GraphReasoningPipeline on the event loop. Symbols are resolved and their
+    traversals run concurrently, and waiting on Neo4j or the LLM holds no thread.
+    """
 
-                edges.append(
-                    DependencyEdge(
-                        from_=source_name,
-                        to=target_name,
-                    )
-                )
+    def __init__(self, graph_db_service: AsyncGraphDBService):
+        self.graph_db_service = graph_db_service
 
-            # Full context still uses all related nodes
-            contexts.append(
-                self._format_context(
-                    node=node,
-                    related_nodes=related,
-                    operation=plan.operation,
-                )
-            )
+    async def run(self, chat_request: ChatRequest):
+        plan = await async_extract_graph_query_plan(chat_request.prompt)
 
-        # Deduplicate edges
-        edges = list({(e.from_, e.to): e for e in edges}.values())
+        # Not a graph question
+        if not plan:
+            content_chunk = ContentChunk(content="Sorry, I can't answer that question")
+            yield json.dumps(content_chunk.model_dump(by_alias=True, exclude_none=False)) + "\n"
+            return
 
-        graph = DependencyGraph(
-            nodes=sorted(used_nodes),
-            edges=edges,
-            description=f"{plan.operation.value.replace('_', ' ').title()} relationships",
+        nodes = await self._resolve_nodes(
+            symbols=plan.symbols,
+            project_name=chat_request.project_name,
+            revision=chat_request.revision,
         )
 
-        return contexts, graph
+        # Graph question, but no symbols resolved
+        if not nodes:
+            content_chunk = ContentChunk(content="Sorry, I can't answer that question")
+            yield json.dumps(content_chunk.model_dump(by_alias=True, exclude_none=False)) + "\n"
+            return
 
-    def _format_context(self, node: dict, related_nodes: List[dict], operation) -> str:
-        lines = []
+        contexts, dependency_graph = await self._traverse(nodes, plan, chat_request.revision)
 
-        lines.append(f"Symbol: {node['node_name']} ({node['node_type']})")
-        lines.append(f"Defined in: {node['file_path']}:{node['start_line']}")
+        # No graph edges worth showing
+        if not dependency_graph or not dependency_graph.edges:
+            content_chunk = ContentChunk(content="Sorry, I can't answer that question")
+            yield json.dumps(content_chunk.model_dump(by_alias=True, exclude_none=False)) + "\n"
+            return
 
-        if not related_nodes:
-            lines.append("\nNo related nodes found.")
-            return "\n".join(lines)
+        metadata_chunk = MetadataChunk(
+            intent=Intent.CODE_GRAPH_REASONING,
+            dependencyGraph=dependency_graph
+        )
+        yield json.dumps(metadata_chunk.model_dump(by_alias=True, exclude_none=False)) + "\n"
 
-        lines.append(f"\n{operation.value.replace('_', ' ').title()}:")
+        graph_prompt = _get_graph_prompt(chat_request.prompt, contexts)
+        async for chunk in async_general_model_chat_stream(graph_prompt):
+            content_chunk = ContentChunk(content=chunk)
+            yield json.dumps(content_chunk.model_dump(by_alias=True, exclude_none=False)) + "\n"
+
+    async def _resolve_nodes(self, symbols: List[str], project_name: str, revision: Optional[str] = None) -> List[dict]:
+        found = await asyncio.gather(*(
+            self.graph_db_service.find_nodes_by_name(
+                name=symbol,
+                project_name=project_name,
+                limit=3,
+                revision=revision,
+            )
+            for symbol in symbols
+        ))
+        return [node for nodes in found for node in nodes]
+
+    async def _traverse(
+            self,
+            nodes: List[dict],
+            plan: GraphQueryPlan,
+            revision: Optional[str] = None,
+    ) -> Tuple[List[str], DependencyGraph]:
+        related_by_node = await asyncio.gather(*(
+            self.graph_db_service.traverse(
+                node_id=node["node_id"],
+                operation=plan.operation,
+                max_depth=10,  # deep for reasoning
+                revision=revision,
+            )
+            for node in nodes
+        ))
+        return _build_graph(nodes, related_by_node, plan)
+
+
+def _build_graph(
+        nodes: List[dict],
+        related_by_node: List[List[dict]],
+        plan: GraphQueryPlan,
+) -> Tuple[List[str], DependencyGraph]:
+    contexts: List[str] = []
+    edges: List[DependencyEdge] = []
+    used_nodes = set()
+
+    for node, related in zip(nodes, related_by_node):
+        source_name = node["node_name"]
+        used_nodes.add(source_name)
+
+        # Limit graph expansion for UI
+        graph_related = related[:UI_MAX_EDGES_PER_NODE]
+
+        for rel in graph_related:
+            target_name = rel["node_name"]
+            used_nodes.add(target_name)
+
+            edges.append(
+                DependencyEdge(
+                    from_=source_name,
+                    to=target_name,
+                )
+            )
 
-        for rel in related_nodes:
-            lines.append(
-                f"- {rel['node_name']} ({rel['node_type']}) "
-                f"in {rel['file_path']}:{rel['start_line']}"
+        # Full context still uses all related nodes
+        contexts.append(
+            _format_context(
+                node=node,
+                related_nodes=related,
+                operation=plan.operation,
             )
+        )
+
+    # Deduplicate edges
+    edges = list({(e.from_, e.to): e for e in edges}.values())
+
+    graph = DependencyGraph(
+        nodes=sorted(used_nodes),
+        edges=edges,
+        description=f"{plan.operation.value.replace('_', ' ').title()} relationships",
+    )
+
+    return contexts, graph
 
+
+def _format_context(node: dict, related_nodes: List[dict], operation) -> str:
+    lines = []
+
+    lines.append(f"Symbol: {node['node_name']} ({node['node_type']})")
+    lines.append(f"Defined in: {node['file_path']}:{node['start_line']}")
+
+    if not related_nodes:
+        lines.append("\nNo related nodes found.")
         return "\n".join(lines)
 
+    lines.append(f"\n{operation.value.replace('_', ' ').title()}:")
+
+    for rel in related_nodes:
+        lines.append(
+            f"- {rel['node_name']} ({rel['node_type']}) "
+            f"in {rel['file_path']}:{rel['start_line']}"
+        )
+
+    return "\n".join(lines)
+
 
-    def _get_graph_prompt(self, user_prompt: str, contexts: List[str]):
-        prompt = f"""
+def _get_graph_prompt(user_prompt: str, contexts: List[str]):
+    prompt = f"""
 User question:
 {user_prompt}
 
@@ -178,4 +274,4 @@ Code information:
 Answer the user's question using the provided code information. 
 Do not mention the code or the fact that it was provided to you; just answer concisely and authoritatively.
     """
-        return prompt
+    return prompt
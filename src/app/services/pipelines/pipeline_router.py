@@ -1,12 +1,14 @@
 import json
 
+from starlette.concurrency import iterate_in_threadpool
+
 from src.app.dtos.chat import ChatRequest, ContentChunk, MetadataChunk
 from src.app.dtos.intent import Intent
-from src.app.services.llm_service import classify_intent, general_model_chat_stream
-from src.app.services.pipelines.graph_pipeline import GraphReasoningPipeline
+from src.app.services.llm_service import async_classify_intent, general_model_chat_stream
+from src.app.services.pipelines.graph_pipeline import AsyncGraphReasoningPipeline
 from src.app.services.pipelines.hybrid_pipeline import HybridPipeline
 from src.app.services.pipelines.rag_pipeline import RagPipeline
-from src.app.services.pipelines.test_analysis_pipeline import TestAnalysisPipeline
+from src.app.services.pipelines.test_analysis_pipeline import AsyncTestAnalysisPipeline
 
 
 def _handle_general_prompt(chat_request: ChatRequest):
@@ -21,23 +23,32 @@ def _handle_general_prompt(chat_request: ChatRequest):
 
 
 class PipelineRouter:
-    def __init__(self, rag_pipeline: RagPipeline, graph_reasoning_pipeline: GraphReasoningPipeline,
-                 hybrid_pipeline: HybridPipeline, test_analysis_pipeline: TestAnalysisPipeline):
+    """
+    Streams the answer for a chat request from the pipeline its intent selects.
+    Graph-heavy pipelines run on the event loop; the others are synchronous and are
+    iterated in the threadpool so they never block it.
+    """
+
+    def __init__(self, rag_pipeline: RagPipeline, graph_reasoning_pipeline: AsyncGraphReasoningPipeline,
+                 hybrid_pipeline: HybridPipeline, test_analysis_pipeline: AsyncTestAnalysisPipeline):
         self.rag_pipeline = rag_pipeline
         self.graph_reasoning_pipeline = graph_reasoning_pipeline
         self.hybrid_pipeline = hybrid_pipeline
         self.test_analysis_pipeline = test_analysis_pipeline
 
-    def route_prompt(self, chat_request: ChatRequest):
-        intent = classify_intent(chat_request.prompt)
+    async def route_prompt(self, chat_request: ChatRequest):
+        intent = await async_classify_intent(chat_request.prompt)
 
         if intent is Intent.CODE_GRAPH_REASONING:
-            yield from self.graph_reasoning_pipeline.run(chat_request)
+            chunks = self.graph_reasoning_pipeline.run(chat_request)
+        elif intent is Intent.TEST_ANALYSIS:
+            chunks = self.test_analysis_pipeline.run(chat_request)
         elif intent in {Intent.CODE_VECTOR_RETRIEVAL, Intent.DOCS_VECTOR_RETRIEVAL}:
-            yield from self.rag_pipeline.run(chat_request, intent)
+            chunks = iterate_in_threadpool(self.rag_pipeline.run(chat_request, intent))
         elif intent is Intent.CODE_HYBRID:
-            yield from self.hybrid_pipeline.run(chat_request)
-        elif intent is Intent.TEST_ANALYSIS:
-            yield from self.test_analysis_pipeline.run(chat_request)
+            chunks = iterate_in_threadpool(self.hybrid_pipeline.run(chat_request))
         else:
-            yield from _handle_general_prompt(chat_request)
+            chunks = iterate_in_threadpool(_handle_general_prompt(chat_request))
+
+        async for chunk in chunks:
+            yield chunk
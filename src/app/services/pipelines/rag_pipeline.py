@@ -1,13 +1,28 @@
 import json
 import textwrap
-from typing import Tuple, List
+from typing import TYPE_CHECKING, Tuple, List, Optional
 
 from src.app.configuration.config import HYBRID_SYSTEM_PROMPT
-from src.app.configuration.vector_db import VectorDB
 from src.app.dtos.chat import ChatRequest, RetrievedFile, ContentChunk, MetadataChunk
 from src.app.dtos.intent import Intent
+from src.app.services.ingestion.ingestion_sinks import revision_metadata_key
 from src.app.services.llm_service import general_model_chat, general_model_chat_stream
 
+if TYPE_CHECKING:
+    from src.app.configuration.vector_db import VectorDB
+
+
+def _build_where_filter(chat_request: ChatRequest, by_revision: bool = True) -> Optional[dict]:
+    conditions = []
+    if chat_request.project_name:
+        conditions.append({"project": chat_request.project_name})
+    if by_revision and chat_request.revision:
+        conditions.append({revision_metadata_key(chat_request.revision): True})
+
+    if not conditions:
+        return None
+    return conditions[0] if len(conditions) == 1 else {"$and": conditions}
+
 
 def _extract_code_for_response(text: str) -> str:
     marker = "Code:\n"
@@ -17,14 +32,16 @@ def _extract_code_for_response(text: str) -> str:
 
 
 class RagPipeline:
-    def __init__(self, db: VectorDB):
+    def __init__(self, db: "VectorDB"):
         self.db = db
 
     def run(self, chat_request: ChatRequest, intent: Intent):
-        where_filter = {"project": chat_request.project_name} if chat_request.project_name else None
+        # Docs are indexed from the working tree only, so they are not filtered by revision
+        docs_intent = intent is Intent.DOCS_VECTOR_RETRIEVAL
+        where_filter = _build_where_filter(chat_request, by_revision=not docs_intent)
 
         result = self.db.query(
-            collection=self.db.code,
+            collection=self.db.docs if docs_intent else self.db.code,
             query_text=chat_request.prompt,
             n_results=30,
             where=where_filter,
@@ -74,7 +91,7 @@ class RagPipeline:
             yield json.dumps(content_chunk.model_dump(by_alias=True, exclude_none=False)) + "\n"
 
     def run_for_hybrid(self, chat_request: ChatRequest) -> Tuple[str, List[RetrievedFile]]:
-        where_filter = {"project": chat_request.project_name} if chat_request.project_name else None
+        where_filter = _build_where_filter(chat_request)
 
         result = self.db.query(
             collection=self.db.code,
@@ -1,50 +1,58 @@
+import asyncio
 import json
-from typing import Optional, List
+from typing import Optional, List, Tuple
 
 from src.app.configuration.config import TEST_ANALYSIS_SYSTEM_PROMPT
 from src.app.dtos.chat import ChatRequest, ContentChunk, MetadataChunk
 from src.app.dtos.intent import Intent
-from src.app.dtos.test import TestGapFinding
+from src.app.dtos.test import TestCodeAnalysisResult, TestGapFinding
 from src.app.services.code_analysis_service import CodeAnalysisService
 from src.app.services.file_metadata_service import is_file_recently_modified
-from src.app.services.graph_db_service import GraphDBService
-from src.app.services.llm_service import extract_class_method, general_model_chat_stream
+from src.app.services.graph_db_service import AsyncGraphDBService
+from src.app.services.llm_service import async_extract_class_method, async_general_model_chat_stream
 
 
-class TestAnalysisPipeline:
-    def __init__(self, graph_db_service: GraphDBService, code_analysis_service: CodeAnalysisService):
+class AsyncTestAnalysisPipeline:
+    """
+    Finds methods that likely lack tests and asks the model about them, on the
+    event loop. The graph queries for each method run concurrently; file analysis,
+    which parses source, runs in a worker thread.
+    """
+
+    def __init__(self, graph_db_service: AsyncGraphDBService, code_analysis_service: CodeAnalysisService):
         self.graph_db_service = graph_db_service
         self.code_analysis_service = code_analysis_service
 
-    def run(self, chat_request: ChatRequest):
-        test_gap_findings = self._find_test_gaps(chat_request)
+    async def run(self, chat_request: ChatRequest):
+        test_gap_findings = await self._find_test_gaps(chat_request)
         metadata_chunk = MetadataChunk(
             intent=Intent.TEST_ANALYSIS
         )
         yield json.dumps(metadata_chunk.model_dump(by_alias=True, exclude_none=False)) + "\n"
 
-        test_analysis_prompt = self._get_test_analysis_prompt(test_gap_findings, chat_request.prompt)
-        for chunk in general_model_chat_stream(test_analysis_prompt, system_prompt=TEST_ANALYSIS_SYSTEM_PROMPT):
+        test_analysis_prompt = _get_test_analysis_prompt(test_gap_findings, chat_request.prompt)
+        async for chunk in async_general_model_chat_stream(test_analysis_prompt,
+                                                           system_prompt=TEST_ANALYSIS_SYSTEM_PROMPT):
             content_chunk = ContentChunk(content=chunk)
             yield json.dumps(content_chunk.model_dump(by_alias=True, exclude_none=False)) + "\n"
 
-    def _find_test_gaps(self, chat_request: ChatRequest) -> List[TestGapFinding]:
-        extracted_entities = extract_class_method(chat_request.prompt)
+    async def _find_test_gaps(self, chat_request: ChatRequest) -> List[TestGapFinding]:
+        extracted_entities = await async_extract_class_method(chat_request.prompt)
         if extracted_entities.class_name is None and extracted_entities.method_name is None:
             return []
 
-        findings: List[TestGapFinding] = []
-
         # Resolve class if only method is given
         class_to_check = extracted_entities.class_name
         if extracted_entities.method_name and not extracted_entities.class_name:
-            class_to_check = self.graph_db_service.find_class_for_method(extracted_entities.method_name,
-                                                                         chat_request.project_name)
+            class_to_check = await self.graph_db_service.find_class_for_method(extracted_entities.method_name,
+                                                                               chat_request.project_name,
+                                                                               chat_request.revision)
 
             if class_to_check is None:
                 # Try to find module-level function/method node in graph
-                node_info = self.graph_db_service.find_method_or_function_node(extracted_entities.method_name,
-                                                                               chat_request.project_name)
+                node_info = await self.graph_db_service.find_method_or_function_node(extracted_entities.method_name,
+                                                                                     chat_request.project_name,
+                                                                                     chat_request.revision)
                 if node_info is None:
                     return []  # Nothing found
                 # Use node_info to fill methods_info for scoring
@@ -54,9 +62,10 @@ class TestAnalysisPipeline:
                     "file_path": node_info.get("file_path")
                 }]
             else:
-                methods_info = self.graph_db_service.list_methods(
+                methods_info = await self.graph_db_service.list_methods(
                     class_to_check,
-                    chat_request.project_name
+                    chat_request.project_name,
+                    chat_request.revision,
                 )
                 methods_info = [
                     m for m in methods_info
@@ -64,90 +73,108 @@ class TestAnalysisPipeline:
                 ]
         else:
             # Get methods with file paths
-            methods_info = self.graph_db_service.list_methods(class_to_check, chat_request.project_name)
+            methods_info = await self.graph_db_service.list_methods(class_to_check, chat_request.project_name,
+                                                                    chat_request.revision)
             if extracted_entities.method_name:
                 methods_info = [m for m in methods_info if m["method_name"] == extracted_entities.method_name]
 
         if not methods_info:
             return []  # No matching methods found
 
-        for m_info in methods_info:
-            cls = m_info.get("class_name")
-            method = m_info["method_name"]
-            file_path = m_info.get("file_path")
-
-            score = 0
-            reasons = []
-
-            # External calls
-            if self.graph_db_service.is_method_called_externally(cls, method):
-                score += 1
-                reasons.append("Method/function is called from outside the class/module")
-
-            # Static analysis using actual code from file
-            test_code_analysis_result = self.code_analysis_service.analyze_code_for_tests(file_path, cls, method)
-
-            if test_code_analysis_result.long_function:
-                score += 1
-                reasons.append("Long function detected")
-            if test_code_analysis_result.deep_nesting:
-                score += 1
-                reasons.append("Deep nesting detected")
-            if test_code_analysis_result.many_params:
-                score += 1
-                param_count = test_code_analysis_result.param_count
-                reasons.append(
-                    f"{param_count} parameters detected" if param_count is not None
-                    else "Many parameters detected"
-                )
+        findings = await asyncio.gather(
+            *(self._check_method(m_info, chat_request.project_name) for m_info in methods_info)
+        )
+        findings = [f for f in findings if f is not None]
+        return findings if findings else None
 
-            # File metadata (only if file exists)
-            if file_path and is_file_recently_modified(file_path):
-                score += 1
-                reasons.append("Recently modified file")
-
-            # Class collaborators (only if class)
-            if cls and self.graph_db_service.get_class_collaborator_count(cls) > 3:
-                score += 1
-                reasons.append("Class has many collaborators")
-
-            # Threshold to flag missing tests
-            if score >= 2:
-                suggested_focus = self._suggest_focus(cls, method)
-                findings.append(TestGapFinding(
-                    class_name=cls,
-                    method_name=method,
-                    reasons=reasons,
-                    priority=score,
-                    suggested_focus=suggested_focus
-                ))
+    async def _check_method(self, m_info: dict, project_name: str) -> Optional[TestGapFinding]:
+        cls = m_info.get("class_name")
+        method = m_info["method_name"]
+        file_path = m_info.get("file_path")
 
-        return findings if findings else None
+        called_externally, analysis, collaborator_count = await asyncio.gather(
+            self.graph_db_service.is_method_called_externally(cls, method, project_name),
+            asyncio.to_thread(self.code_analysis_service.analyze_code_for_tests, file_path, cls, method),
+            self.graph_db_service.get_class_collaborator_count(cls, project_name) if cls else _zero(),
+        )
+        score, reasons = _score_method(file_path, called_externally, analysis, collaborator_count)
+
+        # Threshold to flag missing tests
+        if score < 2:
+            return None
+
+        deps = await self.graph_db_service.get_method_dependencies(cls, method, project_name)
+        return TestGapFinding(
+            class_name=cls,
+            method_name=method,
+            reasons=reasons,
+            priority=score,
+            suggested_focus=f"Consider mocking: {', '.join(deps)}" if deps else None
+        )
 
-    def _suggest_focus(self, class_name: Optional[str], method_name: str) -> Optional[str]:
-        deps = self.graph_db_service.get_method_dependencies(class_name, method_name)
-        if deps:
-            return f"Consider mocking: {', '.join(deps)}"
-        return None
-
-    def _get_test_analysis_prompt(self, findings: list[TestGapFinding], prompt: str) -> str:
-        formatted_findings = "NONE"
-        if findings:
-            lines = []
-            for f in findings:
-                lines.append(
-                    f"""- Method: {f.method_name} (Class: {f.class_name or "module-level"})
+
+async def _zero() -> int:
+    return 0
+
+
+def _score_method(
+        file_path: Optional[str],
+        called_externally: bool,
+        test_code_analysis_result: TestCodeAnalysisResult,
+        collaborator_count: int,
+) -> Tuple[int, List[str]]:
+    score = 0
+    reasons = []
+
+    # External calls
+    if called_externally:
+        score += 1
+        reasons.append("Method/function is called from outside the class/module")
+
+    if test_code_analysis_result.long_function:
+        score += 1
+        reasons.append("Long function detected")
+    if test_code_analysis_result.deep_nesting:
+        score += 1
+        reasons.append("Deep nesting detected")
+    if test_code_analysis_result.many_params:
+        score += 1
+        param_count = test_code_analysis_result.param_count
+        reasons.append(
+            f"{param_count} parameters detected" if param_count is not None
+            else "Many parameters detected"
+        )
+
+    # File metadata (only if file exists)
+    if file_path and is_file_recently_modified(file_path):
+        score += 1
+        reasons.append("Recently modified file")
+
+    if collaborator_count > 3:
+        score += 1
+        reasons.append("Class has many collaborators")
+
+    return score, reasons
+
+
+def _get_test_analysis_prompt(findings: list[TestGapFinding], prompt: str) -> str:
+    formatted_findings = "NONE"
+    if findings:
+        lines = []
+        for f in findings:
+            lines.append(
+                f"""- Method: {f.method_name} (Class: {f.class_name or "module-level"})
 Reasons:
 - {chr(10).join(f.reasons)}
 Suggested focus: {f.suggested_focus or "N/A"}"""
-                )
-            formatted_findings = "\n".join(lines)
+            )
+        formatted_findings = "\n".join(lines)
 
-        modified_prompt = f"""
+    modified_prompt = f"""
 User question:
 {prompt}
 
 Identified test gaps:
 {formatted_findings}
 """
-        return modified_prompt
+    return modified_prompt